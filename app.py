@@ -10,7 +10,7 @@ from fastapi import FastAPI
 from src.api.main import app as api_app
 
 # importeer bot-starter
-from src.discord_service.runner import start_bot
+from src.discord_service.runner import start_bot, stop_bot
 
 # Exporteer één gecombineerde app voor uvicorn
 app = FastAPI(title="HQ Service (API + Bot)")
@@ -26,6 +26,12 @@ async def _startup():
     asyncio.create_task(start_bot())
 
 
+# sluit de bot netjes af en schrijf logs weg bij shutdown
+@app.on_event("shutdown")
+async def _shutdown():
+    await stop_bot()
+
+
 if __name__ == "__main__":
     port = int(os.getenv("PORT", "8000"))
     uvicorn.run("app:app", host="0.0.0.0", port=port, reload=True)
@@ -0,0 +1,394 @@
+"""Load test: N missies met elk M spelers door alle fases, via de echte runner.
+
+De Discord-gateway is vervangen door in-memory nepobjecten en OpenAI door de
+lokale nepserver (in-process, zonder netwerk). Voorbeeld::
+
+    python -m benchmarks.load_test --missions 20 --players 4 --latency lognormal:0.8,0.5
+
+Rapporteert doorvoer, p50/p95/p99-latentie en event-loop-lag. Een beurt is één
+aanroep van de bot (berichten in een burst worden samen één beurt); de
+beurtlatentie loopt van het eerste bericht van de burst tot het antwoord klaar
+is, de berichtlatentie per bericht tot het antwoord op zijn beurt.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--missions", type=int, default=10, help="aantal missies")
+    parser.add_argument("--players", type=int, default=3, help="spelers per missie")
+    parser.add_argument(
+        "--latency", default="uniform:0.05,0.2", help="latentie van de nepserver"
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--max-rounds",
+        type=int,
+        default=12,
+        help="max. berichtrondes per fase voordat een missie wordt opgegeven",
+    )
+    parser.add_argument(
+        "--exfil-rounds", type=int, default=2, help="rondes in de (eind)fase exfil"
+    )
+    parser.add_argument("--window", default="0", help="COALESCE_WINDOW voor de run")
+    parser.add_argument("--stream", action="store_true", help="antwoorden streamen")
+    parser.add_argument("--store", default="json", choices=("json", "sqlite"))
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--json", dest="json_out", help="schrijf resultaten naar bestand"
+    )
+    return parser.parse_args(argv)
+
+
+def configure_env(args):
+    """Zet de omgeving vóór het importeren van de service-modules."""
+    os.environ.setdefault("OPENAI_API_KEY", "fake")
+    os.environ["DATA_DIR"] = tempfile.mkdtemp(prefix="hq-load-")
+    os.environ["MISSION_STORE"] = args.store
+    os.environ["COALESCE_WINDOW"] = args.window
+    os.environ["DISCORD_STREAM_REPLIES"] = "1" if args.stream else "0"
+    os.environ.setdefault("OPENAI_RETRY_BASE", "0.05")
+    logging.disable(logging.WARNING)
+
+
+# ---------- Nep-Discord ----------
+_ids = itertools.count(1000)
+
+
+class FakeRole:
+    def __init__(self, name: str):
+        self.id = next(_ids)
+        self.name = name
+
+
+class FakeUser:
+    def __init__(self, name: str, bot: bool = False):
+        self.id = next(_ids)
+        self.name = self.display_name = name
+        self.bot = bot
+
+
+class FakeMessage:
+    def __init__(self, channel, author, content: str):
+        self.id = next(_ids)
+        self.channel = channel
+        self.author = author
+        self.content = content
+
+    async def edit(self, content: str | None = None, **kwargs):
+        if content is not None:
+            self.content = content
+        self.channel.on_bot_message(self)
+        return self
+
+
+class _Typing:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeTextChannel:
+    def __init__(self, guild, name: str, category=None, overwrites=None):
+        self.id = next(_ids)
+        self.guild = guild
+        self.name = name.lower()
+        self.category = category
+        self._overwrites = dict(overwrites or {})
+        self.messages: list[FakeMessage] = []
+        self._waiters: list[asyncio.Future] = []
+
+    @property
+    def overwrites(self):
+        return dict(self._overwrites)
+
+    def overwrites_for(self, target):
+        import discord
+
+        return self._overwrites.get(target, discord.PermissionOverwrite())
+
+    async def set_permissions(self, target, overwrite=None):
+        if overwrite is None:
+            self._overwrites.pop(target, None)
+        else:
+            self._overwrites[target] = overwrite
+
+    async def edit(self, overwrites=None, **kwargs):
+        if overwrites is not None:
+            self._overwrites = dict(overwrites)
+
+    def typing(self):
+        return _Typing()
+
+    async def send(self, content: str):
+        message = FakeMessage(self, self.guild.bot_user, content)
+        self.messages.append(message)
+        self.on_bot_message(message)
+        return message
+
+    def on_bot_message(self, message: FakeMessage):
+        waiters, self._waiters = self._waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(message)
+
+    def next_bot_message(self) -> asyncio.Future:
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        return waiter
+
+
+class FakeCategory:
+    def __init__(self, guild, name: str):
+        self.id = next(_ids)
+        self.guild = guild
+        self.name = name
+        self.overwrites: dict = {}
+        self.text_channels: list[FakeTextChannel] = []
+
+    async def create_text_channel(self, name: str, overwrites=None):
+        channel = FakeTextChannel(self.guild, name, self, overwrites)
+        self.text_channels.append(channel)
+        return channel
+
+
+class FakeGuild:
+    def __init__(self):
+        self.id = next(_ids)
+        self.default_role = FakeRole("@everyone")
+        self.roles = [self.default_role]
+        self.categories: list[FakeCategory] = []
+        self.bot_user = FakeUser("HQ", bot=True)
+        self.admin = FakeTextChannel(self, "admin")
+
+    async def create_category(self, name: str):
+        category = FakeCategory(self, name)
+        self.categories.append(category)
+        return category
+
+    def channel(self, mission: str, stage: str) -> FakeTextChannel | None:
+        for category in self.categories:
+            if category.name == mission.lower():
+                for channel in category.text_channels:
+                    if channel.name == stage:
+                        return channel
+        return None
+
+
+class FakeClient:
+    """Genoeg van ``discord.Client`` voor ``create_bot``."""
+
+    def __init__(self, guild: FakeGuild):
+        self.guild = guild
+        self.user = guild.bot_user
+        self._closed = False
+
+    def event(self, coro):
+        setattr(self, coro.__name__, coro)
+        return coro
+
+    def get_guild(self, guild_id: int):
+        return self.guild
+
+    def is_closed(self) -> bool:
+        return self._closed
+
+    async def close(self):
+        self._closed = True
+
+
+# ---------- Meting ----------
+async def measure_loop_lag(samples: list[float], interval: float = 0.01):
+    """Meet hoeveel later dan gepland de event loop een sleep afhandelt."""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        samples.append(max(loop.time() - start - interval, 0.0))
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def instrument_turns(stats):
+    """Koppel elke bot-beurt aan de berichten die erin zaten.
+
+    De runner geeft berichten als ``"<afzender>: <tekst>"``-regels door; na
+    afloop van de beurt worden de wachtende ``say``-aanroepen van precies die
+    regels afgerond.
+    """
+    from src.game.models.mission import Mission
+
+    original = Mission.chat_with_current_stage_bot
+
+    async def chat_with_current_stage_bot(self, message, listener=None):
+        try:
+            return await original(self, message, listener=listener)
+        finally:
+            # Een vervangen beurt (supersede) telt niet: de regels komen in een
+            # volgende beurt terug. Een fout telt wel als antwoord van de runner.
+            if not asyncio.current_task().cancelling():  # type: ignore[union-attr]
+                finish_turn(stats, message)
+
+    Mission.chat_with_current_stage_bot = chat_with_current_stage_bot  # type: ignore[method-assign]
+
+
+def finish_turn(stats, message: str):
+    now = time.perf_counter()
+    waiting = [stats["pending"].pop(line, None) for line in message.splitlines()]
+    waiting = [entry for entry in waiting if entry is not None]
+    if not waiting:
+        return
+    stats["turns"] += 1
+    stats["turn_latencies"].append(now - min(start for start, _ in waiting))
+    for start, future in waiting:
+        stats["latencies"].append(now - start)
+        if not future.done():
+            future.set_result(None)
+
+
+def latency_summary(values: list[float]) -> dict:
+    return {
+        "mean": round(statistics.fmean(values), 4) if values else 0.0,
+        "p50": round(percentile(values, 50), 4),
+        "p95": round(percentile(values, 95), 4),
+        "p99": round(percentile(values, 99), 4),
+    }
+
+
+async def run_mission(client, guild, name: str, args, stats) -> str:
+    """Speel één missie van intake tot en met exfil; retourneer de eindfase."""
+    from src.game.mission_cache import get_mission_cache
+    from src.game.models.mission import MissionStage
+
+    admin_user = FakeUser("admin")
+    reply = guild.admin.next_bot_message()
+    await client.on_message(FakeMessage(guild.admin, admin_user, f"!new {name} 5"))
+    await reply
+
+    players = [FakeUser(f"{name}-speler-{i}") for i in range(args.players)]
+    missions = get_mission_cache()
+
+    async def say(channel, player, text):
+        line = f"{player.display_name}: {text}"
+        answered = asyncio.get_running_loop().create_future()
+        stats["pending"][line] = (time.perf_counter(), answered)
+        await client.on_message(FakeMessage(channel, player, text))
+        try:
+            await asyncio.wait_for(answered, timeout=120)
+        except asyncio.TimeoutError:
+            stats["pending"].pop(line, None)
+            stats["timeouts"] += 1
+            return
+        stats["messages"] += 1
+
+    stage = MissionStage.INTAKE
+    while True:
+        rounds = args.exfil_rounds if stage == MissionStage.EXFIL else args.max_rounds
+        channel = guild.channel(name, stage.value)
+        for round_no in range(rounds):
+            await asyncio.gather(
+                *(
+                    say(channel, player, f"Ronde {round_no}: status van {player.name}")
+                    for player in players
+                )
+            )
+            mission = await missions.get(name)
+            if mission.stage != stage:
+                break
+        mission = await missions.get(name)
+        stats["stages"][stage.value] += 1
+        if mission.stage == stage or stage == MissionStage.EXFIL:
+            return mission.stage.value
+        stage = mission.stage
+
+
+async def main(args) -> dict:
+    import httpx
+
+    from src.discord_service.runner import create_bot, stop_bot
+    from src.openai_service.client import configure_client
+    from src.openai_service.fake_server import FakeConfig, create_app
+
+    fake_app = create_app(
+        FakeConfig(latency=args.latency, error_rate=args.error_rate, seed=args.seed)
+    )
+    configure_client("http://fake-openai/v1", httpx.ASGITransport(app=fake_app))
+
+    guild = FakeGuild()
+    client = await create_bot(FakeClient(guild))
+
+    stats = {
+        "pending": {},
+        "latencies": [],
+        "turn_latencies": [],
+        "turns": 0,
+        "messages": 0,
+        "timeouts": 0,
+        "stages": defaultdict(int),
+    }
+    instrument_turns(stats)
+    lag: list[float] = []
+    lag_task = asyncio.create_task(measure_loop_lag(lag))
+    start = time.perf_counter()
+    final_stages = await asyncio.gather(
+        *(
+            run_mission(client, guild, f"load{i:03d}", args, stats)
+            for i in range(args.missions)
+        )
+    )
+    elapsed = time.perf_counter() - start
+    lag_task.cancel()
+    await stop_bot()
+
+    return {
+        "missions": args.missions,
+        "players": args.players,
+        "latency": args.latency,
+        "elapsed_s": round(elapsed, 3),
+        "turns": stats["turns"],
+        "messages": stats["messages"],
+        "timeouts": stats["timeouts"],
+        "throughput_turns_per_s": round(stats["turns"] / elapsed, 2),
+        "openai_requests": fake_app.state.fake.requests,
+        "turn_latency_s": latency_summary(stats["turn_latencies"]),
+        "message_latency_s": latency_summary(stats["latencies"]),
+        "loop_lag_ms": {
+            "p50": round(percentile(lag, 50) * 1000, 3),
+            "p99": round(percentile(lag, 99) * 1000, 3),
+            "max": round(max(lag, default=0.0) * 1000, 3),
+        },
+        "stages_reached": dict(stats["stages"]),
+        "final_stages": {
+            stage: final_stages.count(stage) for stage in sorted(set(final_stages))
+        },
+    }
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    configure_env(arguments)
+    result = asyncio.run(main(arguments))
+    print(json.dumps(result, indent=2))
+    if arguments.json_out:
+        with open(arguments.json_out, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    sys.exit(1 if result["timeouts"] else 0)
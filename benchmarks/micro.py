@@ -0,0 +1,267 @@
+"""Micro-benchmarks van de CPU-kosten per beurt.
+
+Meet missie-serialisatie, het parsen en dispatchen van tool calls, ``_split``
+en de geo-functies. Resultaten gaan als JSON naar een bestand en kunnen met een
+eerdere run worden vergeleken::
+
+    python -m benchmarks.micro --out before.json
+    python -m benchmarks.micro --out after.json --compare before.json
+
+Bij ``--compare`` eindigt het script met exitcode 1 als een benchmark meer dan
+``--threshold`` procent trager is geworden.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import typing
+from types import SimpleNamespace
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", help="schrijf resultaten naar dit JSON-bestand")
+    parser.add_argument("--compare", help="vergelijk met een eerder resultatenbestand")
+    parser.add_argument(
+        "--threshold", type=float, default=10.0, help="toegestane vertraging in %%"
+    )
+    parser.add_argument("--filter", default="", help="alleen benchmarks met deze tekst")
+    parser.add_argument(
+        "--min-time", type=float, default=0.2, help="seconden per herhaling"
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    return parser.parse_args(argv)
+
+
+def configure_env():
+    os.environ.setdefault("OPENAI_API_KEY", "fake")
+    os.environ["DATA_DIR"] = tempfile.mkdtemp(prefix="hq-micro-")
+    os.environ["MISSION_SAVE_DELAY"] = "3600"  # geen echte writes tijdens metingen
+    logging.disable(logging.WARNING)
+
+
+def measure(func: typing.Callable[[int], None], min_time: float, repeat: int) -> dict:
+    """Meet ``func(loops)``; retourneer de beste en mediane tijd per operatie."""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        func(loops)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / 4 or loops >= 1 << 24:
+            break
+        loops *= 4
+    loops = max(1, int(loops * min_time / max(elapsed, 1e-9)))
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(loops)
+        timings.append((time.perf_counter() - start) / loops)
+    timings.sort()
+    return {
+        "ns_per_op": round(timings[0] * 1e9, 1),
+        "median_ns_per_op": round(timings[len(timings) // 2] * 1e9, 1),
+        "loops": loops,
+    }
+
+
+def _sync(coro_factory) -> typing.Callable[[int], None]:
+    """Draai ``loops`` keer een coroutine binnen één event loop."""
+    loop = asyncio.new_event_loop()
+
+    def run(loops: int):
+        async def many():
+            for _ in range(loops):
+                await coro_factory()
+
+        loop.run_until_complete(many())
+
+    return run
+
+
+def build_mission(players: int):
+    from src.game.models.location import Location
+    from src.game.models.mission import Mission, MissionStage
+    from src.game.models.player import Player
+
+    mission = Mission(
+        name=f"bench{players}",
+        stage=MissionStage.BEACON,
+        hq_location=Location(latitude=50.85, longitude=4.35),
+        drop_point=Location(latitude=50.9, longitude=4.4),
+        mission_context="Context " * 50,
+        mission_objectives=[f"Doel {i}" for i in range(5)],
+    )
+    mission.players = [
+        Player(
+            name=f"Speler {i}", notes="Notities " * 10, inventory=["kompas", "kaart"]
+        )
+        for i in range(players)
+    ]
+    for stage in (MissionStage.INTAKE, MissionStage.BRIEFING, MissionStage.BEACON):
+        bot = mission.load_stage_bot(stage)
+        bot.conversation_id = f"conv_{stage.value}"
+        mission.bots[stage] = bot
+    return mission
+
+
+def benchmarks() -> dict[str, typing.Callable[[int], None]]:
+    from src.discord_service.service import _split
+    from src.game.models.location import Location, random_location_at_distance
+    from src.game.models.mission import Mission, MissionStage
+
+    cases: dict[str, typing.Callable[[int], None]] = {}
+
+    # ---------- Serialisatie ----------
+    for n in (1, 10, 50, 200):
+        mission = build_mission(n)
+        data = mission.model_dump_json()
+
+        def dump(loops, mission=mission):
+            for _ in range(loops):
+                mission.model_dump_json()
+
+        def validate(loops, data=data):
+            for _ in range(loops):
+                Mission.model_validate_json(data)
+
+        cases[f"mission.model_dump_json[{n}]"] = dump
+        cases[f"mission.model_validate_json[{n}]"] = validate
+
+    # ---------- Tool calls ----------
+    mission = build_mission(10)
+    bot = mission.bots[MissionStage.BEACON]
+    coordinates = json.dumps({"latitude_decimal": 50.86, "longitude_decimal": 4.36})
+    player = json.dumps({"name": "Speler 3", "notes": "Nieuw", "inventory": ["kaart"]})
+    distance_spec = bot.tool_specs["calculate_distance_to_drop_zone"]
+    player_spec = mission.load_stage_bot(MissionStage.INTAKE).tool_specs[
+        "create_or_update_player"
+    ]
+
+    def parse_coordinates(loops):
+        for _ in range(loops):
+            distance_spec.parse(coordinates)
+
+    def parse_player(loops):
+        for _ in range(loops):
+            player_spec.parse(player)
+
+    cases["tool.parse[coordinates]"] = parse_coordinates
+    cases["tool.parse[player]"] = parse_player
+
+    calls = [
+        SimpleNamespace(
+            type="function_call",
+            name="calculate_distance_to_drop_zone",
+            arguments=coordinates,
+            call_id=f"call_{i}",
+        )
+        for i in range(3)
+    ]
+
+    async def dispatch():
+        await mission._run_tool_calls(bot, calls, {})
+
+    cases["tool.dispatch[3 coordinate calls]"] = _sync(dispatch)
+
+    # ---------- Discord ----------
+    for size in (500, 5_000, 50_000):
+        text = ("Agent, dit is HQ. " * (size // 18 + 1))[:size]
+
+        def split(loops, text=text):
+            for _ in range(loops):
+                _split(text)
+
+        cases[f"discord._split[{size}]"] = split
+
+    # ---------- Geo ----------
+    here = Location(latitude=50.85, longitude=4.35)
+    there = Location(latitude=50.9, longitude=4.42)
+
+    def distance(loops):
+        for _ in range(loops):
+            here.distance_to(there)
+
+    def bearing(loops):
+        for _ in range(loops):
+            here.bearing_to(there)
+
+    def random_location(loops):
+        for _ in range(loops):
+            random_location_at_distance(50.85, 4.35, 5.0)
+
+    cases["geo.distance_to"] = distance
+    cases["geo.bearing_to"] = bearing
+    cases["geo.random_location_at_distance"] = random_location
+    return cases
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> bool:
+    """Print de verschillen met een eerdere run; False bij een regressie."""
+    ok = True
+    print(f"\n{'benchmark':45} {'oud (ns)':>12} {'nieuw (ns)':>12} {'verschil':>9}")
+    for name, result in results["benchmarks"].items():
+        old = baseline.get("benchmarks", {}).get(name)
+        if old is None:
+            print(f"{name:45} {'-':>12} {result['ns_per_op']:>12.1f} {'nieuw':>9}")
+            continue
+        change = (result["ns_per_op"] / old["ns_per_op"] - 1) * 100
+        flag = ""
+        if change > threshold:
+            flag = "  <-- trager"
+            ok = False
+        print(
+            f"{name:45} {old['ns_per_op']:>12.1f} {result['ns_per_op']:>12.1f}"
+            f" {change:>+8.1f}%{flag}"
+        )
+    return ok
+
+
+def main(args) -> int:
+    results = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "benchmarks": {},
+    }
+    for name, func in benchmarks().items():
+        if args.filter not in name:
+            continue
+        result = measure(func, args.min_time, args.repeat)
+        results["benchmarks"][name] = result
+        print(f"{name:45} {result['ns_per_op']:>12.1f} ns/op")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if not compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    configure_env()
+    sys.exit(main(arguments))
@@ -1,10 +1,13 @@
 """FastAPI API voor GPT Chat Service."""
 
+import asyncio
+import math
 import os
 
 from fastapi import FastAPI, Security
 from fastapi.exceptions import HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.security import (
     APIKeyHeader,
     APIKeyQuery,
@@ -12,7 +15,23 @@ from fastapi.security import (
     HTTPBearer,
 )
 
-from .models import ChatRequest, ChatResponse
+from ..game.log_reader import parse_ts, read_logs
+from ..game.logger import get_log_writer
+from ..game.mission_cache import get_mission_cache
+from ..game.models.mission import Mission
+from ..game.prompt_registry import get_prompt_registry
+from ..game.turns import mission_turn
+from ..openai_service.scheduler import SchedulerBusy
+from ..openai_service.transport import CircuitOpen, breaker
+from ..telemetry.metrics import REGISTRY
+from .models import (
+    ChatRequest,
+    ChatResponse,
+    MissionChatRequest,
+    MissionChatResponse,
+    MissionUsageResponse,
+)
+from .sse import SSEListener
 
 # ---------- Config ----------
 API_KEYS: list[str] = os.getenv("API_KEYS", "").split(",")  # comma separated
@@ -23,6 +42,19 @@ api_key_header = APIKeyHeader(name="x-api-key", auto_error=False)
 app = FastAPI(title="GPT Chat Service", version="0.1.0")
 security = HTTPBearer(auto_error=False)
 
+
+# Bij een losse API (zonder bot) moet de API zelf de prompts herladen; als de
+# app gemount is in app.py doet de bot dat
+@app.on_event("startup")
+async def _startup():
+    get_prompt_registry().start_watching()
+
+
+@app.on_event("shutdown")
+async def _shutdown():
+    await get_prompt_registry().stop_watching()
+
+
 # --------- Middleware ----------
 # CORS (pas origins aan of laat leeg voor lokaal)
 ALLOWED_ORIGINS = (
@@ -66,8 +98,132 @@ async def health():
     return {"ok": True}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics(api_key: str = Security(get_api_key)):
+    """Expose metrics in the Prometheus text format."""
+    return PlainTextResponse(
+        REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 @app.post("/chat", response_model=ChatResponse)
 async def chat(req: ChatRequest, api_key: str = Security(get_api_key)):
     """Send a message to the GPT model and return the response."""
     reply = req.message
     return ChatResponse(reply=reply)
+
+
+@app.get("/logs")
+async def logs(
+    top_n: int = 10,
+    channel: str | None = None,
+    sender: str | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    api_key: str = Security(get_api_key),
+):
+    """Return the last N game log entries, optionally filtered."""
+    try:
+        since_ts, until_ts = parse_ts(since), parse_ts(until)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid timestamp: {e}")
+    await get_log_writer().flush()
+    return await asyncio.to_thread(
+        read_logs, top_n, channel=channel, sender=sender, since=since_ts, until=until_ts
+    )
+
+
+# Lopende gestreamde beurten (houdt een referentie vast tot ze klaar zijn)
+_background_turns: set[asyncio.Task] = set()
+
+
+async def _get_mission(mission: str) -> Mission:
+    try:
+        return await get_mission_cache().get(mission)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Mission {mission} not found")
+
+
+def _unavailable(error: SchedulerBusy | CircuitOpen) -> HTTPException:
+    """503 met Retry-After voor een volle wachtrij of een open circuit breaker."""
+    if isinstance(error, CircuitOpen):
+        detail = "HQ cannot reach OpenAI, try again later"
+        retry_after = max(math.ceil(breaker.retry_after), 1)
+    else:
+        detail = "HQ is busy, try again shortly"
+        retry_after = 1
+    return HTTPException(
+        status_code=503, detail=detail, headers={"Retry-After": str(retry_after)}
+    )
+
+
+def _payload(req: MissionChatRequest) -> str:
+    return f"{req.sender}: {req.message}" if req.sender else req.message
+
+
+@app.post("/missions/{mission}/chat", response_model=MissionChatResponse)
+async def mission_chat(
+    mission: str, req: MissionChatRequest, api_key: str = Security(get_api_key)
+):
+    """Send a message to the current stage bot of a mission."""
+    m = await _get_mission(mission)
+    try:
+        async with mission_turn(m.name):
+            reply = await m.chat_with_current_stage_bot(_payload(req))
+    except (SchedulerBusy, CircuitOpen) as e:
+        raise _unavailable(e)
+    return MissionChatResponse(reply=reply, stage=m.stage.value)
+
+
+@app.get("/missions/{mission}/usage", response_model=MissionUsageResponse)
+async def mission_usage(mission: str, api_key: str = Security(get_api_key)):
+    """Return token usage and estimated cost of a mission, per stage, bot and model."""
+    m = await _get_mission(mission)
+    return MissionUsageResponse(
+        mission=m.name,
+        total_tokens=m.tokens_used,
+        cost=sum(entry.cost for entry in m.usage),
+        budget=m.budget,
+        over_budget=m.over_budget,
+        usage=m.usage,
+    )
+
+
+@app.post("/missions/{mission}/chat/stream")
+async def mission_chat_stream(
+    mission: str, req: MissionChatRequest, api_key: str = Security(get_api_key)
+):
+    """Like /chat, but stream tokens and tool calls as server-sent events."""
+    m = await _get_mission(mission)
+    if breaker.retry_after > 0:
+        # Open breaker: meteen weigeren, voordat de stream begint
+        raise _unavailable(CircuitOpen("OpenAI is tijdelijk onbereikbaar"))
+    listener = SSEListener()
+
+    async def run_turn():
+        try:
+            async with mission_turn(m.name):
+                reply = await m.chat_with_current_stage_bot(
+                    _payload(req), listener=listener
+                )
+            listener.emit("done", {"reply": reply, "stage": m.stage.value})
+        except (SchedulerBusy, CircuitOpen) as e:
+            error = _unavailable(e)
+            listener.emit(
+                "error",
+                {
+                    "detail": error.detail,
+                    "status": error.status_code,
+                    "retry_after": int(error.headers["Retry-After"]),  # type: ignore[index]
+                },
+            )
+        except Exception as e:
+            listener.emit("error", {"detail": str(e)})
+        finally:
+            listener.close()
+
+    # De beurt loopt door als de client de verbinding verbreekt
+    task = asyncio.create_task(run_turn())
+    _background_turns.add(task)
+    task.add_done_callback(_background_turns.discard)
+    return StreamingResponse(listener.events(), media_type="text/event-stream")
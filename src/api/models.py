@@ -2,6 +2,8 @@
 
 from pydantic import BaseModel
 
+from ..game.models.usage import Usage
+
 
 # ---------- Models ----------
 class ChatRequest(BaseModel):
@@ -14,3 +16,28 @@ class ChatResponse(BaseModel):
     """Response model for chat replies."""
 
     reply: str
+
+
+class MissionChatRequest(BaseModel):
+    """Request model for a chat turn with the current stage bot of a mission."""
+
+    message: str
+    sender: str | None = None
+
+
+class MissionChatResponse(BaseModel):
+    """Response model for a mission chat turn."""
+
+    reply: str | None
+    stage: str
+
+
+class MissionUsageResponse(BaseModel):
+    """Response model for the token usage and estimated cost of a mission."""
+
+    mission: str
+    total_tokens: int
+    cost: float
+    budget: int
+    over_budget: bool
+    usage: list[Usage]
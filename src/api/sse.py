@@ -0,0 +1,43 @@
+"""Server-sent events voor gestreamde bot-beurten."""
+
+import asyncio
+import json
+
+from ..game.turn_listener import TurnListener
+
+
+def format_event(event: str, data) -> str:
+    """Formatteer één server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+class SSEListener(TurnListener):
+    """Zet de gebeurtenissen van een bot-beurt in een wachtrij als SSE-berichten."""
+
+    def __init__(self):
+        self.queue: asyncio.Queue[str | None] = asyncio.Queue()
+
+    def emit(self, event: str, data):
+        """Zet een event in de wachtrij."""
+        self.queue.put_nowait(format_event(event, data))
+
+    def close(self):
+        """Markeer het einde van de stream."""
+        self.queue.put_nowait(None)
+
+    async def on_text_delta(self, delta: str) -> None:
+        self.emit("token", {"text": delta})
+
+    async def on_tool_call(self, name: str, arguments: str) -> None:
+        self.emit("tool_call", {"name": name, "arguments": arguments})
+
+    async def on_tool_result(self, name: str, output: str) -> None:
+        self.emit("tool_result", {"name": name, "output": output})
+
+    async def events(self):
+        """Async generator met de SSE-berichten tot het einde van de stream."""
+        while True:
+            item = await self.queue.get()
+            if item is None:
+                return
+            yield item
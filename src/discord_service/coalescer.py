@@ -0,0 +1,166 @@
+"""Samenvoegen van berichtenstromen per kanaal tot één bot-beurt."""
+
+import asyncio
+import logging
+import os
+import typing
+from dataclasses import dataclass, field
+
+from ..game.turn_listener import TurnListener
+from ..telemetry.metrics import Counter
+
+log = logging.getLogger("hq-bot")
+logging.basicConfig(level=logging.INFO)
+
+# Seconden na het eerste bericht waarin volgende berichten worden samengevoegd
+COALESCE_WINDOW = float(os.getenv("COALESCE_WINDOW", "1.0"))
+# Een beurt die nog op de wachtrij wacht afbreken en herstarten als er nieuwe berichten komen
+COALESCE_SUPERSEDE = os.getenv("COALESCE_SUPERSEDE", "0") == "1"
+
+COALESCED_MESSAGES = Counter(
+    "hq_coalesced_messages_total",
+    "Berichten die met een ander bericht in één beurt zijn samengevoegd.",
+)
+SUPERSEDED_TURNS = Counter(
+    "hq_superseded_turns_total",
+    "Beurten die voor hun eerste verzoek zijn afgebroken voor nieuwe berichten.",
+)
+
+RunTurn = typing.Callable[[typing.Any, str, "TurnGuard | None"], typing.Awaitable[None]]
+
+
+class TurnGuard(TurnListener):
+    """Houdt bij of een beurt al iets naar OpenAI verstuurd heeft en stuurt gebeurtenissen door.
+
+    Zolang de beurt nog op een plek in de wachtrij wacht, staat er niets in het
+    gesprek en is er geen verbruik; dan kan ze nog veilig worden afgebroken.
+    Eenmaal verstuurd zou afbreken de regels dubbel in het gesprek zetten en het
+    verbruik van de ronde verliezen. ``inner`` is de luisteraar die de
+    gebeurtenissen krijgt.
+    """
+
+    def __init__(self):
+        self.inner: TurnListener | None = None
+        self.committed = False
+
+    async def on_request(self) -> None:
+        self.committed = True
+        if self.inner is not None:
+            await self.inner.on_request()
+
+    async def on_text_delta(self, delta: str) -> None:
+        self.committed = True
+        if self.inner is not None:
+            await self.inner.on_text_delta(delta)
+
+    async def on_tool_call(self, name: str, arguments: str) -> None:
+        self.committed = True
+        if self.inner is not None:
+            await self.inner.on_tool_call(name, arguments)
+
+    async def on_tool_result(self, name: str, output: str) -> None:
+        if self.inner is not None:
+            await self.inner.on_tool_result(name, output)
+
+
+@dataclass
+class _Burst:
+    context: typing.Any = None
+    lines: list[str] = field(default_factory=list)
+    inflight: list[str] = field(default_factory=list)
+    timer: asyncio.Task | None = None
+    turn: asyncio.Task | None = None
+    guard: TurnGuard | None = None
+    superseded: bool = False
+
+
+class MessageCoalescer:
+    """Voegt berichten per kanaal samen en draait er één beurt voor.
+
+    Het eerste bericht van een burst opent een venster van ``window`` seconden;
+    alles wat in dat venster binnenkomt gaat mee in dezelfde beurt. Berichten die
+    binnenkomen terwijl een beurt loopt, gaan samen in de volgende beurt. Met
+    ``supersede`` wordt een beurt die nog niets naar OpenAI verstuurd heeft (bv.
+    omdat ze in de wachtrij van de scheduler staat) afgebroken en opnieuw
+    gestart met de samengevoegde invoer.
+    """
+
+    def __init__(
+        self,
+        run_turn: RunTurn,
+        window: float = COALESCE_WINDOW,
+        supersede: bool = COALESCE_SUPERSEDE,
+    ):
+        self.run_turn = run_turn
+        self.window = window
+        self.supersede = supersede
+        self._bursts: dict[typing.Hashable, _Burst] = {}
+
+    def add(self, key: typing.Hashable, line: str, context: typing.Any) -> None:
+        """Voeg een bericht toe aan de burst van een kanaal.
+
+        ``context`` wordt samen met de payload doorgegeven aan ``run_turn``;
+        het laatst ontvangen context wint.
+        """
+        burst = self._bursts.setdefault(key, _Burst())
+        burst.lines.append(line)
+        burst.context = context
+        if burst.turn is not None:
+            if (
+                self.supersede
+                and burst.guard is not None
+                and not burst.guard.committed
+                and not burst.superseded
+            ):
+                log.info("Nieuwe berichten in %s; lopende beurt wordt herstart", key)
+                burst.superseded = True
+                burst.turn.cancel()
+            return
+        if burst.timer is None:
+            burst.timer = asyncio.create_task(self._dispatch_later(key, burst))
+
+    async def _dispatch_later(self, key: typing.Hashable, burst: _Burst):
+        await asyncio.sleep(self.window)
+        burst.timer = None
+        self._dispatch(key, burst)
+
+    def _dispatch(self, key: typing.Hashable, burst: _Burst):
+        lines, burst.lines = burst.lines, []
+        if len(lines) > 1:
+            COALESCED_MESSAGES.inc(len(lines) - 1)
+        burst.inflight = lines
+        burst.superseded = False
+        burst.guard = TurnGuard() if self.supersede else None
+        burst.turn = asyncio.create_task(self._run(key, burst, "\n".join(lines)))
+
+    async def _run(self, key: typing.Hashable, burst: _Burst, payload: str):
+        try:
+            await self.run_turn(burst.context, payload, burst.guard)
+        except asyncio.CancelledError:
+            if not burst.superseded:
+                raise
+            SUPERSEDED_TURNS.inc()
+            burst.lines = burst.inflight + burst.lines
+        except Exception as e:
+            log.error("Fout bij beurt voor %s: %s", key, e)
+        finally:
+            burst.turn = None
+            burst.inflight = []
+        if burst.lines:
+            # Wat tijdens de beurt binnenkwam heeft al lang genoeg gewacht
+            self._dispatch(key, burst)
+        elif burst.timer is None:
+            self._bursts.pop(key, None)
+
+    async def close(self):
+        """Stop alle wachtende en lopende beurten."""
+        tasks = [
+            task
+            for burst in self._bursts.values()
+            for task in (burst.timer, burst.turn)
+            if task is not None
+        ]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._bursts.clear()
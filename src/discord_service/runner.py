@@ -1,21 +1,49 @@
 """Discord bot runner for HQ."""
 
 import logging
+import os
 import typing
-from asyncio import Lock
+from contextlib import nullcontext
 
 import discord
 from discord import Intents
 
 from ..game.admin import handle_command, new_mission
-from ..game.logger import log_message
-from ..game.models.mission import Mission
-from .service import DISCORD_TOKEN, send_message_to_channel, set_client
+from ..game.logger import log_message, start_log_writer, stop_log_writer
+from ..game.mission_cache import get_mission_cache
+from ..game.models.mission import MissionStage, format_round_trips
+from ..game.persistence import get_save_scheduler
+from ..game.prompt_registry import get_prompt_registry
+from ..game.reply_cache import get_reply_cache
+from ..game.turn_listener import TurnListener
+from ..game.turns import mission_turn
+from ..openai_service.scheduler import SchedulerBusy, admin_priority, get_scheduler
+from ..openai_service.transport import CircuitOpen
+from ..telemetry.metrics import Counter
+from ..telemetry.tracing import span
+from .coalescer import MessageCoalescer, TurnGuard
+from .service import (
+    DISCORD_TOKEN,
+    StreamingReply,
+    get_client,
+    send_message_to_channel,
+    set_client,
+)
 
 log = logging.getLogger("hq-bot")
 logging.basicConfig(level=logging.INFO)
 
-lock = Lock()
+# Bot-antwoorden in missiekanalen streamen via berichtedits
+STREAM_REPLIES = os.getenv("DISCORD_STREAM_REPLIES", "1") == "1"
+# Berichten met enkel coördinaten in het beacon-kanaal direct beantwoorden, zonder bot
+BEACON_FAST_PATH = os.getenv("BEACON_FAST_PATH", "1") == "1"
+
+BEACON_FAST_REPLIES = Counter(
+    "hq_beacon_fast_replies_total",
+    "Beacon-berichten met coördinaten beantwoord zonder OpenAI-beurt.",
+)
+
+_coalescer: MessageCoalescer | None = None
 
 
 async def start_bot():
@@ -24,11 +52,61 @@ async def start_bot():
         log.warning("Bot niet gestart: ontbrekende ENV (DISCORD_TOKEN)")
         return
 
-    intents = Intents.default()
-    intents.message_content = True
-    client = discord.Client(intents=intents)
+    client = await create_bot()
+    try:
+        await client.start(DISCORD_TOKEN)
+    finally:
+        await stop_bot()
+
+
+async def create_bot(client: discord.Client | None = None) -> discord.Client:
+    """Bouw de client met alle event handlers, zonder verbinding te maken.
+
+    Een eigen ``client`` (bv. een nep-gateway in benchmarks) moet ``event``
+    en ``get_guild`` ondersteunen.
+    """
+    if client is None:
+        intents = Intents.default()
+        intents.message_content = True
+        client = discord.Client(intents=intents)
     set_client(client)
-    missions: dict[str, Mission] = {}
+    await start_log_writer()
+    prompts = get_prompt_registry()
+    prompts.start_watching()
+    missions = get_mission_cache()
+
+    async def run_turn(context, payload: str, guard: TurnGuard | None):
+        mission, channel = context
+        reply = StreamingReply(channel) if STREAM_REPLIES else None
+        listener: TurnListener | None = reply
+        if guard is not None:
+            guard.inner = reply
+            listener = guard
+        async with mission_turn(mission.name):
+            try:
+                async with channel.typing():
+                    response = await mission.chat_with_current_stage_bot(
+                        payload, listener=listener
+                    )
+            except SchedulerBusy:
+                log.warning(
+                    "OpenAI-wachtrij vol; beurt voor %s geweigerd", mission.name
+                )
+                response = "⏳ HQ is druk bezig. Probeer het zo opnieuw."
+            except CircuitOpen:
+                response = (
+                    "📡 Geen verbinding met HQ. Probeer het over een minuut opnieuw."
+                )
+            except Exception as e:
+                log.error("Fout bij chat met bot %s: %s", mission.name, e)
+                response = f"❌ Fout bij chat met bot {mission.name}: {e}"
+        if reply is not None:
+            await reply.finish(response)
+        elif response:
+            await send_message_to_channel(response, channel)
+
+    global _coalescer
+    coalescer = _coalescer = MessageCoalescer(run_turn)
 
     @client.event
     async def on_ready():
@@ -38,6 +116,12 @@ async def start_bot():
 
     @client.event
     async def on_message(message: discord.Message):
+        # Admin-commando's krijgen voorrang bij de OpenAI-scheduler
+        is_admin = getattr(message.channel, "name", None) == "admin"
+        with span("discord_message"), admin_priority() if is_admin else nullcontext():
+            await handle_message(message)
+
+    async def handle_message(message: discord.Message):
         content = message.content.strip()
         sender = message.author.display_name
 
@@ -60,69 +144,117 @@ async def start_bot():
             message_content = content.split(" ", 1)[1] if " " in content else ""
             if command == "!new":
                 mission = await new_mission(message_content)
-                missions[mission.name.lower()] = mission
+                missions.put(mission)
                 response = f"✅ Nieuwe missie '{mission.name}' aangemaakt."
             elif command == "!dump":
-                mission = missions.get(message_content.lower())
-                if mission is None:
-                    try:
-                        mission = Mission.load(mission_ref=message_content.lower())
-                    except FileNotFoundError:
-                        log.error("Missie niet gevonden voor dump %s", message_content)
-                        await send_message_to_channel(
-                            f"❌ Missie niet gevonden voor dump {message_content}.",
-                            message.channel,
-                        )
-                        return
-                    missions[message_content.lower()] = mission
+                try:
+                    mission = await missions.get(message_content)
+                except FileNotFoundError:
+                    log.error("Missie niet gevonden voor dump %s", message_content)
+                    await send_message_to_channel(
+                        f"❌ Missie niet gevonden voor dump {message_content}.",
+                        message.channel,
+                    )
+                    return
                 response = mission.model_dump_json(indent=2)
             elif command == "!resetconv":
                 mission_name, stagename = message_content.split(" ", 1)
-                mission = missions.get(mission_name.lower())
-                if mission is None:
+                try:
+                    mission = await missions.get(mission_name)
+                except FileNotFoundError:
+                    log.error("Missie niet gevonden voor resetconv %s", message_content)
+                    await send_message_to_channel(
+                        f"❌ Missie niet gevonden voor resetconv {message_content}.",
+                        message.channel,
+                    )
+                    return
+                await mission.reset_stage_conversation(stagename)
+                response = f"✅ Gesprek voor stage '{stagename}' van missie '{mission.name}' gereset."
+            elif command == "!cache":
+                response = ", ".join(f"{k}: {v}" for k, v in missions.stats().items())
+                response += "\nAntwoordcache: " + ", ".join(
+                    f"{k}: {v}" for k, v in get_reply_cache().stats().items()
+                )
+            elif command == "!prompts":
+                response = "\n".join(
+                    f"{name}: {version}" for name, version in prompts.versions().items()
+                )
+            elif command in ("!usage", "!budget"):
+                mission_name, _, value = message_content.partition(" ")
+                try:
+                    mission = await missions.get(mission_name)
+                except FileNotFoundError:
+                    log.error("Missie niet gevonden voor %s %s", command, mission_name)
+                    await send_message_to_channel(
+                        f"❌ Missie niet gevonden voor {command} {mission_name}.",
+                        message.channel,
+                    )
+                    return
+                if command == "!budget" and value.strip():
+                    budget = value.strip()
                     try:
-                        mission = Mission.load(mission_ref=mission_name.lower())
-                    except FileNotFoundError:
-                        log.error(
-                            "Missie niet gevonden voor resetconv %s", message_content
-                        )
+                        tokens = None if budget == "default" else int(budget)
+                    except ValueError:
+                        tokens = -1
+                    if tokens is not None and tokens < 0:
                         await send_message_to_channel(
-                            f"❌ Missie niet gevonden voor resetconv {message_content}.",
+                            f"❌ Ongeldig budget '{budget}': geef een aantal tokens "
+                            "(0 = onbeperkt) of 'default'.",
                             message.channel,
                         )
                         return
-                    missions[mission.name.lower()] = mission
-                await mission.reset_stage_conversation(stagename)
-                response = f"✅ Gesprek voor stage '{stagename}' van missie '{mission.name}' gereset."
-
+                    mission.set_token_budget(tokens)
+                response = mission.format_usage()
+            elif command == "!scheduler":
+                response = (
+                    "\n".join(
+                        f"{model}: " + ", ".join(f"{k}: {v}" for k, v in stats.items())
+                        for model, stats in get_scheduler().stats().items()
+                    )
+                    or "Nog geen OpenAI-verkeer."
+                )
+            elif command == "!rounds":
+                response = format_round_trips() or "Nog geen beurten."
             else:
                 response = await handle_command(command, message_content)
 
         elif hasattr(channel.category, "name") and not message.author.bot:  # type: ignore
             category_name = typing.cast(str, channel.category.name)  # type: ignore
-            mission = missions.get(category_name)
-            if mission is None:
-                try:
-                    mission = Mission.load(mission_ref=category_name)
-                except FileNotFoundError:
-                    log.error("Missie niet gevonden voor categorie %s", category_name)
-                    await send_message_to_channel(
-                        f"❌ Missie niet gevonden voor categorie {category_name}.",
-                        message.channel,
-                    )
+            try:
+                mission = await missions.get(category_name)
+            except FileNotFoundError:
+                log.error("Missie niet gevonden voor categorie %s", category_name)
+                await send_message_to_channel(
+                    f"❌ Missie niet gevonden voor categorie {category_name}.",
+                    message.channel,
+                )
+                return
+            if BEACON_FAST_PATH and channel_name == MissionStage.BEACON.value:
+                # Geen beurt en dus geen lock nodig: de positie wordt alleen
+                # toegevoegd aan de geschiedenis
+                response = mission.answer_beacon_ping(sender, content)
+                if response is not None:
+                    BEACON_FAST_REPLIES.inc()
+                    await send_message_to_channel(response, message.channel)
                     return
-                missions[category_name] = mission
-            payload = f"{sender}: {content}"
-            async with lock:
-                try:
-                    async with message.channel.typing():
-                        response = await mission.chat_with_current_stage_bot(payload)
-                except Exception as e:
-                    log.error("Fout bij chat met bot %s: %s", mission.name, e)
-                    response = f"❌ Fout bij chat met bot {mission.name}: {e}"
+            # Bursts in hetzelfde kanaal worden samen één beurt
+            coalescer.add(channel.id, f"{sender}: {content}", (mission, channel))
+            return
 
         if response:
             await send_message_to_channel(response, message.channel)
             return
 
-    await client.start(DISCORD_TOKEN)
+    return client
+
+
+async def stop_bot():
+    """Sluit de bot af en schrijf openstaande gegevens weg."""
+    client = get_client()
+    if client is not None and not client.is_closed():
+        await client.close()
+    if _coalescer is not None:
+        await _coalescer.close()
+    await get_prompt_registry().stop_watching()
+    await get_save_scheduler().flush_all()
+    await stop_log_writer()
@@ -1,16 +1,23 @@
 """Discord utility functions for HQ."""
 
+import asyncio
 import logging
 import os
 import textwrap
+import time
 
 import discord
 
+from ..game.turn_listener import TurnListener
+from ..telemetry.tracing import span
+
 log = logging.getLogger("hq-bot")
 logging.basicConfig(level=logging.INFO)
 
 DISCORD_TOKEN = os.getenv("DISCORD_TOKEN")
 DISCORD_CHANNEL_ID = int(os.getenv("DISCORD_CHANNEL_ID", "0"))
+# Minimale tijd (s) tussen twee edits van een gestreamd bericht
+DISCORD_EDIT_INTERVAL = float(os.getenv("DISCORD_EDIT_INTERVAL", "1.0"))
 
 client: discord.Client | None = None  # Module-level client variable
 
@@ -37,8 +44,9 @@ async def send_message_to_channel(message: str, channel):
     """Stuur een bericht naar een Discord-kanaal, splits indien nodig."""
     try:
         # log.info("Sending message to channel %s: %s", channel.id, message)
-        for chunk in _split(message):
-            await channel.send(chunk)
+        with span("discord_send"):
+            for chunk in _split(message):
+                await channel.send(chunk)
     except Exception as e:
         log.error("Error sending message to channel %s: %s", channel.id, e)
 
@@ -49,3 +57,93 @@ def _split(text: str, limit: int = 2000):
     return textwrap.wrap(
         text, width=limit, replace_whitespace=False, drop_whitespace=False
     )
+
+
+def _split_stable(text: str, limit: int = 2000) -> list[str]:
+    """Splits tekst in stukken van max. ``limit`` tekens, bij voorkeur op witruimte.
+
+    Een stuk ligt vast zodra er tekst voorbij de grens staat, zodat al verstuurde
+    berichten niet verschuiven terwijl de tekst aangroeit.
+    """
+    chunks = []
+    while len(text) > limit:
+        cut = max(text.rfind("\n", 0, limit), text.rfind(" ", 0, limit))
+        if cut <= 0:
+            cut = limit
+        chunks.append(text[:cut])
+        text = text[cut:].lstrip("\n ")
+    chunks.append(text)
+    return chunks
+
+
+class StreamingReply(TurnListener):
+    """Toont een bot-antwoord terwijl het binnenkomt, via gethrottlede berichtedits.
+
+    Het eerste bericht gaat uit zodra de eerste tekst binnen is; daarna wordt
+    hooguit eens per ``interval`` seconden bewerkt en bij 2000 tekens wordt
+    doorgeschreven in een nieuw bericht.
+    """
+
+    def __init__(
+        self, channel, interval: float = DISCORD_EDIT_INTERVAL, limit: int = 2000
+    ):
+        self.channel = channel
+        self.interval = interval
+        self.limit = limit
+        self.text = ""
+        self.messages: list[discord.Message] = []
+        self._sent: list[str] = []
+        self._last_sync = 0.0
+        self._pending: asyncio.Task | None = None
+        self._sync_lock = asyncio.Lock()
+
+    @property
+    def started(self) -> bool:
+        """Geef aan of er al een bericht is verstuurd."""
+        return bool(self.messages)
+
+    async def on_text_delta(self, delta: str) -> None:
+        self.text += delta
+        if not self.text.strip():
+            return
+        wait = self._last_sync + self.interval - time.monotonic()
+        if not self.messages or wait <= 0:
+            await self._sync()
+        elif self._pending is None:
+            self._pending = asyncio.create_task(self._delayed_sync(wait))
+
+    async def _delayed_sync(self, wait: float):
+        await asyncio.sleep(wait)
+        self._pending = None
+        await self._sync()
+
+    async def _sync(self):
+        async with self._sync_lock:
+            self._last_sync = time.monotonic()
+            chunks = [c for c in _split_stable(self.text.strip(), self.limit) if c]
+            try:
+                for i, chunk in enumerate(chunks):
+                    if i < len(self.messages):
+                        if self._sent[i] != chunk:
+                            await self.messages[i].edit(content=chunk)
+                            self._sent[i] = chunk
+                    else:
+                        self.messages.append(await self.channel.send(chunk))
+                        self._sent.append(chunk)
+                while len(self.messages) > len(chunks):
+                    await self.messages.pop().delete()
+                    self._sent.pop()
+            except Exception as e:
+                log.error(
+                    "Error streaming message to channel %s: %s", self.channel.id, e
+                )
+
+    async def finish(self, final_text: str | None):
+        """Zorg dat de berichten exact het definitieve antwoord tonen."""
+        if self._pending is not None:
+            self._pending.cancel()
+            self._pending = None
+        if final_text is not None:
+            self.text = final_text
+        if self.text.strip():
+            await self._sync()
@@ -0,0 +1,147 @@
+"""Herkennen van coördinaten in berichten van spelers, zonder LLM.
+
+Ondersteunt decimale graden (``50.8503, 4.3517``, ``50,8503 4,3517``,
+``N 50.8503° E 4.3517°``) en graden/minuten/seconden (``50°51'01"N 4°21'06"E``,
+ook met decimale minuten zoals ``N 50°51.017' E 4°21.100'``). Nederlandse
+windrichtingen (Z, O) worden ook herkend. Decimale graden zonder windrichting
+moeten minstens drie decimalen hebben, zodat gewone getallen niet als positie
+gelden.
+"""
+
+import re
+
+from .models.location import Location
+
+_HEMISPHERES = {"N": "N", "Z": "S", "S": "S", "E": "E", "O": "E", "W": "W"}
+
+# Komma, puntkomma, slash of witruimte; direct na een windrichting mag het ontbreken
+_SEPARATOR = r"(?:\s*[,;/]\s*|\s+|(?<=[NSZnsz]))"
+
+_DECIMAL = re.compile(
+    r"""^\s*
+    (?P<lat_pre>[NSZ])?\s*(?P<lat>[-+]?\d{1,2}(?:\.\d+)?)\s*°?\s*(?P<lat_post>[NSZ])?
+    """
+    + _SEPARATOR
+    + r"""
+    (?P<lon_pre>[EOW])?\s*(?P<lon>[-+]?\d{1,3}(?:\.\d+)?)\s*°?\s*(?P<lon_post>[EOW])?
+    \s*$""",
+    re.VERBOSE | re.IGNORECASE,
+)
+
+
+def _dms(prefix: str, hemispheres: str) -> str:
+    return rf"""
+    (?P<{prefix}_pre>[{hemispheres}])?\s*
+    (?P<{prefix}_deg>\d{{1,3}})\s*(?:°|\s)\s*
+    (?P<{prefix}_min>\d{{1,2}}(?:\.\d+)?)\s*'?\s*
+    (?:(?P<{prefix}_sec>\d{{1,2}}(?:\.\d+)?)\s*(?:"|'')?)?\s*
+    (?P<{prefix}_post>[{hemispheres}])?
+    """
+
+
+_DMS = re.compile(
+    r"^\s*" + _dms("lat", "NSZ") + _SEPARATOR + _dms("lon", "EOW") + r"\s*$",
+    re.VERBOSE | re.IGNORECASE,
+)
+
+# Minimum aantal decimalen per getal als er geen windrichting bij staat (~100 m)
+_MIN_DECIMALS = 3
+
+# Typografische accenten en graadtekens zoals kompas-apps ze kopiëren
+_PRIMES = str.maketrans(
+    {"′": "'", "’": "'", "‘": "'", "″": '"', "“": '"', "”": '"', "º": "°"}
+)
+
+
+def _hemisphere(match: re.Match, prefix: str) -> str | None:
+    """De windrichting van een as, of None als die ontbreekt."""
+    pre, post = match.group(f"{prefix}_pre"), match.group(f"{prefix}_post")
+    if pre and post:
+        raise ValueError("Windrichting dubbel opgegeven")
+    letter = pre or post
+    return _HEMISPHERES[letter.upper()] if letter else None
+
+
+def _decimals(number: str) -> int:
+    return len(number.partition(".")[2])
+
+
+def _parse_decimal(text: str) -> Location | None:
+    if "." not in text:
+        # Decimale komma's (50,8503 4,3517); zonder punt kan de komma geen
+        # scheidingsteken tussen twee decimale getallen zijn
+        text = re.sub(r"(\d),(\d)", r"\1.\2", text)
+    match = _DECIMAL.match(text)
+    if match is None or "." not in match.group("lat") + match.group("lon"):
+        # Twee gehele getallen zijn eerder een score of aantal dan een positie
+        return None
+    lat_dir, lon_dir = _hemisphere(match, "lat"), _hemisphere(match, "lon")
+    if (
+        lat_dir is None
+        and lon_dir is None
+        and not (
+            _decimals(match.group("lat")) >= _MIN_DECIMALS
+            and _decimals(match.group("lon")) >= _MIN_DECIMALS
+        )
+    ):
+        # Zonder windrichting zijn ook getallen als "2.5 3" of "1.5, 2" te grof
+        return None
+    latitude, longitude = float(match.group("lat")), float(match.group("lon"))
+    if lat_dir is not None:
+        if latitude < 0:
+            return None
+        latitude = -latitude if lat_dir == "S" else latitude
+    if lon_dir is not None:
+        if longitude < 0:
+            return None
+        longitude = -longitude if lon_dir == "W" else longitude
+    if abs(latitude) > 90 or abs(longitude) > 180:
+        return None
+    return Location(latitude=latitude, longitude=longitude)
+
+
+def _dms_parts(match: re.Match, prefix: str) -> tuple[int, int, float] | None:
+    degrees = int(match.group(f"{prefix}_deg"))
+    minutes = float(match.group(f"{prefix}_min"))
+    seconds = float(match.group(f"{prefix}_sec") or 0)
+    if match.group(f"{prefix}_sec") and minutes != int(minutes):
+        return None
+    # Decimale minuten omrekenen naar hele minuten en seconden
+    seconds += (minutes - int(minutes)) * 60
+    if minutes >= 60 or seconds >= 60:
+        return None
+    return degrees, int(minutes), seconds
+
+
+def _parse_dms(text: str) -> Location | None:
+    match = _DMS.match(text)
+    if match is None:
+        return None
+    lat_dir, lon_dir = _hemisphere(match, "lat"), _hemisphere(match, "lon")
+    lat, lon = _dms_parts(match, "lat"), _dms_parts(match, "lon")
+    # Zonder windrichtingen zijn losse getallen te dubbelzinnig
+    if lat_dir is None or lon_dir is None or lat is None or lon is None:
+        return None
+    if lat[0] > 90 or lon[0] > 180:
+        return None
+    return Location.from_coordinates(
+        lat_deg=lat[0],
+        lat_min=lat[1],
+        lat_sec=lat[2],  # type: ignore[arg-type]
+        lat_dir=lat_dir,  # type: ignore[arg-type]
+        lon_deg=lon[0],
+        lon_min=lon[1],
+        lon_sec=lon[2],  # type: ignore[arg-type]
+        lon_dir=lon_dir,  # type: ignore[arg-type]
+    )
+
+
+def parse_coordinates(text: str) -> Location | None:
+    """Retourneer de locatie als het bericht uitsluitend uit coördinaten bestaat."""
+    text = text.translate(_PRIMES).strip()
+    if not text or len(text) > 64:
+        return None
+    try:
+        return _parse_decimal(text) or _parse_dms(text)
+    except ValueError:
+        return None
@@ -0,0 +1,260 @@
+"""Efficiënt lezen en doorzoeken van het game log."""
+
+import bisect
+import datetime as dt
+import json
+import os
+import threading
+from array import array
+from pathlib import Path
+
+from .logger import get_log_path
+
+_BLOCK_SIZE = 64 * 1024
+
+
+def parse_ts(value: str | float | dt.datetime | None) -> float | None:
+    """Zet een ISO-timestamp (of datetime/epoch) om naar epoch-seconden."""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        value = dt.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=dt.timezone.utc)
+    return value.timestamp()
+
+
+def tail_lines(path: Path, n: int) -> list[bytes]:
+    """Lees de laatste N regels van een bestand door terug te zoeken vanaf het einde."""
+    if n <= 0:
+        return []
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        data = b""
+        # Eén newline extra nodig om de N-de regel van achteren compleet te hebben
+        while pos > 0 and data.count(b"\n") <= n:
+            step = min(_BLOCK_SIZE, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+    lines = [line for line in data.split(b"\n") if line.strip()]
+    return lines[-n:]
+
+
+def _decode(raw: bytes) -> dict | None:
+    """Een logregel als dict, of None als de regel onleesbaar is (bv. half geschreven)."""
+    try:
+        entry = json.loads(raw)
+    except ValueError:
+        return None
+    return entry if isinstance(entry, dict) else None
+
+
+class GameLogIndex:
+    """Offset-index naast het game log, met filters op kanaal, afzender en tijd.
+
+    De index wordt bijgehouden in een sidecar-bestand (``game_log.idx``) en
+    incrementeel aangevuld met regels die sinds de vorige query zijn bijgeschreven.
+    """
+
+    def __init__(self, log_path: Path):
+        self.log_path = log_path
+        self.index_path = log_path.with_suffix(".idx")
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._index_pos = 0  # gelezen bytes van de sidecar
+        self._log_end = 0  # einde van de laatst geïndexeerde logregel
+        self.offsets = array("q")
+        self.lengths = array("I")
+        self.timestamps = array("d")
+        self.channel_ids = array("I")
+        self.sender_ids = array("I")
+        self._names: list[str] = []
+        self._name_ids: dict[str, int] = {}
+        self.by_channel: dict[int, list[int]] = {}
+        self.by_sender: dict[int, list[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def _name_id(self, name: str) -> int:
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = self._name_ids[name] = len(self._names)
+            self._names.append(name)
+        return name_id
+
+    def _add(self, offset: int, length: int, ts: float, channel: str, sender: str):
+        entry = len(self.offsets)
+        channel_id = self._name_id(channel)
+        sender_id = self._name_id(sender)
+        self.offsets.append(offset)
+        self.lengths.append(length)
+        self.timestamps.append(ts)
+        self.channel_ids.append(channel_id)
+        self.sender_ids.append(sender_id)
+        self.by_channel.setdefault(channel_id, []).append(entry)
+        self.by_sender.setdefault(sender_id, []).append(entry)
+        self._log_end = offset + length
+
+    def refresh(self):
+        """Lees nieuwe sidecar-regels en indexeer nieuw bijgeschreven logregels."""
+        with self._lock:
+            self._refresh()
+
+    def _refresh(self):
+        if not self.log_path.exists():
+            self._reset()
+            return
+        log_size = self.log_path.stat().st_size
+        if log_size < self._log_end:
+            # Log is ingekort of vervangen: opnieuw opbouwen
+            self._reset()
+            self.index_path.unlink(missing_ok=True)
+
+        if self.index_path.exists():
+            with open(self.index_path, "rb") as f:
+                f.seek(self._index_pos)
+                for raw in f:
+                    if not raw.endswith(b"\n"):
+                        break
+                    offset, length, ts, channel, sender = json.loads(raw)
+                    self._add(offset, length, ts, channel, sender)
+                    self._index_pos += len(raw)
+            if log_size < self._log_end:
+                self._reset()
+                self.index_path.unlink(missing_ok=True)
+
+        if log_size == self._log_end:
+            return
+
+        # Indexeer de logregels die nog niet in de sidecar staan
+        new_rows = []
+        with open(self.log_path, "rb") as f:
+            f.seek(self._log_end)
+            offset = self._log_end
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break
+                # Onleesbare regels of tijdstippen krijgen het tijdstip van de
+                # vorige regel, zodat de tijdstippen gesorteerd blijven voor bisect
+                previous_ts = self.timestamps[-1] if self.timestamps else 0.0
+                entry = _decode(raw)
+                if entry is None:
+                    row = [offset, len(raw), previous_ts, "", ""]
+                else:
+                    try:
+                        ts = parse_ts(entry.get("ts"))
+                    except (ValueError, TypeError, AttributeError):
+                        ts = None
+                    row = [
+                        offset,
+                        len(raw),
+                        previous_ts if ts is None else ts,
+                        str(entry.get("channel", "")),
+                        str(entry.get("sender", "")),
+                    ]
+                self._add(*row)
+                new_rows.append(json.dumps(row, ensure_ascii=False) + "\n")
+                offset += len(raw)
+        if new_rows:
+            data = "".join(new_rows).encode("utf-8")
+            with open(self.index_path, "ab") as f:
+                f.write(data)
+            self._index_pos += len(data)
+
+    def _candidates(self, channel: str | None, sender: str | None) -> list[int] | range:
+        lists = []
+        for name, mapping in ((channel, self.by_channel), (sender, self.by_sender)):
+            if name is None:
+                continue
+            name_id = self._name_ids.get(name)
+            if name_id is None:
+                return []
+            lists.append(mapping.get(name_id, []))
+        if not lists:
+            return range(len(self.offsets))
+        return min(lists, key=len)
+
+    def query(
+        self,
+        channel: str | None = None,
+        sender: str | None = None,
+        since: str | float | dt.datetime | None = None,
+        until: str | float | dt.datetime | None = None,
+        limit: int = 10,
+    ) -> list[dict]:
+        """Retourneer de laatste ``limit`` log entries die aan de filters voldoen."""
+        with self._lock:
+            self._refresh()
+            candidates = self._candidates(channel, sender)
+            channel_id = self._name_ids.get(channel) if channel is not None else None
+            sender_id = self._name_ids.get(sender) if sender is not None else None
+            since_ts, until_ts = parse_ts(since), parse_ts(until)
+
+            start, end = 0, len(candidates)
+            if since_ts is not None:
+                start = bisect.bisect_left(
+                    candidates, since_ts, key=self.timestamps.__getitem__
+                )
+            if until_ts is not None:
+                end = bisect.bisect_right(
+                    candidates, until_ts, key=self.timestamps.__getitem__
+                )
+
+            selected = []
+            for i in range(end - 1, start - 1, -1):
+                if len(selected) >= limit:
+                    break
+                entry = candidates[i]
+                if channel_id is not None and self.channel_ids[entry] != channel_id:
+                    continue
+                if sender_id is not None and self.sender_ids[entry] != sender_id:
+                    continue
+                selected.append(entry)
+            selected.reverse()
+            return self._read_entries(selected)
+
+    def _read_entries(self, entries: list[int]) -> list[dict]:
+        results = []
+        with open(self.log_path, "rb") as f:
+            for entry in entries:
+                f.seek(self.offsets[entry])
+                decoded = _decode(f.read(self.lengths[entry]))
+                if decoded is not None:
+                    results.append(decoded)
+        return results
+
+
+_indexes: dict[Path, GameLogIndex] = {}
+
+
+def get_log_index(log_path: Path | None = None) -> GameLogIndex:
+    """Retourneer de (gedeelde) index voor het game log."""
+    path = log_path or get_log_path()
+    index = _indexes.get(path)
+    if index is None:
+        index = _indexes[path] = GameLogIndex(path)
+    return index
+
+
+def read_logs(
+    top_n: int = 10,
+    channel: str | None = None,
+    sender: str | None = None,
+    since: str | float | None = None,
+    until: str | float | None = None,
+) -> list[dict]:
+    """Haal de laatste N log entries op, optioneel gefilterd."""
+    log_path = get_log_path()
+    if not log_path.exists():
+        return []
+    if channel is None and sender is None and since is None and until is None:
+        entries = (_decode(line) for line in tail_lines(log_path, top_n))
+        return [entry for entry in entries if entry is not None]
+    return get_log_index(log_path).query(
+        channel=channel, sender=sender, since=since, until=until, limit=top_n
+    )
@@ -1,10 +1,27 @@
 """Logging functionaliteit voor het spel."""
 
+import asyncio
 import datetime as dt
 import json
+import logging
 import os
 from pathlib import Path
 
+from ..telemetry.metrics import REGISTRY
+
+log = logging.getLogger("game-log")
+logging.basicConfig(level=logging.INFO)
+
+# Maximale grootte van de wachtrij; bij een volle wachtrij vallen berichten weg
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# Maximaal aantal regels per schrijfactie
+LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", "500"))
+
+
+def get_log_path() -> Path:
+    """Retourneer het pad van het game log bestand."""
+    return Path(os.getenv("DATA_DIR", "data")) / "game_log.jsonl"
+
 
 def append_jsonl(path: Path, obj: dict):
     """Append een object als JSONL naar het bestand op het opgegeven pad."""
@@ -12,6 +29,120 @@ def append_jsonl(path: Path, obj: dict):
         f.write(json.dumps(obj, ensure_ascii=False) + "\n")
 
 
+def append_batch(path: Path, entries: list[dict]):
+    """Schrijf een batch log entries in één keer naar het bestand."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+class GameLogWriter:
+    """Schrijft log entries vanuit een wachtrij in batches weg, buiten de event loop."""
+
+    def __init__(self, maxsize: int = LOG_QUEUE_SIZE, batch_size: int = LOG_BATCH_SIZE):
+        self.batch_size = batch_size
+        self._queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=maxsize)
+        self._task: asyncio.Task | None = None
+        self.dropped = 0
+        self.written = 0
+        self.batches = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """Aantal entries dat nog wacht om weggeschreven te worden."""
+        return self._queue.qsize()
+
+    @property
+    def running(self) -> bool:
+        """Geef aan of de achtergrondtaak draait."""
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start de achtergrondtaak op de huidige event loop."""
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    def put(self, entry: dict) -> bool:
+        """Zet een entry in de wachtrij; retourneer False als hij wegvalt."""
+        try:
+            self._queue.put_nowait(entry)
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await asyncio.to_thread(append_batch, get_log_path(), batch)
+                self.written += len(batch)
+                self.batches += 1
+            except Exception as e:
+                self.dropped += len(batch)
+                log.error(
+                    "Fout bij het wegschrijven van %d logregels: %s", len(batch), e
+                )
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def flush(self):
+        """Wacht tot alle entries in de wachtrij zijn weggeschreven."""
+        if self.running:
+            await self._queue.join()
+
+    async def stop(self):
+        """Schrijf de wachtrij leeg en stop de achtergrondtaak."""
+        await self.flush()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict[str, int]:
+        """Retourneer tellers van de log pipeline."""
+        return {
+            "queue_depth": self.queue_depth,
+            "written": self.written,
+            "batches": self.batches,
+            "dropped": self.dropped,
+        }
+
+
+_writer: GameLogWriter | None = None
+
+
+def get_log_writer() -> GameLogWriter:
+    """Retourneer de gedeelde log writer."""
+    global _writer
+    if _writer is None:
+        _writer = GameLogWriter()
+    return _writer
+
+
+REGISTRY.add_collector("hq_log_writer", lambda: get_log_writer().stats())
+
+
+async def start_log_writer():
+    """Start de gedeelde log writer op de huidige event loop."""
+    get_log_writer().start()
+
+
+async def stop_log_writer():
+    """Schrijf openstaande log entries weg en stop de log writer."""
+    if _writer is not None:
+        await _writer.stop()
+
+
 def log_message(channel: str, sender: str, content: str):
     """Log een bericht van een speler naar het game log bestand."""
     log_entry = {
@@ -20,6 +151,11 @@ def log_message(channel: str, sender: str, content: str):
         "sender": sender,
         "content": content,
     }
-    log_path = Path(os.getenv("DATA_DIR", "data")) / "game_log.jsonl"
+    writer = get_log_writer()
+    if writer.running:
+        writer.put(log_entry)
+        return
+    # Geen draaiende writer (bv. in scripts): schrijf direct weg
+    log_path = get_log_path()
     log_path.parent.mkdir(parents=True, exist_ok=True)
     append_jsonl(log_path, log_entry)
@@ -0,0 +1,162 @@
+"""Begrensde cache van geladen missies."""
+
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from ..telemetry.metrics import REGISTRY
+from .models.mission import Mission
+from .storage import get_store
+from .turns import is_busy, mission_key
+
+log = logging.getLogger("mission-cache")
+logging.basicConfig(level=logging.INFO)
+
+# Maximaal aantal missies in het geheugen
+MISSION_CACHE_SIZE = int(os.getenv("MISSION_CACHE_SIZE", "64"))
+# Seconden zonder gebruik waarna een missie uit de cache mag (0 = nooit)
+MISSION_CACHE_TTL = float(os.getenv("MISSION_CACHE_TTL", "21600"))
+# Minimaal aantal seconden tussen twee controles op wijzigingen in de opslag
+MISSION_CACHE_CHECK_INTERVAL = float(os.getenv("MISSION_CACHE_CHECK_INTERVAL", "5"))
+
+
+@dataclass
+class _Entry:
+    mission: Mission
+    last_used: float
+    checked_at: float
+
+
+class MissionCache:
+    """LRU/TTL-cache van missies, gesleuteld op de genormaliseerde missienaam.
+
+    Missies die een openstaande save hebben of waarvoor een beurt loopt worden
+    nooit verwijderd of herladen, zodat er geen twee versies naast elkaar bestaan.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = MISSION_CACHE_SIZE,
+        ttl: float = MISSION_CACHE_TTL,
+        check_interval: float = MISSION_CACHE_CHECK_INTERVAL,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.check_interval = check_interval
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._loading: dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.reloads = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, mission_ref: str) -> bool:
+        return mission_key(mission_ref) in self._entries
+
+    def _pinned(self, key: str, mission: Mission) -> bool:
+        return is_busy(key) or mission.has_pending_save
+
+    def _expired(self, entry: _Entry, now: float) -> bool:
+        return bool(self.ttl) and now - entry.last_used > self.ttl
+
+    async def _changed_on_disk(self, key: str, entry: _Entry) -> bool:
+        """Controleer (buiten de event loop, hooguit elke ``check_interval`` s) of
+        de missie in de opslag een andere versie heeft dan in het geheugen."""
+        now = time.monotonic()
+        if now - entry.checked_at < self.check_interval:
+            return False
+        entry.checked_at = now
+        expected = entry.mission.version
+        store = get_store()
+        version = await store.run(store.version, key)
+        # Een eigen save tijdens het wachten verandert de versie ook; dan is de
+        # missie in het geheugen juist de nieuwste
+        return version != expected and entry.mission.version == expected
+
+    def put(self, mission: Mission) -> Mission:
+        """Voeg een (nieuwe) missie toe aan de cache."""
+        key = mission_key(mission.name)
+        now = time.monotonic()
+        self._entries[key] = _Entry(mission, now, now)
+        self._entries.move_to_end(key)
+        self._evict()
+        return mission
+
+    async def get(self, mission_ref: str) -> Mission:
+        """Haal een missie op uit de cache of laad hem; FileNotFoundError als hij niet bestaat."""
+        key = mission_key(mission_ref)
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None and not self._pinned(key, entry.mission):
+            if self._expired(entry, now):
+                del self._entries[key]
+                self.evictions += 1
+                entry = None
+            elif (
+                await self._changed_on_disk(key, entry)
+                and self._entries.get(key) is entry
+                and not self._pinned(key, entry.mission)
+            ):
+                log.info("Missie %s is gewijzigd in de opslag; herladen", key)
+                del self._entries[key]
+                self.reloads += 1
+                entry = None
+        if entry is not None:
+            self.hits += 1
+            entry.last_used = now
+            self._entries.move_to_end(key)
+            return entry.mission
+
+        self.misses += 1
+        task = self._loading.get(key)
+        if task is None:
+            task = self._loading[key] = asyncio.create_task(Mission.aload(key))
+            task.add_done_callback(lambda _: self._loading.pop(key, None))
+        mission = await task
+        if key not in self._entries:
+            self.put(mission)
+        return self._entries[key].mission
+
+    def _evict(self):
+        now = time.monotonic()
+        for key, entry in list(self._entries.items()):
+            if len(self._entries) <= self.maxsize and not self._expired(entry, now):
+                continue
+            if self._pinned(key, entry.mission):
+                continue
+            del self._entries[key]
+            self.evictions += 1
+
+    def invalidate(self, mission_ref: str):
+        """Verwijder een missie uit de cache."""
+        self._entries.pop(mission_key(mission_ref), None)
+
+    def stats(self) -> dict[str, int]:
+        """Retourneer tellers van de cache."""
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "reloads": self.reloads,
+        }
+
+
+_cache: MissionCache | None = None
+
+
+def get_mission_cache() -> MissionCache:
+    """Retourneer de gedeelde missiecache."""
+    global _cache
+    if _cache is None:
+        _cache = MissionCache()
+    return _cache
+
+
+REGISTRY.add_collector("hq_mission_cache", lambda: get_mission_cache().stats())
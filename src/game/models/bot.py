@@ -1,9 +1,16 @@
 """Modellen voor AI-gestuurde bots in het spel."""
 
 import logging
+from functools import partial
 from typing import Literal
 
+from pydantic import PrivateAttr
+
 from ...openai_service.client import client as openai_client
+from ...openai_service.scheduler import get_scheduler
+from ...openai_service.transport import call_with_retries
+from ..prompt_registry import get_prompt_registry
+from ..tool_registry import ToolSpec, registry
 from .participant import Participant
 
 log = logging.getLogger("bot")
@@ -11,28 +18,65 @@ logging.basicConfig(level=logging.INFO)
 
 
 def get_system_prompt(path) -> str:
-    """Lees het systeemprompt uit een bestand."""
-    with open(path, "r", encoding="utf-8") as f:
-        return f.read()
+    """Haal het systeemprompt op uit het promptregister (of lees het bestand)."""
+    try:
+        return get_prompt_registry().get(path).text
+    except KeyError:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
 
 
 class Bot(Participant):
     """Class voor een AI-gestuurde bot."""
 
     system_prompt: str
+    prompt_version: str | None = None
     conversation_id: str | None = None
     type: Literal["bot"] = "bot"
     openai_model: str = "gpt-4o"
 
     tool_names: list[str] | None = None
 
+    @classmethod
+    def from_prompt(cls, prompt_name: str, **kwargs) -> "Bot":
+        """Maak een bot met een systeemprompt uit het promptregister."""
+        prompt = get_prompt_registry().get(prompt_name)
+        return cls(system_prompt=prompt.text, prompt_version=prompt.version, **kwargs)
+
+    _tool_specs: dict[str, ToolSpec] | None = PrivateAttr(default=None)
+    _tool_schemas: list[dict] | None = PrivateAttr(default=None)
+
+    def resolve_tools(self):
+        """Zoek de tools van de bot eenmalig op in het register."""
+        self._tool_specs = registry.resolve(self.tool_names or [])
+        self._tool_schemas = [spec.schema for spec in self._tool_specs.values()]
+
+    @property
+    def tool_specs(self) -> dict[str, ToolSpec]:
+        """Dispatch-tabel van de tools van deze bot."""
+        if self._tool_specs is None:
+            self.resolve_tools()
+        return self._tool_specs  # type: ignore[return-value]
+
+    @property
+    def tools(self) -> list[dict]:
+        """Tool-schema's van deze bot voor de Responses API."""
+        if self._tool_schemas is None:
+            self.resolve_tools()
+        return self._tool_schemas  # type: ignore[return-value]
+
     async def ensure_conversation(self):
         """Zorg ervoor dat er een gesprek bestaat voor de bot."""
         if not self.conversation_id:
             log.info("Creating conversation for bot %s", self.name)
-            conv = await openai_client.conversations.create(
-                items=[{"role": "system", "content": self.system_prompt}],
-            )
+            async with get_scheduler().slot("conversations", estimate=0):
+                conv = await call_with_retries(
+                    partial(
+                        openai_client.conversations.create,
+                        items=[{"role": "system", "content": self.system_prompt}],
+                    ),
+                    stage=self.name,
+                )
             log.info("Conversation created with ID %s for bot %s", conv.id, self.name)
             self.conversation_id = conv.id
             # self.save()
@@ -1,9 +1,14 @@
 import math
 import random
+from types import SimpleNamespace
 from typing import Literal
 
+import numpy as np
 from pydantic import BaseModel
 
+# Earth radius in kilometers
+EARTH_RADIUS_KM = 6371.0
+
 
 class Location(BaseModel):
     """Class representing a location in the game."""
@@ -50,21 +55,10 @@ class Location(BaseModel):
 
     def bearing_to(self, other: "Location") -> float:
         """Calculate the bearing in degrees to another Location."""
-        lat1 = math.radians(self.latitude)
-        lat2 = math.radians(other.latitude)
-        diff_long = math.radians(other.longitude - self.longitude)
-
-        x = math.sin(diff_long) * math.cos(lat2)
-        y = math.cos(lat1) * math.sin(lat2) - (
-            math.sin(lat1) * math.cos(lat2) * math.cos(diff_long)
+        return _bearing_deg(
+            _MATH, self.latitude, self.longitude, other.latitude, other.longitude
         )
 
-        initial_bearing = math.atan2(x, y)
-        initial_bearing_deg = math.degrees(initial_bearing)
-        compass_bearing = (initial_bearing_deg + 360) % 360
-
-        return compass_bearing
-
 
 def random_location_at_distance(
     latitude: float, longitude: float, distance_km: float = 10.0
@@ -73,48 +67,132 @@ def random_location_at_distance(
     Returns a random Location at a specified distance (in km) from the given latitude/longitude.
     Uses a random bearing.
     """
-    # Earth radius in kilometers
-    R = 6371.0
+    # Pick a random bearing (angle in radians)
+    bearing = random.uniform(0.0, 2.0 * math.pi)
+    new_lat, new_lon = _destination(_MATH, latitude, longitude, distance_km, bearing)
+    return Location(latitude=new_lat, longitude=new_lon)
 
-    # Convert latitude and longitude from degrees to radians
-    lat_rad = math.radians(latitude)
-    lon_rad = math.radians(longitude)
 
-    # Central angle (distance in radians)
-    ang_dist = distance_km / R
+def haversine_km(lat1, lon1, lat2, lon2):
+    return _haversine_km(_MATH, lat1, lon1, lat2, lon2)
 
-    # Pick a random bearing (angle in radians)
-    bearing = random.uniform(0.0, 2.0 * math.pi)
 
-    # Calculate new latitude
-    new_lat_rad = math.asin(
-        math.sin(lat_rad) * math.cos(ang_dist)
-        + math.cos(lat_rad) * math.sin(ang_dist) * math.cos(bearing)
+# ---------- Batchfuncties (NumPy) ----------
+# Breedte- en lengtegraden als arrays (of scalars) in graden; vormen worden
+# gebroadcast zoals in NumPy, dus zonder Python-lussen over de punten.
+
+
+def haversine_km_many(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Haversine-afstanden (km) tussen twee reeksen punten, elementsgewijs."""
+    return _haversine_km(np, *_as_arrays(lat1, lon1, lat2, lon2))
+
+
+def bearing_deg_many(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Kompaskoersen (graden) van de eerste naar de tweede reeks punten."""
+    return _bearing_deg(np, *_as_arrays(lat1, lon1, lat2, lon2))
+
+
+def distances_to(latitudes, longitudes, target: Location) -> np.ndarray:
+    """Afstanden (m) van veel punten tot één locatie, bv. alle spelers tot HQ."""
+    return (
+        haversine_km_many(latitudes, longitudes, target.latitude, target.longitude)
+        * 1000
     )
 
-    # Calculate new longitude
-    new_lon_rad = lon_rad + math.atan2(
-        math.sin(bearing) * math.sin(ang_dist) * math.cos(lat_rad),
-        math.cos(ang_dist) - math.sin(lat_rad) * math.sin(new_lat_rad),
+
+def bearings_to(latitudes, longitudes, target: Location) -> np.ndarray:
+    """Koersen (graden) van veel punten naar één locatie."""
+    return bearing_deg_many(latitudes, longitudes, target.latitude, target.longitude)
+
+
+def pairwise_distances(latitudes, longitudes) -> np.ndarray:
+    """N x N-matrix met de afstanden (m) tussen alle punten, bv. de spreiding van een team."""
+    lat, lon = _as_arrays(latitudes, longitudes)
+    return (
+        haversine_km_many(lat[:, None], lon[:, None], lat[None, :], lon[None, :]) * 1000
     )
 
-    # Convert back to degrees
-    new_lat = math.degrees(new_lat_rad)
 
-    # Normalize longitude to [-180, 180]
-    new_lon = (math.degrees(new_lon_rad) + 540.0) % 360.0 - 180.0
+def pairwise_bearings(latitudes, longitudes) -> np.ndarray:
+    """N x N-matrix met de koers (graden) van punt i naar punt j."""
+    lat, lon = _as_arrays(latitudes, longitudes)
+    return bearing_deg_many(lat[:, None], lon[:, None], lat[None, :], lon[None, :])
 
-    return Location(latitude=new_lat, longitude=new_lon)
 
+def random_locations_at_distance(
+    latitude: float,
+    longitude: float,
+    distance_km: float = 10.0,
+    count: int = 1,
+    rng: np.random.Generator | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """``count`` willekeurige punten (breedtes, lengtes) op een afstand van een punt."""
+    rng = rng or np.random.default_rng()
+    bearings = rng.uniform(0.0, 2.0 * math.pi, size=count)
+    return _destination(np, latitude, longitude, distance_km, bearings)
 
-def haversine_km(lat1, lon1, lat2, lon2):
-    R = 6371.0
-    phi1, phi2 = math.radians(lat1), math.radians(lat2)
-    dphi = math.radians(lat2 - lat1)
-    dlambda = math.radians(lon2 - lon1)
+
+# ---------- Formules ----------
+# Eén implementatie voor scalars en arrays: ``xp`` is ``np`` voor arrays of
+# ``_MATH`` voor losse floats. De scalaire methodes van Location blijven zo even
+# snel als voorheen; NumPy-ufuncs zijn op één waarde juist trager dan math.
+
+_MATH = SimpleNamespace(
+    radians=math.radians,
+    degrees=math.degrees,
+    sin=math.sin,
+    cos=math.cos,
+    sqrt=math.sqrt,
+    arcsin=math.asin,
+    arctan2=math.atan2,
+)
+
+
+def _as_arrays(*values) -> list[np.ndarray]:
+    return [np.asarray(value, dtype=np.float64) for value in values]
+
+
+def _haversine_km(xp, lat1, lon1, lat2, lon2):
+    phi1, phi2 = xp.radians(lat1), xp.radians(lat2)
+    dphi = xp.radians(lat2 - lat1)
+    dlambda = xp.radians(lon2 - lon1)
 
     a = (
-        math.sin(dphi / 2.0) ** 2
-        + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2.0) ** 2
+        xp.sin(dphi / 2.0) ** 2
+        + xp.cos(phi1) * xp.cos(phi2) * xp.sin(dlambda / 2.0) ** 2
     )
-    return 2.0 * R * math.atan2(math.sqrt(a), math.sqrt(1.0 - a))
+    return 2.0 * EARTH_RADIUS_KM * xp.arctan2(xp.sqrt(a), xp.sqrt(1.0 - a))
+
+
+def _bearing_deg(xp, lat1, lon1, lat2, lon2):
+    lat1 = xp.radians(lat1)
+    lat2 = xp.radians(lat2)
+    diff_long = xp.radians(lon2 - lon1)
+
+    x = xp.sin(diff_long) * xp.cos(lat2)
+    y = xp.cos(lat1) * xp.sin(lat2) - (xp.sin(lat1) * xp.cos(lat2) * xp.cos(diff_long))
+
+    initial_bearing_deg = xp.degrees(xp.arctan2(x, y))
+    return (initial_bearing_deg + 360) % 360
+
+
+def _destination(xp, latitude, longitude, distance_km, bearing):
+    """Het punt op ``distance_km`` van een startpunt, in richting ``bearing`` (radialen)."""
+    lat_rad = xp.radians(latitude)
+    lon_rad = xp.radians(longitude)
+
+    # Central angle (distance in radians)
+    ang_dist = distance_km / EARTH_RADIUS_KM
+
+    new_lat_rad = xp.arcsin(
+        xp.sin(lat_rad) * xp.cos(ang_dist)
+        + xp.cos(lat_rad) * xp.sin(ang_dist) * xp.cos(bearing)
+    )
+    new_lon_rad = lon_rad + xp.arctan2(
+        xp.sin(bearing) * xp.sin(ang_dist) * xp.cos(lat_rad),
+        xp.cos(ang_dist) - xp.sin(lat_rad) * xp.sin(new_lat_rad),
+    )
+
+    # Normalize longitude to [-180, 180]
+    new_lon = (xp.degrees(new_lon_rad) + 540.0) % 360.0 - 180.0
+    return xp.degrees(new_lat_rad), new_lon
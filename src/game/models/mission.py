@@ -1,18 +1,33 @@
+import asyncio
 import enum
+import itertools
 import json
 import logging
 import os
-from pathlib import Path
+import time
+from functools import partial
 from typing import Literal, Self
 
 import discord
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 
 from ...discord_service.service import get_guild
 from ...openai_service.client import client as openai_client
-from .bot import Bot, get_system_prompt
+from ...openai_service.scheduler import get_scheduler
+from ...openai_service.transport import call_with_retries
+from ...telemetry.metrics import Counter, Histogram
+from ...telemetry.tracing import span
+from ..coordinates import parse_coordinates
+from ..persistence import get_save_scheduler
+from ..positions import POSITION_NEAR_M, PositionHistory
+from ..reply_cache import get_reply_cache
+from ..storage import MissionStore, get_store
+from ..tool_registry import ToolArgumentError, registry, tool
+from ..turn_listener import TurnListener
+from .bot import Bot
 from .location import Location
 from .player import Player
+from .usage import Usage
 
 log = logging.getLogger("mission")
 logging.basicConfig(level=logging.INFO)
@@ -26,6 +41,144 @@ class MissionStage(enum.Enum):
     COMPLETED = "completed"
 
 
+NEXT_STAGE = {
+    MissionStage.INTAKE: MissionStage.BRIEFING,
+    MissionStage.BRIEFING: MissionStage.BEACON,
+    MissionStage.BEACON: MissionStage.EXFIL,
+    MissionStage.EXFIL: MissionStage.COMPLETED,
+}
+
+# Fases met een eigen bot (zie load_stage_bot); alleen die worden klaargezet
+BOT_STAGES = {
+    MissionStage.INTAKE,
+    MissionStage.BRIEFING,
+    MissionStage.BEACON,
+    MissionStage.EXFIL,
+}
+
+# Wanneer de volgende fase wordt klaargezet: "start" (zodra een fase begint),
+# "ready" (zodra de huidige fase voltooid is) of "off"
+PREWARM_NEXT_STAGE = os.getenv("PREWARM_NEXT_STAGE", "start")
+
+# Maximaal aantal Responses-rondes per beurt; in de laatste ronde zijn tools uit
+MAX_TOOL_ROUNDS = max(1, int(os.getenv("MAX_TOOL_ROUNDS", "5")))
+
+# Standaard tokenbudget per missie (0 = geen budget); per missie aan te passen met !budget
+MISSION_TOKEN_BUDGET = int(os.getenv("MISSION_TOKEN_BUDGET", "0"))
+# Fractie van het budget waarbij gewaarschuwd wordt
+TOKEN_BUDGET_WARN_RATIO = float(os.getenv("TOKEN_BUDGET_WARN_RATIO", "0.8"))
+# Goedkoper model voor missies die hun budget op hebben
+FALLBACK_MODEL = os.getenv("FALLBACK_MODEL", "gpt-5-mini")
+
+OPENAI_TOKENS = Counter(
+    "hq_openai_tokens_total",
+    "Verbruikte OpenAI-tokens.",
+    ("model", "stage", "kind"),
+)
+OPENAI_COST = Counter(
+    "hq_openai_cost_usd_total",
+    "Geschatte OpenAI-kosten in USD.",
+    ("model", "stage"),
+)
+
+# Toestandsversies van missies, uniek over alle (her)geladen missie-objecten heen
+_STATE_VERSIONS = itertools.count(1)
+
+TURN_ROUND_TRIPS = Histogram(
+    "hq_turn_round_trips",
+    "Aantal responses.create-rondes per beurt.",
+    ("stage",),
+    buckets=tuple(range(1, MAX_TOOL_ROUNDS + 1)),
+)
+
+
+def format_round_trips() -> str:
+    """Vat het aantal rondes per beurt samen, per fase."""
+    lines = []
+    for labels, series in TURN_ROUND_TRIPS.samples():
+        if not series.count:
+            continue
+        spread = " ".join(
+            f"{int(bound)}:{n}" for bound, n in zip(series.buckets, series.counts) if n
+        )
+        lines.append(
+            f"{labels['stage']}: {series.count} beurten, "
+            f"gem. {series.sum / series.count:.2f} rondes ({spread})"
+        )
+    return "\n".join(lines)
+
+
+# Parameters van tools die coördinaten accepteren (decimaal of DMS)
+COORDINATE_PARAMETERS = {
+    "type": "object",
+    "properties": {
+        "latitude_decimal": {
+            "type": "number",
+            "description": "Latitude in decimal degrees.",
+        },
+        "longitude_decimal": {
+            "type": "number",
+            "description": "Longitude in decimal degrees.",
+        },
+        "latitude_dms": {
+            "type": "object",
+            "properties": {
+                "degrees": {"type": "integer", "description": "Degrees"},
+                "minutes": {"type": "integer", "description": "Minutes"},
+                "seconds": {"type": "integer", "description": "Seconds"},
+                "direction": {
+                    "type": "string",
+                    "enum": ["N", "S"],
+                    "description": "Direction",
+                },
+            },
+            "required": ["degrees", "minutes", "seconds", "direction"],
+            "description": "Latitude in DMS format.",
+        },
+        "longitude_dms": {
+            "type": "object",
+            "properties": {
+                "degrees": {"type": "integer", "description": "Degrees"},
+                "minutes": {"type": "integer", "description": "Minutes"},
+                "seconds": {"type": "integer", "description": "Seconds"},
+                "direction": {
+                    "type": "string",
+                    "enum": ["E", "W"],
+                    "description": "Direction",
+                },
+            },
+            "required": ["degrees", "minutes", "seconds", "direction"],
+            "description": "Longitude in DMS format.",
+        },
+    },
+    "required": [],
+}
+
+# Coördinaten plus de speler die ze meldt, zodat de positie bewaard wordt; tools
+# met deze parameters wijzigen dus de missie en zijn niet read-only
+TRACKED_COORDINATE_PARAMETERS = {
+    **COORDINATE_PARAMETERS,
+    "properties": {
+        **COORDINATE_PARAMETERS["properties"],
+        "player": {
+            "type": "string",
+            "description": (
+                "Naam van de afzender van de coördinaten, zoals vóór de dubbele punt "
+                "in het bericht (bv. 'Jan' bij 'Jan: 50.85, 4.35')."
+            ),
+        },
+    },
+}
+
+
+def _write_all(writes: list) -> int | None:
+    """Voer de schrijfacties van een commit na elkaar uit; retourneer de laatste versie."""
+    version = None
+    for write in writes:
+        version = write()
+    return version
+
+
 class Mission(BaseModel):
     """Class representing a mission in the game."""
 
@@ -45,27 +198,102 @@ class Mission(BaseModel):
     mission_context: str | None = None
     mission_objectives: list[str] | None = None
 
-    @classmethod
-    def _save_dir(cls, mission_ref) -> Path:
-        return Path(os.getenv("DATA_DIR", "data")) / mission_ref
+    usage: list[Usage] = []
+    token_budget: int | None = None  # None = MISSION_TOKEN_BUDGET
+    budget_warned: bool = False
 
-    @classmethod
-    def _save_path(cls, name) -> Path:
-        return cls._save_dir(name) / "mission.json"
+    _dirty_all: bool = PrivateAttr(default=False)
+    # Missievelden (gebruik, gesprekken, ...) gewijzigd, spelers niet
+    _dirty_meta: bool = PrivateAttr(default=False)
+    _dirty_players: set[str] = PrivateAttr(default_factory=set)
+    _version: int | None = PrivateAttr(default=None)
+    _prewarm: dict[MissionStage, asyncio.Task] = PrivateAttr(default_factory=dict)
+    # Hoogt op bij elke wijziging waar een bot-antwoord van kan afhangen
+    _state_version: int = PrivateAttr(default_factory=lambda: next(_STATE_VERSIONS))
+    # Positiegeschiedenis; geladen door aload, anders bij het eerste gebruik
+    _positions: PositionHistory | None = PrivateAttr(default=None)
+    # Namen van de tools die de lopende beurt aanriep
+    _turn_tools: set[str] = PrivateAttr(default_factory=set)
 
     def save(self):
-        """Sla de configuratie op."""
-        save_path = self._save_path(self.name)
-        save_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(save_path, "w", encoding="utf-8") as f:
-            f.write(self.model_dump_json(indent=2, ensure_ascii=False))
+        """Markeer de missie als gewijzigd; de save wordt kort daarna weggeschreven."""
+        self._dirty_all = True
+        get_save_scheduler().schedule(self)
+
+    def save_meta(self):
+        """Markeer de missievelden als gewijzigd, zonder de spelers te herschrijven."""
+        self._dirty_meta = True
+        get_save_scheduler().schedule(self)
+
+    def save_player(self, player: Player):
+        """Markeer één speler als gewijzigd, zonder de hele missie te herschrijven."""
+        self._dirty_players.add(player.name)
+        get_save_scheduler().schedule(self)
+
+    async def flush(self):
+        """Schrijf de missie direct weg."""
+        await get_save_scheduler().flush(self)
+
+    def _prepare_commit(self, store: MissionStore):
+        writes = []
+        if store.row_level_players and not self._dirty_all:
+            if self._dirty_meta:
+                data = self.model_dump(mode="json", exclude={"players"})
+                writes.append(partial(store.save_mission_meta, data))
+            if self._dirty_players:
+                players = [
+                    player.model_dump(mode="json")
+                    for player in self.players
+                    if player.name in self._dirty_players
+                ]
+                writes.append(partial(store.upsert_players, self.name, players))
+        if not writes:
+            writes.append(partial(store.save_mission, self.model_dump(mode="json")))
+        self._dirty_all = self._dirty_meta = False
+        self._dirty_players = set()
+        return partial(_write_all, writes)
+
+    async def _commit(self):
+        store = get_store()
+        with span("mission_save"):
+            self._version = await store.run(self._prepare_commit(store))
+
+    def _commit_sync(self):
+        with span("mission_save"):
+            self._version = self._prepare_commit(get_store())()
+
+    def bump_state(self) -> None:
+        """Markeer de speltoestand als gewijzigd; gecachte antwoorden vervallen."""
+        self._state_version = next(_STATE_VERSIONS)
+
+    @property
+    def version(self) -> int | None:
+        """Versie van de opslag bij de laatste load of save van dit object."""
+        return self._version
 
     @classmethod
     def load(cls, mission_ref) -> Self:
-        """Laad een deelnemer vanuit een bestand."""
-        save_path = cls._save_path(mission_ref)
-        with open(save_path, "r", encoding="utf-8") as f:
-            return cls.model_validate_json(f.read())
+        """Laad een missie uit de opslag."""
+        store = get_store()
+        version = store.version(mission_ref)
+        mission = cls.model_validate(store.load_mission(mission_ref))
+        mission._version = version
+        return mission
+
+    @classmethod
+    async def aload(cls, mission_ref) -> Self:
+        """Laad een missie uit de opslag, buiten de event loop."""
+        store = get_store()
+        mission = await store.run(cls.load, mission_ref)
+        # De positiegeschiedenis meteen meeladen (np.load en de grid-index), zodat
+        # de eerste beacon-melding of calculate_*-tool niet op de event loop leest
+        mission._positions = await asyncio.to_thread(PositionHistory.load, mission.name)
+        return mission
+
+    @classmethod
+    def list_active(cls) -> list[str]:
+        """Retourneer de namen van alle missies die nog niet zijn afgerond."""
+        return get_store().list_missions(active_only=True)
 
     async def init_category(self) -> discord.CategoryChannel:
         """Get a Discord category channel by mission ID."""
@@ -84,8 +312,14 @@ class Mission(BaseModel):
         self._category = category
         return category
 
-    async def get_channel(self, channel_name: str) -> discord.TextChannel:
-        """Get a Discord text channel by mission ID and channel name."""
+    async def get_channel(
+        self, channel_name: str, hidden: bool = False
+    ) -> discord.TextChannel:
+        """Get a Discord text channel by mission ID and channel name.
+
+        With ``hidden`` a newly created channel is invisible to @everyone until
+        it is revealed (used to prepare the next stage in advance).
+        """
         if self._category is None:
             await self.init_category()
             if self._category is None:
@@ -93,9 +327,68 @@ class Mission(BaseModel):
         for channel in self._category.text_channels:
             if channel.name == channel_name.lower():
                 return channel
-        channel = await self._category.create_text_channel(name=channel_name)
+        if hidden:
+            guild = self._category.guild
+            channel = await self._category.create_text_channel(
+                name=channel_name,
+                overwrites={
+                    **self._category.overwrites,
+                    guild.default_role: discord.PermissionOverwrite(view_channel=False),
+                },
+            )
+        else:
+            channel = await self._category.create_text_channel(name=channel_name)
         return channel
 
+    @staticmethod
+    async def _reveal_channel(channel: discord.TextChannel) -> None:
+        default_role = channel.guild.default_role
+        if channel.overwrites_for(default_role).view_channel is False:
+            await channel.set_permissions(default_role, overwrite=None)
+
+    async def _provision_stage(
+        self, stage: MissionStage
+    ) -> tuple[discord.TextChannel, Bot]:
+        """Maak het (verborgen) kanaal en de bot met gesprek voor een fase klaar."""
+        channel, bot = await asyncio.gather(
+            self.get_channel(channel_name=stage.value, hidden=True),
+            self._provision_bot(stage),
+        )
+        return channel, bot
+
+    async def _provision_bot(self, stage: MissionStage) -> Bot:
+        bot = self.load_stage_bot(stage=stage)
+        await bot.ensure_conversation()
+        return bot
+
+    def prewarm_stage(self, stage: MissionStage) -> None:
+        """Start het klaarzetten van een fase op de achtergrond."""
+        if stage in self._prewarm or stage in (self._channels or {}):
+            return
+        if stage not in BOT_STAGES:
+            return  # Bv. COMPLETED: geen kanaal of gesprek nodig
+        if get_guild() is None:
+            return  # Geen Discord (bv. alleen API): er valt niets voor te bereiden
+        log.info("Prewarming stage %s of mission %s", stage.value, self.name)
+        task = asyncio.create_task(self._provision_stage(stage))
+        task.add_done_callback(self._log_prewarm_failure)
+        self._prewarm[stage] = task
+
+    def _log_prewarm_failure(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            log.warning(
+                "Prewarm for mission %s failed: %s", self.name, task.exception()
+            )
+
+    def maybe_prewarm_next_stage(self) -> None:
+        """Zet de volgende fase klaar, afhankelijk van PREWARM_NEXT_STAGE."""
+        next_stage = NEXT_STAGE.get(self.stage)
+        if PREWARM_NEXT_STAGE == "off" or next_stage is None:
+            return
+        if PREWARM_NEXT_STAGE == "ready" and not self.is_stage_completed(self.stage)[0]:
+            return
+        self.prewarm_stage(next_stage)
+
     def get_current_stage_bot(
         self,
     ) -> Bot:
@@ -109,14 +402,24 @@ class Mission(BaseModel):
 
     async def init_stage(self, stage: MissionStage) -> None:
         """Initialize the mission to the given stage."""
-        channel = await self.get_channel(channel_name=stage.value)
+        channel: discord.TextChannel | None = None
+        bot: Bot | None = None
+        prewarm = self._prewarm.pop(stage, None)
+        if prewarm is not None:
+            try:
+                channel, bot = await prewarm
+            except Exception:
+                pass  # al gelogd; val terug op direct opbouwen
+        if channel is None or bot is None:
+            channel = await self.get_channel(channel_name=stage.value)
+            bot = await self._provision_bot(stage)
+        await self._reveal_channel(channel)
         if self._channels is None:
             self._channels = {}
         self._channels[stage] = channel
-        bot = self.load_stage_bot(stage=stage)
-        await bot.ensure_conversation()
         self.bots[stage] = bot
         self.stage = stage
+        self.bump_state()
         if stage == MissionStage.INTAKE:
             await channel.send(
                 f"Welkom bij missie {self.name}. Stuur een bericht om te beginnen met de intake."
@@ -137,7 +440,8 @@ class Mission(BaseModel):
             await channel.send(
                 f"Missie {self.name} is nu in de fase: {stage}. Stuur bericht om te beginnen."
             )
-        self.save()
+        await self.flush()
+        self.maybe_prewarm_next_stage()
 
     async def reset_stage_conversation(self, stage_name: str) -> None:
         """Reset the conversation for a given mission stage."""
@@ -145,6 +449,7 @@ class Mission(BaseModel):
         bot = self.bots.get(stage)
         if bot is not None:
             await bot.reset_conversation()
+            self.bump_state()
             self.save()
 
     async def close_stage(self, stage: MissionStage) -> None:
@@ -183,149 +488,340 @@ class Mission(BaseModel):
 
     async def init_next_stage(self) -> None:
         """Initialize the next mission stage."""
-        if self.stage == MissionStage.INTAKE:
-            await self.close_stage(MissionStage.INTAKE)
-            await self.init_stage(MissionStage.BRIEFING)
-        elif self.stage == MissionStage.BRIEFING:
-            await self.close_stage(MissionStage.BRIEFING)
-            await self.init_stage(MissionStage.BEACON)
-        elif self.stage == MissionStage.BEACON:
-            await self.close_stage(MissionStage.BEACON)
-            await self.init_stage(MissionStage.EXFIL)
-        elif self.stage == MissionStage.EXFIL:
-            await self.close_stage(MissionStage.EXFIL)
-            await self.init_stage(MissionStage.COMPLETED)
-        else:
+        next_stage = NEXT_STAGE.get(self.stage)
+        if next_stage is None:
             raise RuntimeError("No next stage available.")
+        # Sluiten en openen raken verschillende kanalen en kunnen tegelijk
+        await asyncio.gather(self.close_stage(self.stage), self.init_stage(next_stage))
 
-    async def chat_with_current_stage_bot(self, message: str) -> str | None:
+    async def chat_with_current_stage_bot(
+        self, message: str, listener: TurnListener | None = None
+    ) -> str | None:
         """Chat with the bot for the current mission stage."""
         bot = self.get_current_stage_bot()
-        response = await self.chat_with_bot(bot, message)
-        self.save()
+        cache = get_reply_cache()
+        key = None
+        if cache.enabled_for(self.stage.value):
+            key = cache.key(self.name, self.stage.value, self._state_version, message)
+            cached = cache.get(key) if key is not None else None
+            if cached is not None:
+                log.info("Cached response for %s: %s", self.name, cached)
+                return cached
+        version = self._state_version
+        self._turn_tools = set()
+        response = await self.chat_with_bot(bot, message, listener=listener)
+        # Alleen antwoorden die enkel op vaste missiegegevens steunen, van beurten
+        # die niets aan de missie veranderden
+        if (
+            key is not None
+            and response is not None
+            and self._state_version == version
+            and cache.cacheable(self._turn_tools)
+        ):
+            cache.put(key, response)
+        # Gebruik en gesprekken; tools die missievelden of spelers wijzigen,
+        # markeren die zelf
+        self.save_meta()
+        self.maybe_prewarm_next_stage()
         return response
 
-    async def chat_with_bot(self, bot: Bot, message: str) -> str | None:
-        """Chat with a specific bot."""
+    async def _create_response(
+        self,
+        bot: Bot,
+        inputs: list,
+        listener: TurnListener | None = None,
+        allow_tools: bool = True,
+        shed: bool = False,
+    ):
+        """Vraag één Responses-ronde aan; met listener wordt de tekst gestreamd.
+
+        Met ``allow_tools=False`` moet het model met tekst antwoorden. Met
+        ``shed`` mag de scheduler de ronde weigeren (SchedulerBusy) als het druk is.
+        """
+        model = self.model_for(bot)
+        kwargs = dict(
+            model=model,
+            conversation=bot.conversation_id,
+            input=inputs,
+            tools=bot.tools,
+        )
+        if bot.tools:
+            kwargs["tool_choice"] = "auto" if allow_tools else "none"
+            kwargs["parallel_tool_calls"] = True
+        async with get_scheduler().slot(model, mission=self.name, shed=shed) as slot:
+            if listener is not None:
+                await listener.on_request()
+            with span("openai_response", model=model, stage=bot.name):
+                if listener is None:
+                    response = await call_with_retries(
+                        partial(openai_client.responses.create, **kwargs),  # type: ignore
+                        stage=bot.name,
+                    )
+                else:
+                    response = await self._stream_response(bot, kwargs, listener)
+            slot.record(response)
+        self.record_usage(bot, model, response)
+        return response
+
+    @staticmethod
+    async def _stream_response(bot: Bot, kwargs: dict, listener: TurnListener):
+        started = False
+
+        async def stream():
+            nonlocal started
+            events = await openai_client.responses.create(**kwargs, stream=True)  # type: ignore
+            response = None
+            async for event in events:
+                if event.type == "response.output_text.delta":
+                    started = True
+                    await listener.on_text_delta(event.delta)
+                elif event.type in (
+                    "response.completed",
+                    "response.incomplete",
+                    "response.failed",
+                ):
+                    response = event.response
+                elif event.type == "error":
+                    raise RuntimeError(f"Streamingfout van OpenAI: {event.message}")
+            if response is None:
+                raise RuntimeError("Stream van OpenAI eindigde zonder response.")
+            return response
+
+        # Opnieuw proberen kan alleen zolang er nog geen tekst is doorgegeven
+        return await call_with_retries(
+            stream, stage=bot.name, retryable=lambda: not started
+        )
+
+    @property
+    def budget(self) -> int:
+        """Het tokenbudget van de missie (0 = onbeperkt)."""
+        return (
+            self.token_budget if self.token_budget is not None else MISSION_TOKEN_BUDGET
+        )
+
+    @property
+    def tokens_used(self) -> int:
+        return sum(entry.total_tokens for entry in self.usage)
+
+    @property
+    def over_budget(self) -> bool:
+        return bool(self.budget) and self.tokens_used >= self.budget
+
+    def model_for(self, bot: Bot) -> str:
+        """Het model voor een call: het model van de bot, of FALLBACK_MODEL boven budget."""
+        return FALLBACK_MODEL if self.over_budget else bot.openai_model
+
+    def record_usage(self, bot: Bot, model: str, response) -> None:
+        """Tel het tokengebruik van een response op bij de missie."""
+        stage = next(
+            (s.value for s, b in self.bots.items() if b is bot), self.stage.value
+        )
+        entry = next(
+            (
+                e
+                for e in self.usage
+                if e.stage == stage and e.bot == bot.name and e.model == model
+            ),
+            None,
+        )
+        if entry is None:
+            entry = Usage(stage=stage, bot=bot.name, model=model)
+            self.usage.append(entry)
+        was_over_budget = self.over_budget
+        before = entry.model_copy()
+        entry.add_response(response)
+
+        for kind, delta in (
+            ("input", entry.input_tokens - before.input_tokens),
+            ("cached_input", entry.cached_input_tokens - before.cached_input_tokens),
+            ("output", entry.output_tokens - before.output_tokens),
+        ):
+            OPENAI_TOKENS.labels(model=model, stage=stage, kind=kind).inc(delta)
+        OPENAI_COST.labels(model=model, stage=stage).inc(entry.cost - before.cost)
+
+        if not self.budget:
+            return
+        warn_at = TOKEN_BUDGET_WARN_RATIO * self.budget
+        if not self.budget_warned and self.tokens_used >= warn_at:
+            self.budget_warned = True
+            log.warning(
+                "Mission %s used %d of %d budgeted tokens",
+                self.name,
+                self.tokens_used,
+                self.budget,
+            )
+        if self.over_budget and not was_over_budget:
+            log.warning(
+                "Mission %s is over its token budget; switching to %s",
+                self.name,
+                FALLBACK_MODEL,
+            )
+
+    def set_token_budget(self, tokens: int | None) -> None:
+        """Stel het tokenbudget van de missie in (None = standaardbudget)."""
+        self.token_budget = tokens
+        self.budget_warned = bool(self.budget) and (
+            self.tokens_used >= TOKEN_BUDGET_WARN_RATIO * self.budget
+        )
+        self.save()
+
+    def format_usage(self) -> str:
+        """Vat het tokengebruik en de kosten van de missie samen."""
+        lines = [
+            f"{e.stage}/{e.bot} ({e.model}): {e.calls} calls, "
+            f"{e.input_tokens} in ({e.cached_input_tokens} cached), "
+            f"{e.output_tokens} uit, ${e.cost:.4f}"
+            for e in self.usage
+        ]
+        total_cost = sum(e.cost for e in self.usage)
+        budget = f"{self.budget}" if self.budget else "geen"
+        lines.append(
+            f"Totaal: {self.tokens_used} tokens, ${total_cost:.4f} (budget: {budget}"
+            + (f", nu op {FALLBACK_MODEL})" if self.over_budget else ")")
+        )
+        return "\n".join(lines)
+
+    async def chat_with_bot(
+        self, bot: Bot, message: str, listener: TurnListener | None = None
+    ) -> str | None:
+        """Chat with a specific bot; stream text to ``listener`` if given."""
         pending_inputs = [{"role": "user", "content": message}]
         log.info("Sending message to bot %s: %s", self.name, message)
         await bot.ensure_conversation()
 
         accumulated_text = ""
-        used_tools = False
-        response = None
-
-        for _ in range(5):  # Max 5 iterations for function calls
-            response = await openai_client.responses.create(
-                model=bot.openai_model,
-                conversation=bot.conversation_id,
-                input=pending_inputs,  # type: ignore
-                tools=[
-                    tool
-                    for tool in TOOLS
-                    if bot.tool_names and tool["name"] in bot.tool_names
-                ],
-            )
-            if response.output_text:
-                accumulated_text += response.output_text + "\n"
-
-            tool_calls = [
-                item for item in response.output if item.type == "function_call"
-            ]
-            if not tool_calls:
-                break
+        round_trips = 0
+        # Resultaten van read-only tools binnen deze beurt, per (naam, argumenten)
+        memo: dict[tuple[str, str], asyncio.Future] = {}
 
-            used_tools = True
-            pending_inputs = []
-            for item in tool_calls:
-                log.info(
-                    "Bot %s requested function call %s with arguments %s",
-                    self.name,
-                    item.name,
-                    item.arguments,
+        try:
+            while True:
+                round_trips += 1
+                # In de laatste toegestane ronde dwingen we een tekstueel antwoord af,
+                # zodat er geen aparte vervolgronde nodig is
+                last_round = round_trips >= MAX_TOOL_ROUNDS
+                # Alleen de eerste ronde mag geweigerd worden; daarna staan er
+                # tool-resultaten open in het gesprek
+                response = await self._create_response(
+                    bot,
+                    pending_inputs,
+                    listener,
+                    allow_tools=not last_round,
+                    shed=round_trips == 1,
                 )
+                if response.output_text:
+                    accumulated_text += response.output_text + "\n"
+                    if listener is not None:
+                        await listener.on_text_delta("\n")
 
-                if item.name == "create_or_update_player":
-                    func = self.create_or_update_player
-                elif item.name == "get_all_players":
-                    func = self.get_all_players
-                elif item.name == "next_stage":
-                    func = self.next_stage
-                elif item.name == "set_hq_location":
-                    func = self.set_hq_location
-                elif item.name == "calculate_distance_to_drop_zone":
-                    func = self.calculate_distance_to_drop_zone
-                elif item.name == "calculate_distance_to_hq":
-                    func = self.calculate_distance_to_hq
-                elif item.name == "calculate_bearing_to_hq":
-                    func = self.calculate_bearing_to_hq
-                elif item.name == "save_mission_context":
-                    func = self.save_mission_context
-                elif item.name == "save_mission_objectives":
-                    func = self.save_mission_objectives
-                elif item.name == "get_mission_context":
-                    func = self.get_mission_context
-                elif item.name == "get_mission_objectives":
-                    func = self.get_mission_objectives
-                else:
-                    func = None
-                if func:
-                    result = await func(**json.loads(item.arguments))
-                    pending_inputs.append(
-                        {
-                            "type": "function_call_output",
-                            "call_id": item.call_id,
-                            "output": result,
-                        }
+                tool_calls = [
+                    item for item in response.output if item.type == "function_call"
+                ]
+                if not tool_calls:
+                    break
+                if last_round:
+                    log.warning(
+                        "Bot %s requested tools in the final round; ignoring them",
+                        self.name,
                     )
-                else:
-                    log.warning("Unknown function call: %s", item.name)
-                    pending_inputs.append(
-                        {
-                            "type": "function_call_output",
-                            "call_id": item.call_id,
-                            "output": f"Unknown function: {item.name}",
-                        }
-                    )
-        else:
-            log.warning("Max function call iterations reached for bot %s", self.name)
-            return (
-                "❌ Maximaal aantal functie-aanroepen bereikt zonder tekstuele reactie."
-            )
+                    break
+
+                pending_inputs = await self._run_tool_calls(
+                    bot, tool_calls, memo, listener
+                )
+        finally:
+            TURN_ROUND_TRIPS.labels(stage=bot.name).observe(round_trips)
+        log.info("Turn for bot %s took %d round trips", self.name, round_trips)
 
         if accumulated_text.strip():
             final_text = accumulated_text.strip()
             log.info("Response from bot %s: %s", self.name, final_text)
             return final_text
 
-        if used_tools:
-            log.info("No text response from bot %s after tool usage", self.name)
-            final_response = await openai_client.responses.create(
-                model=bot.openai_model,
-                conversation=bot.conversation_id,
-                input=[
-                    {
-                        "role": "developer",
-                        "content": "De tools zijn uitgevoerd. Geef nu een tekstueel antwoord op de vorige input zonder verdere tool-aanroepen.",
-                    }
-                ],  # type: ignore
-            )
-            if final_response.output_text:
-                log.info(
-                    "Final response from bot %s: %s",
-                    self.name,
-                    final_response.output_text,
-                )
-                return final_response.output_text
         log.info("No response from bot %s", self.name)
         return None
 
+    async def _run_tool_call(
+        self, bot: Bot, item, memo: dict[tuple[str, str], asyncio.Future]
+    ) -> str:
+        spec = bot.tool_specs.get(item.name)
+        if spec is None:
+            log.warning("Unknown function call: %s", item.name)
+            return f"Unknown function: {item.name}"
+        try:
+            with span("tool_call", tool=item.name):
+                if not spec.read_only:
+                    # Een wijziging maakt eerder opgehaalde resultaten ongeldig
+                    memo.clear()
+                    self.bump_state()
+                    return await spec.call(self, item.arguments)
+                key = (item.name, item.arguments)
+                if key not in memo:
+                    memo[key] = asyncio.ensure_future(spec.call(self, item.arguments))
+                return await memo[key]
+        except ToolArgumentError as e:
+            log.warning("Invalid arguments for %s: %s", item.name, e)
+            return f"Ongeldige argumenten voor {item.name}: {e}"
+
+    async def _run_tool_calls(
+        self,
+        bot: Bot,
+        tool_calls: list,
+        memo: dict[tuple[str, str], asyncio.Future],
+        listener: TurnListener | None = None,
+    ) -> list[dict]:
+        """Voer de tool calls van één ronde uit.
+
+        Opeenvolgende read-only calls draaien gelijktijdig; wijzigende calls
+        draaien los en in de volgorde waarin het model ze vroeg.
+        """
+        results: list[str] = []
+        read_only: list = []
+
+        async def run_read_only():
+            results.extend(
+                await asyncio.gather(
+                    *(self._run_tool_call(bot, item, memo) for item in read_only)
+                )
+            )
+            read_only.clear()
+
+        for item in tool_calls:
+            log.info(
+                "Bot %s requested function call %s with arguments %s",
+                self.name,
+                item.name,
+                item.arguments,
+            )
+            self._turn_tools.add(item.name)
+            if listener is not None:
+                await listener.on_tool_call(item.name, item.arguments)
+            spec = bot.tool_specs.get(item.name)
+            if spec is not None and spec.read_only:
+                read_only.append(item)
+                continue
+            await run_read_only()
+            results.append(await self._run_tool_call(bot, item, memo))
+        await run_read_only()
+
+        if listener is not None:
+            for item, result in zip(tool_calls, results):
+                await listener.on_tool_result(item.name, result)
+        return [
+            {
+                "type": "function_call_output",
+                "call_id": item.call_id,
+                "output": result,
+            }
+            for item, result in zip(tool_calls, results)
+        ]
+
     def load_stage_bot(self, stage: MissionStage) -> Bot:
         """Load the bot for a specific mission stage."""
         if stage == MissionStage.INTAKE:
-            bot = Bot(
+            bot = Bot.from_prompt(
+                "intake",
                 name=MissionStage.INTAKE.value,
-                system_prompt=get_system_prompt("src/game/prompts/intake.txt"),
                 tool_names=[
                     "create_or_update_player",
                     "get_all_players",
@@ -335,9 +831,9 @@ class Mission(BaseModel):
                 openai_model="gpt-4o",
             )
         elif stage == MissionStage.BRIEFING:
-            bot = Bot(
+            bot = Bot.from_prompt(
+                "briefing",
                 name=MissionStage.BRIEFING.value,
-                system_prompt=get_system_prompt("src/game/prompts/briefing.txt"),
                 tool_names=[
                     "save_mission_context",
                     "save_mission_objectives",
@@ -347,21 +843,22 @@ class Mission(BaseModel):
                 openai_model="gpt-5",
             )
         elif stage == MissionStage.BEACON:
-            bot = Bot(
+            bot = Bot.from_prompt(
+                "beacon",
                 name=MissionStage.BEACON.value,
-                system_prompt=get_system_prompt("src/game/prompts/Beacon.txt"),
                 tool_names=[
                     "calculate_distance_to_drop_zone",
                     "next_stage",
                 ],
             )
         elif stage == MissionStage.EXFIL:
-            bot = Bot(
+            bot = Bot.from_prompt(
+                "exfil",
                 name=MissionStage.EXFIL.value,
-                system_prompt=get_system_prompt("src/game/prompts/exfil.txt"),
                 tool_names=[
                     "calculate_distance_to_hq",
                     "calculate_bearing_to_hq",
+                    "get_movement_context",
                     "get_mission_context",
                     "get_mission_objectives",
                     "get_all_players",
@@ -374,21 +871,88 @@ class Mission(BaseModel):
                 name=stage.value,
                 system_prompt=f"This is the bot for the {stage} stage of mission {self.name}.",
             )
+        bot.resolve_tools()
         return bot
 
+    @property
+    def positions(self) -> PositionHistory:
+        """De gemelde posities van de spelers in deze missie."""
+        if self._positions is None:
+            # Alleen voor missies die niet via aload kwamen (bv. net aangemaakt)
+            self._positions = PositionHistory.load(self.name)
+        return self._positions
+
+    @property
+    def has_pending_save(self) -> bool:
+        """Of er voor de missie of haar positiegeschiedenis nog een save openstaat."""
+        scheduler = get_save_scheduler()
+        return scheduler.is_dirty(self) or (
+            self._positions is not None and scheduler.is_dirty(self._positions)
+        )
+
+    def player_name(self, sender: str | None) -> str | None:
+        """De naam waaronder posities van een afzender bewaard worden.
+
+        Zowel de Discord-naam van de snelle beacon-route als de ``player`` die het
+        model aan de tools meegeeft, gaan hierlangs: een speler uit de missie
+        krijgt zijn eigen schrijfwijze, anders telt de afzender zoals opgegeven.
+        """
+        if not sender or not sender.strip():
+            return None
+        name = sender.strip()
+        for existing in self.players:
+            if existing.name.strip().lower() == name.lower():
+                return existing.name
+        return name
+
+    def record_position(self, player: str | None, location: Location) -> None:
+        """Bewaar een gemelde positie van een speler (genegeerd zonder speler)."""
+        name = self.player_name(player)
+        if name is None:
+            return
+        latest = self.positions.latest(name)
+        if latest is not None and latest[1] == location:
+            # Dezelfde coördinaten voor afstand én koers tellen als één melding
+            return
+        self.positions.record(name, location)
+        self.bump_state()
+
+    def answer_beacon_ping(self, player: str, message: str) -> str | None:
+        """Beantwoord een bericht met enkel coördinaten in de beacon-fase zonder bot.
+
+        Retourneert None als het bericht door de bot moet worden afgehandeld.
+        """
+        if self.stage != MissionStage.BEACON or self.drop_point is None:
+            return None
+        location = parse_coordinates(message)
+        if location is None:
+            return None
+        self.record_position(player, location)
+        distance_m = location.distance_to(self.drop_point)
+        return f"Position received. Distance: {int(distance_m)} m"
+
+    @tool(
+        "Maak een nieuwe speler aan of werk een bestaande speler bij in de missie met de gegeven eigenschappen.",
+        parameters=Player.tool_schema(),
+        model=Player,
+    )
     async def create_or_update_player(self, **kwargs) -> str:
         """Create or update a player in the mission."""
         player = Player(**kwargs)
-        # Overwrite existing player with same name, else append
+        self.upsert_player(player)
+        return player.model_dump_json(ensure_ascii=False)
+
+    def upsert_player(self, player: Player) -> None:
+        """Voeg een speler toe of overschrijf de speler met dezelfde naam."""
         for i, existing_player in enumerate(self.players):
             if existing_player.name == player.name:
                 self.players[i] = player
                 break
         else:
             self.players.append(player)
-        self.save()
-        return player.model_dump_json(ensure_ascii=False)
+        self.save_player(player)
 
+    @tool("Haal alle spelers op in de missie.", read_only=True)
     async def get_all_players(self) -> str:
         """Get all players in the mission."""
         if not self.players:
@@ -398,6 +962,7 @@ class Mission(BaseModel):
         ]
         return json.dumps(players, ensure_ascii=False)
 
+    @tool("Breng de missie naar de volgende fase.")
     async def next_stage(self) -> str:
         """Advance the mission to the next stage."""
         completed, message = self.is_stage_completed(self.stage)
@@ -406,6 +971,10 @@ class Mission(BaseModel):
         await self.init_next_stage()
         return f"Missie {self.name} gaat naar de volgende fase. Wissel naar het kanaal {self.stage.value}."
 
+    @tool(
+        "Stel de HQ-locatie in voor de missie, gegeven in decimale graden of in DMS-formaat.",
+        parameters=COORDINATE_PARAMETERS,
+    )
     async def set_hq_location(
         self,
         latitude_decimal: float | None = None,
@@ -439,36 +1008,70 @@ class Mission(BaseModel):
         self.save()
         return f"HQ-locatie ingesteld op: {self.hq_location.latitude}, {self.hq_location.longitude}."
 
+    @tool(
+        "Sla de missiecontext op.",
+        parameters={
+            "type": "object",
+            "properties": {
+                "context": {
+                    "type": "string",
+                    "description": "De context van de missie.",
+                },
+            },
+            "required": ["context"],
+        },
+    )
     async def save_mission_context(self, context: str) -> str:
         """Save mission context."""
         self.mission_context = context
         self.save()
         return f"Missiecontext opgeslagen: {context}."
 
+    @tool("Haal de missiecontext op.", read_only=True)
     async def get_mission_context(self) -> str:
         """Get mission context."""
         if self.mission_context is None:
             return "Er is geen missiecontext ingesteld."
         return self.mission_context
 
+    @tool(
+        "Sla de missiedoelen op.",
+        parameters={
+            "type": "object",
+            "properties": {
+                "objectives": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "De doelen van de missie.",
+                },
+            },
+            "required": ["objectives"],
+        },
+    )
     async def save_mission_objectives(self, objectives: list[str]) -> str:
         """Save mission objectives."""
         self.mission_objectives = objectives
         self.save()
         return f"Missiedoelen opgeslagen: {', '.join(objectives)}."
 
+    @tool("Haal de missiedoelen op.", read_only=True)
     async def get_mission_objectives(self) -> str:
         """Get mission objectives."""
         if self.mission_objectives is None:
             return "Er zijn geen missiedoelen ingesteld."
         return ", ".join(self.mission_objectives)
 
+    @tool(
+        "Bereken de afstand tot de drop zone vanaf de gegeven coördinaten, in decimale graden of in DMS-formaat.",
+        parameters=TRACKED_COORDINATE_PARAMETERS,
+    )
     async def calculate_distance_to_drop_zone(
         self,
         latitude_decimal: float | None = None,
         longitude_decimal: float | None = None,
         latitude_dms: dict | None = None,
         longitude_dms: dict | None = None,
+        player: str | None = None,
     ) -> str:
         """Calculate the distance to the drop zone from given coordinates."""
         if (latitude_decimal is not None and latitude_decimal != 0) and (
@@ -488,17 +1091,23 @@ class Mission(BaseModel):
             )
         else:
             return "Ongeldige locatiegegevens verstrekt."
+        self.record_position(player, location)
         if self.drop_point is None:
             return "De drop zone is nog niet ingesteld."
         distance_m = location.distance_to(self.drop_point)
         return f"De afstand tot de drop zone is {int(distance_m)} meter."
 
+    @tool(
+        "Bereken de afstand tot HQ vanaf de gegeven coördinaten, in decimale graden of in DMS-formaat.",
+        parameters=TRACKED_COORDINATE_PARAMETERS,
+    )
     async def calculate_distance_to_hq(
         self,
         latitude_decimal: float | None = None,
         longitude_decimal: float | None = None,
         latitude_dms: dict | None = None,
         longitude_dms: dict | None = None,
+        player: str | None = None,
     ) -> str:
         """Calculate the distance to HQ from given coordinates."""
         if (latitude_decimal is not None and latitude_decimal != 0) and (
@@ -518,17 +1127,23 @@ class Mission(BaseModel):
             )
         else:
             return "Ongeldige locatiegegevens verstrekt."
+        self.record_position(player, location)
         if self.hq_location is None:
             return "De HQ-locatie is nog niet ingesteld."
         distance_m = location.distance_to(self.hq_location)
         return f"De afstand tot HQ is {int(distance_m)} meter."
 
+    @tool(
+        "Bereken de koers naar HQ vanaf de gegeven coördinaten, in decimale graden of in DMS-formaat.",
+        parameters=TRACKED_COORDINATE_PARAMETERS,
+    )
     async def calculate_bearing_to_hq(
         self,
         latitude_decimal: float | None = None,
         longitude_decimal: float | None = None,
         latitude_dms: dict | None = None,
         longitude_dms: dict | None = None,
+        player: str | None = None,
     ) -> str:
         """Calculate the bearing to HQ from given coordinates."""
         if (latitude_decimal is not None and latitude_decimal != 0) and (
@@ -548,284 +1163,78 @@ class Mission(BaseModel):
             )
         else:
             return "Ongeldige locatiegegevens verstrekt."
+        self.record_position(player, location)
         if self.hq_location is None:
             return "De HQ-locatie is nog niet ingesteld."
         bearing_deg = location.bearing_to(self.hq_location)
         return f"De koers naar HQ is {int(bearing_deg)} graden."
 
-
-TOOLS = [
-    {
-        "type": "function",
-        "name": "create_or_update_player",
-        "description": "Maak een nieuwe speler aan of werk een bestaande speler bij in de missie met de gegeven eigenschappen.",
-        "parameters": Player.tool_schema(),
-    },
-    {
-        "type": "function",
-        "name": "get_all_players",
-        "description": "Haal alle spelers op in de missie.",
-        "parameters": {
-            "type": "object",
-            "properties": {},
-            "required": [],
-        },
-    },
-    {
-        "type": "function",
-        "name": "next_stage",
-        "description": "Breng de missie naar de volgende fase.",
-        "parameters": {
-            "type": "object",
-            "properties": {},
-            "required": [],
-        },
-    },
-    {
-        "type": "function",
-        "name": "set_hq_location",
-        "description": "Stel de HQ-locatie in voor de missie, gegeven in decimale graden of in DMS-formaat.",
-        "parameters": {
-            "type": "object",
-            "properties": {
-                "latitude_decimal": {
-                    "type": "number",
-                    "description": "Latitude in decimal degrees.",
-                },
-                "longitude_decimal": {
-                    "type": "number",
-                    "description": "Longitude in decimal degrees.",
-                },
-                "latitude_dms": {
-                    "type": "object",
-                    "properties": {
-                        "degrees": {"type": "integer", "description": "Degrees"},
-                        "minutes": {"type": "integer", "description": "Minutes"},
-                        "seconds": {"type": "integer", "description": "Seconds"},
-                        "direction": {
-                            "type": "string",
-                            "enum": ["N", "S"],
-                            "description": "Direction",
-                        },
-                    },
-                    "required": ["degrees", "minutes", "seconds", "direction"],
-                    "description": "Latitude in DMS format.",
-                },
-                "longitude_dms": {
-                    "type": "object",
-                    "properties": {
-                        "degrees": {"type": "integer", "description": "Degrees"},
-                        "minutes": {"type": "integer", "description": "Minutes"},
-                        "seconds": {"type": "integer", "description": "Seconds"},
-                        "direction": {
-                            "type": "string",
-                            "enum": ["E", "W"],
-                            "description": "Direction",
-                        },
-                    },
-                    "required": ["degrees", "minutes", "seconds", "direction"],
-                    "description": "Longitude in DMS format.",
-                },
-            },
-            "required": [],
-        },
-    },
-    {
-        "type": "function",
-        "name": "calculate_distance_to_drop_zone",
-        "description": "Bereken de afstand tot de drop zone vanaf de gegeven coördinaten, in decimale graden of in DMS-formaat.",
-        "parameters": {
-            "type": "object",
-            "properties": {
-                "latitude_decimal": {
-                    "type": "number",
-                    "description": "Latitude in decimal degrees.",
-                },
-                "longitude_decimal": {
-                    "type": "number",
-                    "description": "Longitude in decimal degrees.",
-                },
-                "latitude_dms": {
-                    "type": "object",
-                    "properties": {
-                        "degrees": {"type": "integer", "description": "Degrees"},
-                        "minutes": {"type": "integer", "description": "Minutes"},
-                        "seconds": {"type": "integer", "description": "Seconds"},
-                        "direction": {
-                            "type": "string",
-                            "enum": ["N", "S"],
-                            "description": "Direction",
-                        },
-                    },
-                    "required": ["degrees", "minutes", "seconds", "direction"],
-                    "description": "Latitude in DMS format.",
-                },
-                "longitude_dms": {
-                    "type": "object",
-                    "properties": {
-                        "degrees": {"type": "integer", "description": "Degrees"},
-                        "minutes": {"type": "integer", "description": "Minutes"},
-                        "seconds": {"type": "integer", "description": "Seconds"},
-                        "direction": {
-                            "type": "string",
-                            "enum": ["E", "W"],
-                            "description": "Direction",
-                        },
-                    },
-                    "required": ["degrees", "minutes", "seconds", "direction"],
-                    "description": "Longitude in DMS format.",
-                },
-            },
-            "required": [],
-        },
-    },
-    {
-        "type": "function",
-        "name": "save_mission_context",
-        "description": "Sla de missiecontext op.",
-        "parameters": {
+    @tool(
+        "Vat de bewegingen van de spelers samen: afstand tot het doel, trend en wie bij elkaar is.",
+        parameters={
             "type": "object",
             "properties": {
-                "context": {
+                "player": {
                     "type": "string",
-                    "description": "De context van de missie.",
-                },
-            },
-            "required": ["context"],
-        },
-    },
-    {
-        "type": "function",
-        "name": "save_mission_objectives",
-        "description": "Sla de missiedoelen op.",
-        "parameters": {
-            "type": "object",
-            "properties": {
-                "objectives": {
-                    "type": "array",
-                    "items": {"type": "string"},
-                    "description": "De doelen van de missie.",
-                },
-            },
-            "required": ["objectives"],
-        },
-    },
-    {
-        "type": "function",
-        "name": "calculate_distance_to_hq",
-        "description": "Bereken de afstand tot HQ vanaf de gegeven coördinaten, in decimale graden of in DMS-formaat.",
-        "parameters": {
-            "type": "object",
-            "properties": {
-                "latitude_decimal": {
-                    "type": "number",
-                    "description": "Latitude in decimal degrees.",
-                },
-                "longitude_decimal": {
-                    "type": "number",
-                    "description": "Longitude in decimal degrees.",
-                },
-                "latitude_dms": {
-                    "type": "object",
-                    "properties": {
-                        "degrees": {"type": "integer", "description": "Degrees"},
-                        "minutes": {"type": "integer", "description": "Minutes"},
-                        "seconds": {"type": "integer", "description": "Seconds"},
-                        "direction": {
-                            "type": "string",
-                            "enum": ["N", "S"],
-                            "description": "Direction",
-                        },
-                    },
-                    "required": ["degrees", "minutes", "seconds", "direction"],
-                    "description": "Latitude in DMS format.",
-                },
-                "longitude_dms": {
-                    "type": "object",
-                    "properties": {
-                        "degrees": {"type": "integer", "description": "Degrees"},
-                        "minutes": {"type": "integer", "description": "Minutes"},
-                        "seconds": {"type": "integer", "description": "Seconds"},
-                        "direction": {
-                            "type": "string",
-                            "enum": ["E", "W"],
-                            "description": "Direction",
-                        },
-                    },
-                    "required": ["degrees", "minutes", "seconds", "direction"],
-                    "description": "Longitude in DMS format.",
-                },
-            },
-            "required": [],
-        },
-    },
-    {
-        "type": "function",
-        "name": "calculate_bearing_to_hq",
-        "description": "Bereken de koers naar HQ vanaf de gegeven coördinaten, in decimale graden of in DMS-formaat.",
-        "parameters": {
-            "type": "object",
-            "properties": {
-                "latitude_decimal": {
-                    "type": "number",
-                    "description": "Latitude in decimal degrees.",
+                    "description": "Beperk tot één speler; laat leeg voor het hele team.",
                 },
-                "longitude_decimal": {
+                "minutes": {
                     "type": "number",
-                    "description": "Longitude in decimal degrees.",
-                },
-                "latitude_dms": {
-                    "type": "object",
-                    "properties": {
-                        "degrees": {"type": "integer", "description": "Degrees"},
-                        "minutes": {"type": "integer", "description": "Minutes"},
-                        "seconds": {"type": "integer", "description": "Seconds"},
-                        "direction": {
-                            "type": "string",
-                            "enum": ["N", "S"],
-                            "description": "Direction",
-                        },
-                    },
-                    "required": ["degrees", "minutes", "seconds", "direction"],
-                    "description": "Latitude in DMS format.",
-                },
-                "longitude_dms": {
-                    "type": "object",
-                    "properties": {
-                        "degrees": {"type": "integer", "description": "Degrees"},
-                        "minutes": {"type": "integer", "description": "Minutes"},
-                        "seconds": {"type": "integer", "description": "Seconds"},
-                        "direction": {
-                            "type": "string",
-                            "enum": ["E", "W"],
-                            "description": "Direction",
-                        },
-                    },
-                    "required": ["degrees", "minutes", "seconds", "direction"],
-                    "description": "Longitude in DMS format.",
+                    "description": "Periode (in minuten) voor de trend, standaard 10.",
                 },
             },
             "required": [],
         },
-    },
-    {
-        "type": "function",
-        "name": "get_mission_context",
-        "description": "Haal de missiecontext op.",
-        "parameters": {
-            "type": "object",
-            "properties": {},
-            "required": [],
-        },
-    },
-    {
-        "type": "function",
-        "name": "get_mission_objectives",
-        "description": "Haal de missiedoelen op.",
-        "parameters": {
-            "type": "object",
-            "properties": {},
-            "required": [],
-        },
-    },
-]
+        read_only=True,
+    )
+    async def get_movement_context(
+        self, player: str | None = None, minutes: float | None = None
+    ) -> str:
+        """Summarize recorded player positions relative to the current target."""
+        positions = self.positions
+        if self.stage == MissionStage.BEACON:
+            target, target_name = self.drop_point, "de drop zone"
+        else:
+            target, target_name = self.hq_location, "HQ"
+        if target is None:
+            return f"De locatie van {target_name} is nog niet ingesteld."
+
+        names = positions.players()
+        wanted = self.player_name(player)
+        if wanted is not None:
+            names = [name for name in names if name.lower() == wanted.lower()]
+        if not names:
+            return "Er zijn nog geen posities gemeld."
+
+        window = (minutes or 10) * 60
+        now = time.time()
+        lines = []
+        for name, distance_m in positions.closest_to(target):
+            if name not in names:
+                continue
+            at, _ = positions.latest(name)  # type: ignore[misc]
+            line = (
+                f"{name}: {int(distance_m)} m van {target_name} "
+                f"({int((now - at) // 60)} min geleden gemeld)"
+            )
+            trend = positions.distance_trend(name, target, window)
+            if trend is not None:
+                _, _, per_minute = trend
+                if abs(per_minute) < 1:
+                    line += ", staat stil"
+                else:
+                    direction = "nadert" if per_minute < 0 else "verwijdert zich"
+                    line += f", {direction} met {abs(int(per_minute))} m/min"
+            lines.append(line)
+        if not player:
+            pairs = positions.pairs_within(POSITION_NEAR_M)
+            if pairs:
+                lines.append(
+                    f"Bij elkaar (< {int(POSITION_NEAR_M)} m): "
+                    + ", ".join(f"{a} en {b} ({int(d)} m)" for a, b, d in pairs)
+                )
+        return "\n".join(lines)
+
+
+# Tool-schema's van alle missie-tools (o.a. voor tests en de fake OpenAI-server)
+TOOLS = [spec.schema for spec in registry if spec.method]
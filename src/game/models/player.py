@@ -1,7 +1,8 @@
 """Modellen voor spelers in het spel."""
 
-from typing import Literal
+from typing import Literal, Self
 
+from ..storage import get_store
 from .participant import Participant
 
 
@@ -10,3 +11,13 @@ class Player(Participant):
 
     type: Literal["player"] = "player"
     inventory: list[str] = []
+
+    @classmethod
+    def load(cls, name: str, mission_ref: str) -> Self:
+        """Laad een speler van een missie uit de opslag."""
+        return cls.model_validate(get_store().load_player(mission_ref, name))
+
+    @classmethod
+    def load_all(cls, mission_ref: str) -> list[Self]:
+        """Laad alle spelers van een missie uit de opslag."""
+        return [cls.model_validate(p) for p in get_store().load_players(mission_ref)]
@@ -0,0 +1,85 @@
+"""Modellen voor tokengebruik en geschatte kosten van OpenAI-calls."""
+
+import json
+import logging
+import os
+
+from pydantic import BaseModel
+
+log = logging.getLogger("usage")
+logging.basicConfig(level=logging.INFO)
+
+# Prijzen in USD per 1M tokens: (input, cached input, output)
+MODEL_PRICES: dict[str, tuple[float, float, float]] = {
+    "gpt-5": (1.25, 0.125, 10.0),
+    "gpt-5-mini": (0.25, 0.025, 2.0),
+    "gpt-5-nano": (0.05, 0.005, 0.4),
+    "gpt-4o": (2.5, 1.25, 10.0),
+    "gpt-4o-mini": (0.15, 0.075, 0.6),
+    "gpt-4.1": (2.0, 0.5, 8.0),
+    "gpt-4.1-mini": (0.4, 0.1, 1.6),
+}
+# Aanvullingen of overschrijvingen als JSON, bv. {"gpt-5": [1.25, 0.125, 10]}
+MODEL_PRICES.update(
+    {
+        model: tuple(prices)
+        for model, prices in json.loads(os.getenv("MODEL_PRICES", "{}")).items()
+    }
+)
+
+_unknown_models: set[str] = set()
+
+
+def estimate_cost(
+    model: str, input_tokens: int, cached_input_tokens: int, output_tokens: int
+) -> float:
+    """Schat de kosten (USD) van een call; 0 voor modellen zonder prijs."""
+    prices = MODEL_PRICES.get(model)
+    if prices is None:
+        # Versies als "gpt-5-2025-08-07" vallen terug op het basismodel
+        base = max(
+            (m for m in MODEL_PRICES if model.startswith(m)), key=len, default=None
+        )
+        prices = MODEL_PRICES.get(base) if base else None
+    if prices is None:
+        if model not in _unknown_models:
+            _unknown_models.add(model)
+            log.warning("Geen prijs bekend voor model %s", model)
+        return 0.0
+    input_price, cached_price, output_price = prices
+    uncached = max(input_tokens - cached_input_tokens, 0)
+    return (
+        uncached * input_price
+        + cached_input_tokens * cached_price
+        + output_tokens * output_price
+    ) / 1_000_000
+
+
+class Usage(BaseModel):
+    """Opgeteld tokengebruik voor één combinatie van fase, bot en model."""
+
+    stage: str
+    bot: str
+    model: str
+    calls: int = 0
+    input_tokens: int = 0
+    cached_input_tokens: int = 0
+    output_tokens: int = 0
+    cost: float = 0.0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+    def add_response(self, response) -> None:
+        """Tel het gebruik van een Responses-antwoord op."""
+        usage = getattr(response, "usage", None)
+        input_tokens = getattr(usage, "input_tokens", 0) or 0
+        output_tokens = getattr(usage, "output_tokens", 0) or 0
+        details = getattr(usage, "input_tokens_details", None)
+        cached = getattr(details, "cached_tokens", 0) or 0
+        self.calls += 1
+        self.input_tokens += input_tokens
+        self.cached_input_tokens += cached
+        self.output_tokens += output_tokens
+        self.cost += estimate_cost(self.model, input_tokens, cached, output_tokens)
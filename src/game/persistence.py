@@ -0,0 +1,143 @@
+"""Uitgestelde (write-behind) opslag van spelgegevens."""
+
+import asyncio
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Protocol
+
+from ..telemetry.metrics import REGISTRY
+
+log = logging.getLogger("persistence")
+logging.basicConfig(level=logging.INFO)
+
+# Venster (in seconden) waarbinnen opeenvolgende saves worden samengevoegd
+MISSION_SAVE_DELAY = float(os.getenv("MISSION_SAVE_DELAY", "0.5"))
+
+
+def atomic_write(path: Path, data: str | bytes):
+    """Schrijf een bestand atomisch weg via een tijdelijk bestand en rename."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+    )
+    try:
+        if isinstance(data, bytes):
+            f = os.fdopen(fd, "wb")
+        else:
+            f = os.fdopen(fd, "w", encoding="utf-8")
+        with f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+class Persistable(Protocol):
+    """Object dat door de SaveScheduler kan worden opgeslagen."""
+
+    name: str
+
+    async def _commit(self) -> None: ...
+
+    def _commit_sync(self) -> None: ...
+
+
+class SaveScheduler:
+    """Markeert objecten als gewijzigd en schrijft ze gebundeld weg.
+
+    Saves binnen ``delay`` seconden worden samengevoegd tot één schrijfactie;
+    ``flush`` dwingt een directe schrijfactie af.
+    """
+
+    def __init__(self, delay: float = MISSION_SAVE_DELAY):
+        self.delay = delay
+        self._pending: dict[str, Persistable] = {}
+        self._timers: dict[str, asyncio.Task] = {}
+        self._write_locks: dict[str, asyncio.Lock] = {}
+        self.requested = 0
+        self.written = 0
+        self.failed = 0
+
+    def is_dirty(self, obj: Persistable) -> bool:
+        """Geef aan of er nog een save openstaat voor het object."""
+        return obj.name in self._pending
+
+    def schedule(self, obj: Persistable):
+        """Markeer het object als gewijzigd; het wordt kort daarna weggeschreven."""
+        self.requested += 1
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # Geen event loop (bv. in scripts): direct schrijven
+            obj._commit_sync()
+            self.written += 1
+            return
+        self._pending[obj.name] = obj
+        if obj.name not in self._timers:
+            self._timers[obj.name] = asyncio.create_task(self._delayed(obj.name))
+
+    async def _delayed(self, key: str):
+        await asyncio.sleep(self.delay)
+        try:
+            await self._flush_key(key)
+        except Exception:
+            pass  # al gelogd; blijft gemarkeerd voor een volgende flush
+
+    async def _flush_key(self, key: str):
+        timer = self._timers.pop(key, None)
+        if timer is not None and timer is not asyncio.current_task():
+            timer.cancel()
+        obj = self._pending.pop(key, None)
+        if obj is None:
+            return
+        lock = self._write_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            try:
+                await obj._commit()
+                self.written += 1
+            except Exception as e:
+                self.failed += 1
+                self._pending.setdefault(key, obj)
+                log.error("Fout bij het opslaan van %s: %s", key, e)
+                raise
+
+    async def flush(self, obj: Persistable):
+        """Schrijf het object direct weg, ook als er nog geen save openstond."""
+        self._pending[obj.name] = obj
+        await self._flush_key(obj.name)
+
+    async def flush_all(self):
+        """Schrijf alle openstaande saves weg (bv. bij afsluiten)."""
+        for key in list(self._pending):
+            try:
+                await self._flush_key(key)
+            except Exception:
+                pass
+
+    def stats(self) -> dict[str, int]:
+        """Retourneer tellers van de save scheduler."""
+        return {
+            "pending": len(self._pending),
+            "requested": self.requested,
+            "written": self.written,
+            "failed": self.failed,
+        }
+
+
+_scheduler: SaveScheduler | None = None
+
+
+def get_save_scheduler() -> SaveScheduler:
+    """Retourneer de gedeelde save scheduler."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = SaveScheduler()
+    return _scheduler
+
+
+REGISTRY.add_collector("hq_save_scheduler", lambda: get_save_scheduler().stats())
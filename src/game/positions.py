@@ -0,0 +1,316 @@
+"""Positiegeschiedenis van spelers, compact opgeslagen in NumPy-arrays.
+
+Per speler worden tijdstippen, breedte- en lengtegraden in groeiende arrays
+bijgehouden; een grid-index over de laatst bekende posities maakt vragen als
+"wie is het dichtst bij de drop zone" en "wie staat bij elkaar" goedkoop. De
+geschiedenis wordt per missie weggeschreven naar ``DATA_DIR/<missie>/positions.npz``.
+"""
+
+import asyncio
+import io
+import logging
+import math
+import os
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+
+from .models.location import Location, distances_to, haversine_km_many
+from .persistence import atomic_write, get_save_scheduler
+from .storage import get_data_dir
+
+log = logging.getLogger("positions")
+logging.basicConfig(level=logging.INFO)
+
+# Celgrootte (m) van de grid-index
+POSITION_GRID_M = float(os.getenv("POSITION_GRID_M", "250"))
+# Afstand (m) waarbinnen spelers als "bij elkaar" gelden
+POSITION_NEAR_M = float(os.getenv("POSITION_NEAR_M", "100"))
+# Venster (s) voor de afstandstrend
+POSITION_TREND_WINDOW = float(os.getenv("POSITION_TREND_WINDOW", "600"))
+
+# Meters per breedtegraad (bij benadering, genoeg voor de grid-index)
+_M_PER_DEG = 111_320.0
+
+
+class _Track:
+    """De posities van één speler in groeiende arrays (tijd, lat, lon)."""
+
+    __slots__ = ("data", "size")
+
+    def __init__(self, data: np.ndarray | None = None):
+        self.data = data if data is not None else np.empty((3, 16), dtype=np.float64)
+        self.size = 0 if data is None else data.shape[1]
+
+    def append(self, at: float, latitude: float, longitude: float):
+        if self.size == self.data.shape[1]:
+            grown = np.empty((3, max(16, self.size * 2)), dtype=np.float64)
+            grown[:, : self.size] = self.data[:, : self.size]
+            self.data = grown
+        self.data[:, self.size] = (at, latitude, longitude)
+        self.size += 1
+
+    @property
+    def times(self) -> np.ndarray:
+        return self.data[0, : self.size]
+
+    @property
+    def latitudes(self) -> np.ndarray:
+        return self.data[1, : self.size]
+
+    @property
+    def longitudes(self) -> np.ndarray:
+        return self.data[2, : self.size]
+
+    def since(self, since: float) -> slice:
+        """De posities vanaf tijdstip ``since`` (de arrays zijn op tijd gesorteerd)."""
+        return slice(int(np.searchsorted(self.times, since)), self.size)
+
+
+class PositionHistory:
+    """Alle gemelde posities van de spelers in één missie."""
+
+    def __init__(self, mission: str, grid_m: float = POSITION_GRID_M):
+        self.mission = mission
+        self.grid_m = grid_m
+        self._tracks: dict[str, _Track] = {}
+        # Grid-index: cel -> spelers van wie de laatste positie in die cel ligt
+        self._cells: dict[tuple[int, int], set[str]] = defaultdict(set)
+        self._cell_of: dict[str, tuple[int, int]] = {}
+        # Referentiebreedte voor de lengteschaal van het grid
+        self._ref_cos: float | None = None
+
+    @property
+    def name(self) -> str:
+        """Sleutel voor de SaveScheduler, los van die van de missie zelf."""
+        return f"{self.mission}/positions"
+
+    @property
+    def path(self) -> Path:
+        return get_data_dir() / self.mission / "positions.npz"
+
+    def __len__(self) -> int:
+        return sum(track.size for track in self._tracks.values())
+
+    def players(self) -> list[str]:
+        return list(self._tracks)
+
+    # ---------- Schrijven ----------
+
+    def record(self, player: str, location: Location, at: float | None = None):
+        """Voeg een gemelde positie van een speler toe."""
+        self._append(player, time.time() if at is None else at, location)
+        get_save_scheduler().schedule(self)
+
+    def _append(self, player: str, at: float, location: Location):
+        track = self._tracks.get(player)
+        if track is None:
+            track = self._tracks[player] = _Track()
+        if track.size and at < track.times[-1]:
+            # Posities komen in volgorde binnen; een klokverschil mag de
+            # sortering (en dus searchsorted) niet breken
+            at = float(track.times[-1])
+        track.append(at, location.latitude, location.longitude)
+        self._index(player, location.latitude, location.longitude)
+
+    def _cell(self, latitude: float, longitude: float) -> tuple[int, int]:
+        if self._ref_cos is None:
+            self._ref_cos = max(math.cos(math.radians(latitude)), 0.01)
+        return (
+            math.floor(latitude * _M_PER_DEG / self.grid_m),
+            math.floor(longitude * _M_PER_DEG * self._ref_cos / self.grid_m),
+        )
+
+    def _index(self, player: str, latitude: float, longitude: float):
+        cell = self._cell(latitude, longitude)
+        old = self._cell_of.get(player)
+        if old == cell:
+            return
+        if old is not None:
+            self._cells[old].discard(player)
+            if not self._cells[old]:
+                del self._cells[old]
+        self._cells[cell].add(player)
+        self._cell_of[player] = cell
+
+    def _candidates(
+        self, latitude: float, longitude: float, radius_m: float
+    ) -> set[str]:
+        """Spelers in de gridcellen die binnen ``radius_m`` van een punt kunnen liggen."""
+        cy, cx = self._cell(latitude, longitude)
+        # Eén cel extra marge voor de benaderde lengteschaal
+        reach = math.ceil(radius_m / self.grid_m) + 1
+        found: set[str] = set()
+        for dy in range(-reach, reach + 1):
+            for dx in range(-reach, reach + 1):
+                found |= self._cells.get((cy + dy, cx + dx), set())
+        return found
+
+    # ---------- Opvragen ----------
+
+    def latest(self, player: str) -> tuple[float, Location] | None:
+        """Tijdstip en locatie van de laatst gemelde positie van een speler."""
+        track = self._tracks.get(player)
+        if track is None or not track.size:
+            return None
+        at, latitude, longitude = track.data[:, track.size - 1]
+        return float(at), Location(latitude=latitude, longitude=longitude)
+
+    def track(
+        self, player: str, since: float | None = None
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Tijden, breedtes en lengtes van een speler (vanaf ``since``), als views."""
+        track = self._tracks.get(player)
+        if track is None:
+            empty = np.empty(0, dtype=np.float64)
+            return empty, empty, empty
+        window = slice(0, track.size) if since is None else track.since(since)
+        return track.times[window], track.latitudes[window], track.longitudes[window]
+
+    def latest_positions(
+        self, players: list[str] | None = None
+    ) -> tuple[list[str], np.ndarray]:
+        """Namen en een 3 x N-array (tijd, lat, lon) met de laatste positie per speler."""
+        names = [
+            name
+            for name in (self._tracks if players is None else players)
+            if name in self._tracks and self._tracks[name].size
+        ]
+        positions = np.empty((3, len(names)), dtype=np.float64)
+        for i, name in enumerate(names):
+            track = self._tracks[name]
+            positions[:, i] = track.data[:, track.size - 1]
+        return names, positions
+
+    def closest_to(
+        self, target: Location, max_age: float | None = None
+    ) -> list[tuple[str, float]]:
+        """Spelers gesorteerd op afstand (m) van hun laatste positie tot ``target``."""
+        names, positions = self.latest_positions()
+        if max_age is not None:
+            fresh = positions[0] >= time.time() - max_age
+            names = [name for name, keep in zip(names, fresh) if keep]
+            positions = positions[:, fresh]
+        distances = distances_to(positions[1], positions[2], target)
+        order = np.argsort(distances)
+        return [(names[i], float(distances[i])) for i in order]
+
+    def distance_trend(
+        self, player: str, target: Location, window: float = POSITION_TREND_WINDOW
+    ) -> tuple[float, float, float] | None:
+        """Afstand (m) tot ``target`` aan het begin en einde van het venster en de
+        gemiddelde verandering in m/min (negatief = nadert).
+
+        None als er in het venster minder dan twee posities zijn.
+        """
+        times, latitudes, longitudes = self.track(player, since=time.time() - window)
+        if times.size < 2 or times[-1] == times[0]:
+            return None
+        distances = distances_to(latitudes, longitudes, target)
+        # Kleinste-kwadratenhelling, robuuster dan enkel begin en einde
+        slope = np.polyfit((times - times[0]) / 60, distances, 1)[0]
+        return float(distances[0]), float(distances[-1]), float(slope)
+
+    def near(self, location: Location, radius_m: float) -> list[tuple[str, float]]:
+        """Spelers waarvan de laatste positie binnen ``radius_m`` van een punt ligt."""
+        candidates = self._candidates(location.latitude, location.longitude, radius_m)
+        names, positions = self.latest_positions(sorted(candidates))
+        distances = distances_to(positions[1], positions[2], location)
+        return sorted(
+            (
+                (name, float(distance))
+                for name, distance in zip(names, distances)
+                if distance <= radius_m
+            ),
+            key=lambda item: item[1],
+        )
+
+    def pairs_within(
+        self, radius_m: float = POSITION_NEAR_M
+    ) -> list[tuple[str, str, float]]:
+        """Paren spelers waarvan de laatste posities binnen ``radius_m`` liggen."""
+        names, positions = self.latest_positions()
+        index = {name: i for i, name in enumerate(names)}
+        first: list[int] = []
+        second: list[int] = []
+        for name in names:
+            i = index[name]
+            for other in self._candidates(positions[1, i], positions[2, i], radius_m):
+                j = index[other]
+                if j > i:
+                    first.append(i)
+                    second.append(j)
+        if not first:
+            return []
+        a, b = np.array(first), np.array(second)
+        distances = (
+            haversine_km_many(
+                positions[1, a], positions[2, a], positions[1, b], positions[2, b]
+            )
+            * 1000
+        )
+        close = np.flatnonzero(distances <= radius_m)
+        return sorted(
+            ((names[a[k]], names[b[k]], float(distances[k])) for k in close),
+            key=lambda item: item[2],
+        )
+
+    # ---------- Opslag ----------
+
+    def _snapshot(self) -> dict[str, np.ndarray]:
+        """Kopie van alle tracks in de opslagvorm: namen, aantallen en één 3 x N-array."""
+        names = list(self._tracks)
+        sizes = [self._tracks[name].size for name in names]
+        positions = np.concatenate(
+            [np.empty((3, 0), dtype=np.float64)]
+            + [self._tracks[name].data[:, :size] for name, size in zip(names, sizes)],
+            axis=1,
+        )
+        return {
+            "names": np.array(names, dtype=np.str_),
+            "sizes": np.array(sizes, dtype=np.int64),
+            "positions": positions,
+        }
+
+    def _write(self, snapshot: dict[str, np.ndarray]):
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, **snapshot)
+        atomic_write(self.path, buffer.getvalue())
+
+    async def _commit(self):
+        # De kopie wordt in de event loop genomen, zodat posities die tijdens het
+        # schrijven binnenkomen geen half gekopieerde arrays opleveren; comprimeren
+        # en schrijven gebeurt in een thread
+        snapshot = self._snapshot()
+        await asyncio.to_thread(self._write, snapshot)
+
+    def _commit_sync(self):
+        self._write(self._snapshot())
+
+    @classmethod
+    def load(cls, mission: str) -> "PositionHistory":
+        """Laad de geschiedenis van een missie, of begin een lege."""
+        history = cls(mission)
+        try:
+            with np.load(history.path, allow_pickle=False) as stored:
+                names, sizes, data = (
+                    stored["names"],
+                    stored["sizes"],
+                    stored["positions"],
+                )
+        except FileNotFoundError:
+            return history
+        except (OSError, ValueError, KeyError) as e:
+            log.error("Positiegeschiedenis van %s onleesbaar: %s", mission, e)
+            return history
+        offset = 0
+        for name, size in zip(names.tolist(), sizes.tolist()):
+            if not size:
+                continue
+            track = _Track(np.array(data[:, offset : offset + size], dtype=np.float64))
+            offset += size
+            history._tracks[name] = track
+            history._index(name, track.latitudes[-1], track.longitudes[-1])
+        return history
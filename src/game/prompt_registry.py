@@ -0,0 +1,121 @@
+"""Register van systeemprompts, in het geheugen gecachet met hot reload."""
+
+import asyncio
+import hashlib
+import logging
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+log = logging.getLogger("prompts")
+logging.basicConfig(level=logging.INFO)
+
+PROMPT_DIR = Path(__file__).parent / "prompts"
+# Seconden tussen twee controles op gewijzigde promptbestanden
+PROMPT_RELOAD_INTERVAL = float(os.getenv("PROMPT_RELOAD_INTERVAL", "5"))
+
+
+@dataclass(frozen=True)
+class Prompt:
+    """Een geladen prompt met de versie (hash) van de inhoud."""
+
+    name: str
+    text: str
+    version: str
+    mtime_ns: int
+
+
+class PromptRegistry:
+    """Laadt alle prompts uit een map één keer en serveert ze uit het geheugen.
+
+    ``refresh`` (periodiek aangeroepen door ``watch``) herlaadt alleen bestanden
+    waarvan de mtime is veranderd; ``get`` raakt de schijf nooit aan.
+    """
+
+    def __init__(self, prompt_dir: Path = PROMPT_DIR):
+        self.prompt_dir = prompt_dir
+        self._prompts: dict[str, Prompt] = {}
+        self._paths: dict[str, Path] = {}
+        self._watcher: asyncio.Task | None = None
+        self.refresh()
+
+    @staticmethod
+    def key(name: str) -> str:
+        """Normaliseer een promptnaam of pad (bv. ``prompts/Beacon.txt``) tot een sleutel."""
+        return Path(name).stem.lower()
+
+    def _load(self, path: Path, mtime_ns: int) -> Prompt:
+        text = path.read_text(encoding="utf-8")
+        version = hashlib.sha256(text.encode("utf-8")).hexdigest()[:12]
+        return Prompt(
+            name=self.key(path.name), text=text, version=version, mtime_ns=mtime_ns
+        )
+
+    def refresh(self) -> list[str]:
+        """Herlaad gewijzigde, nieuwe en verwijderde prompts; retourneer de gewijzigde namen."""
+        changed = []
+        seen = set()
+        for path in self.prompt_dir.glob("*.txt"):
+            key = self.key(path.name)
+            seen.add(key)
+            try:
+                mtime_ns = path.stat().st_mtime_ns
+            except FileNotFoundError:
+                continue
+            current = self._prompts.get(key)
+            if current is not None and current.mtime_ns == mtime_ns:
+                continue
+            prompt = self._load(path, mtime_ns)
+            self._prompts[key] = prompt
+            self._paths[key] = path
+            if current is not None and current.version != prompt.version:
+                log.info("Prompt %s herladen (versie %s)", key, prompt.version)
+                changed.append(key)
+        for key in set(self._prompts) - seen:
+            del self._prompts[key]
+            del self._paths[key]
+            changed.append(key)
+        return changed
+
+    async def watch(self, interval: float = PROMPT_RELOAD_INTERVAL):
+        """Controleer periodiek op gewijzigde prompts (als achtergrondtaak)."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.refresh)
+            except Exception as e:
+                log.error("Fout bij het herladen van prompts: %s", e)
+
+    def start_watching(self):
+        """Start ``watch`` als achtergrondtaak, als die nog niet loopt.
+
+        Zowel de bot als de API roepen dit aan; in één proces loopt er maar één.
+        """
+        if self._watcher is None or self._watcher.done():
+            self._watcher = asyncio.create_task(self.watch())
+
+    async def stop_watching(self):
+        """Stop de achtergrondtaak van ``start_watching``."""
+        watcher, self._watcher = self._watcher, None
+        if watcher is not None:
+            watcher.cancel()
+            await asyncio.gather(watcher, return_exceptions=True)
+
+    def get(self, name: str) -> Prompt:
+        """Retourneer een prompt; KeyError als hij niet bestaat."""
+        return self._prompts[self.key(name)]
+
+    def versions(self) -> dict[str, str]:
+        """Retourneer de huidige versie (hash) van elke prompt."""
+        return {key: prompt.version for key, prompt in sorted(self._prompts.items())}
+
+
+_registry: PromptRegistry | None = None
+
+
+def get_prompt_registry() -> PromptRegistry:
+    """Retourneer het gedeelde promptregister."""
+    global _registry
+    if _registry is None:
+        _registry = PromptRegistry()
+    return _registry
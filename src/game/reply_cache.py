@@ -0,0 +1,145 @@
+"""Cache van bot-antwoorden op herhaalde vragen, per missie en fase.
+
+Alleen antwoorden van beurten die uitsluitend de vaste missiegegevens opvroegen
+(context en doelen, zie ``STATIC_TOOLS``) worden bewaard; die zijn voor elke
+speler gelijk. Beurten zonder tools of met andere tools (posities, spelers)
+kunnen van de afzender of het gesprek afhangen en worden nooit gecachet.
+
+Een antwoord wordt hergebruikt zolang de missie niet veranderd is: de sleutel
+bevat de toestandsversie van de missie, die ophoogt bij elke wijzigende tool,
+elke gemelde positie en elke faseovergang.
+"""
+
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+
+from ..telemetry.metrics import REGISTRY, Counter
+
+log = logging.getLogger("reply-cache")
+logging.basicConfig(level=logging.INFO)
+
+# Fases waarin antwoorden gecachet worden, kommagescheiden (leeg = uit), bv. "exfil"
+REPLY_CACHE_STAGES = {
+    stage.strip().lower()
+    for stage in os.getenv("REPLY_CACHE_STAGES", "").split(",")
+    if stage.strip()
+}
+# Maximaal aantal antwoorden en hun levensduur (s)
+REPLY_CACHE_SIZE = int(os.getenv("REPLY_CACHE_SIZE", "256"))
+REPLY_CACHE_TTL = float(os.getenv("REPLY_CACHE_TTL", "600"))
+
+# Tools waarvan het resultaat alleen afhangt van de vaste missiegegevens
+STATIC_TOOLS = frozenset({"get_mission_context", "get_mission_objectives"})
+
+LOOKUPS = Counter(
+    "hq_reply_cache_lookups_total",
+    "Opzoekingen in de antwoordcache.",
+    ("stage", "result"),
+)
+
+# "Naam: " vooraan elke regel, zoals de runner berichten doorgeeft
+_SENDER = re.compile(r"^[^:\n]{1,40}:\s*", re.MULTILINE)
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+CacheKey = tuple[str, str, int, str]
+
+
+def normalize_message(message: str) -> str:
+    """Normaliseer een bericht zodat kleine verschillen dezelfde sleutel geven."""
+    text = _SENDER.sub("", message).lower()
+    text = _PUNCTUATION.sub(" ", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+class ReplyCache:
+    """LRU/TTL-cache van antwoorden, gesleuteld op (missie, fase, versie, bericht)."""
+
+    def __init__(
+        self,
+        stages: set[str] = REPLY_CACHE_STAGES,
+        maxsize: int = REPLY_CACHE_SIZE,
+        ttl: float = REPLY_CACHE_TTL,
+    ):
+        self.stages = set(stages)
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[CacheKey, tuple[float, str]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def enabled_for(self, stage: str) -> bool:
+        return stage in self.stages
+
+    @staticmethod
+    def cacheable(tools: set[str]) -> bool:
+        """Of een beurt met deze tool calls een antwoord gaf dat voor iedereen geldt."""
+        return bool(tools) and tools <= STATIC_TOOLS
+
+    @staticmethod
+    def key(mission: str, stage: str, version: int, message: str) -> CacheKey | None:
+        """De sleutel voor een bericht, of None als er niets te cachen valt."""
+        normalized = normalize_message(message)
+        if not normalized:
+            return None
+        return (mission.lower(), stage, version, normalized)
+
+    def get(self, key: CacheKey) -> str | None:
+        """Retourneer een nog geldig antwoord, of None."""
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[0] > self.ttl:
+            del self._entries[key]
+            self.expired += 1
+            entry = None
+        if entry is None:
+            self.misses += 1
+            LOOKUPS.labels(stage=key[1], result="miss").inc()
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        LOOKUPS.labels(stage=key[1], result="hit").inc()
+        return entry[1]
+
+    def put(self, key: CacheKey, reply: str):
+        self._entries[key] = (time.monotonic(), reply)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict[str, int | float]:
+        """Retourneer tellers en het hitpercentage van de cache."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expired": self.expired,
+        }
+
+
+_cache: ReplyCache | None = None
+
+
+def get_reply_cache() -> ReplyCache:
+    """Retourneer de gedeelde antwoordcache."""
+    global _cache
+    if _cache is None:
+        _cache = ReplyCache()
+    return _cache
+
+
+REGISTRY.add_collector("hq_reply_cache", lambda: get_reply_cache().stats())
@@ -0,0 +1,472 @@
+"""Opslag-backends voor missies en spelers (JSON-bestanden of SQLite)."""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+
+from .persistence import atomic_write
+
+# "json" (één mission.json per missie) of "sqlite" (genormaliseerd in DB_PATH)
+MISSION_STORE = os.getenv("MISSION_STORE", "json")
+
+
+def get_data_dir() -> Path:
+    """Retourneer de map waarin spelgegevens worden opgeslagen."""
+    return Path(os.getenv("DATA_DIR", "data"))
+
+
+class MissionStore(ABC):
+    """Basisclass voor een opslag-backend.
+
+    Missies worden uitgewisseld als dicts (``Mission.model_dump(mode="json")``),
+    zodat de backend los staat van de pydantic-modellen.
+    """
+
+    # Of losse spelers kunnen worden bijgewerkt zonder de hele missie te herschrijven
+    row_level_players = False
+
+    @abstractmethod
+    def load_mission(self, mission_ref: str) -> dict:
+        """Laad een missie; geeft FileNotFoundError als hij niet bestaat."""
+
+    @abstractmethod
+    def save_mission(self, data: dict) -> int | None:
+        """Sla een volledige missie op en retourneer de nieuwe versie."""
+
+    @abstractmethod
+    def save_mission_meta(self, data: dict) -> int | None:
+        """Sla een missie op zonder haar spelers te herschrijven; retourneer de nieuwe versie."""
+
+    @abstractmethod
+    def upsert_players(self, mission_ref: str, players: list[dict]) -> int | None:
+        """Voeg spelers toe aan een missie of werk ze bij; retourneer de nieuwe versie."""
+
+    def load_players(self, mission_ref: str) -> list[dict]:
+        """Laad alle spelers van een missie."""
+        return self.load_mission(mission_ref).get("players", [])
+
+    def load_player(self, mission_ref: str, name: str) -> dict:
+        """Laad één speler; geeft FileNotFoundError als hij niet bestaat."""
+        for player in self.load_players(mission_ref):
+            if player["name"] == name:
+                return player
+        raise FileNotFoundError(f"Speler {name} niet gevonden in {mission_ref}")
+
+    @abstractmethod
+    def list_missions(self, active_only: bool = False) -> list[str]:
+        """Retourneer de namen van alle (actieve) missies."""
+
+    def all_players(self) -> list[tuple[str, dict]]:
+        """Retourneer alle spelers over alle missies als (missie, speler)."""
+        return [
+            (mission, player)
+            for mission in self.list_missions()
+            for player in self.load_players(mission)
+        ]
+
+    @abstractmethod
+    def version(self, mission_ref: str) -> int | None:
+        """Retourneer een versie die verandert bij elke opgeslagen wijziging."""
+
+    async def run(self, func, *args, **kwargs):
+        """Voer een (blokkerende) store-operatie uit buiten de event loop."""
+        return await asyncio.to_thread(func, *args, **kwargs)
+
+
+class JsonMissionStore(MissionStore):
+    """Slaat elke missie op als JSON-document in ``DATA_DIR/<missie>/mission.json``."""
+
+    def __init__(self, data_dir: Path | None = None):
+        self._data_dir = data_dir
+
+    @property
+    def data_dir(self) -> Path:
+        return self._data_dir or get_data_dir()
+
+    def path(self, mission_ref: str) -> Path:
+        """Retourneer het pad van het missiebestand (hoofdletterongevoelig)."""
+        mission_dir = self.data_dir / mission_ref
+        if not mission_dir.exists() and self.data_dir.exists():
+            key = mission_ref.strip().lower()
+            for candidate in self.data_dir.iterdir():
+                if candidate.name.lower() == key and candidate.is_dir():
+                    return candidate / "mission.json"
+        return mission_dir / "mission.json"
+
+    def load_mission(self, mission_ref: str) -> dict:
+        with open(self.path(mission_ref), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def save_mission(self, data: dict) -> int | None:
+        path = self.path(data["name"])
+        atomic_write(path, json.dumps(data, indent=2, ensure_ascii=False))
+        return path.stat().st_mtime_ns
+
+    def save_mission_meta(self, data: dict) -> int | None:
+        # Eén document: de spelers uit het bestand blijven staan
+        try:
+            players = self.load_mission(data["name"]).get("players", [])
+        except FileNotFoundError:
+            players = []
+        return self.save_mission({**data, "players": players})
+
+    def upsert_players(self, mission_ref: str, players: list[dict]) -> int | None:
+        data = self.load_mission(mission_ref)
+        by_name = {player["name"]: player for player in players}
+        existing = data.setdefault("players", [])
+        for i, player in enumerate(existing):
+            if player["name"] in by_name:
+                existing[i] = by_name.pop(player["name"])
+        existing.extend(by_name.values())
+        return self.save_mission(data)
+
+    def list_missions(self, active_only: bool = False) -> list[str]:
+        if not self.data_dir.exists():
+            return []
+        names = []
+        for path in sorted(self.data_dir.glob("*/mission.json")):
+            if active_only:
+                stage = json.loads(path.read_text(encoding="utf-8")).get("stage")
+                if stage == "completed":
+                    continue
+            names.append(path.parent.name)
+        return names
+
+    def version(self, mission_ref: str) -> int | None:
+        try:
+            return self.path(mission_ref).stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS missions (
+    key TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    distance REAL NOT NULL,
+    mission_context TEXT,
+    mission_objectives TEXT,
+    data TEXT NOT NULL DEFAULT '{}',
+    version INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS missions_stage ON missions (stage);
+CREATE TABLE IF NOT EXISTS players (
+    mission TEXT NOT NULL REFERENCES missions (key) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (mission, name)
+);
+CREATE INDEX IF NOT EXISTS players_name ON players (name);
+CREATE TABLE IF NOT EXISTS bots (
+    mission TEXT NOT NULL REFERENCES missions (key) ON DELETE CASCADE,
+    stage TEXT NOT NULL,
+    name TEXT NOT NULL,
+    conversation_id TEXT,
+    openai_model TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (mission, stage)
+);
+CREATE INDEX IF NOT EXISTS bots_conversation ON bots (conversation_id);
+CREATE TABLE IF NOT EXISTS locations (
+    mission TEXT NOT NULL REFERENCES missions (key) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    latitude REAL NOT NULL,
+    longitude REAL NOT NULL,
+    PRIMARY KEY (mission, kind)
+);
+"""
+
+# Missievelden met een eigen kolom of tabel; de rest gaat in missions.data
+_MISSION_COLUMNS = {
+    "name",
+    "stage",
+    "distance",
+    "mission_context",
+    "mission_objectives",
+}
+_LOCATION_FIELDS = {"hq_location": "hq", "drop_point": "drop"}
+
+
+class SqliteMissionStore(MissionStore):
+    """Slaat missies genormaliseerd op in SQLite (WAL), met één worker-thread."""
+
+    row_level_players = True
+
+    def __init__(self, db_path: Path, json_fallback: JsonMissionStore | None = None):
+        self.db_path = db_path
+        self.json_fallback = json_fallback
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(_SCHEMA)
+
+    @staticmethod
+    def key(mission_ref: str) -> str:
+        return mission_ref.strip().lower()
+
+    async def run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, partial(func, *args, **kwargs)
+        )
+
+    def close(self):
+        """Sluit de databaseverbinding."""
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            self._conn.close()
+
+    def load_mission(self, mission_ref: str) -> dict:
+        key = self.key(mission_ref)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM missions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                missing = True
+            else:
+                missing = False
+                players = self._conn.execute(
+                    "SELECT data FROM players WHERE mission = ? ORDER BY rowid", (key,)
+                ).fetchall()
+                bots = self._conn.execute(
+                    "SELECT stage, data FROM bots WHERE mission = ?", (key,)
+                ).fetchall()
+                locations = self._conn.execute(
+                    "SELECT kind, latitude, longitude FROM locations WHERE mission = ?",
+                    (key,),
+                ).fetchall()
+        if missing:
+            if self.json_fallback is not None:
+                # Eenmalige migratie van een bestaand mission.json
+                data = self.json_fallback.load_mission(mission_ref)
+                self.save_mission(data)
+                return data
+            raise FileNotFoundError(f"Missie {mission_ref} niet gevonden")
+
+        data = json.loads(row["data"])
+        data.update(
+            name=row["name"],
+            stage=row["stage"],
+            distance=row["distance"],
+            mission_context=row["mission_context"],
+            mission_objectives=(
+                json.loads(row["mission_objectives"])
+                if row["mission_objectives"] is not None
+                else None
+            ),
+            players=[json.loads(p["data"]) for p in players],
+            bots={b["stage"]: json.loads(b["data"]) for b in bots},
+        )
+        kinds = {loc["kind"]: loc for loc in locations}
+        for field, kind in _LOCATION_FIELDS.items():
+            loc = kinds.get(kind)
+            data[field] = (
+                {"latitude": loc["latitude"], "longitude": loc["longitude"]}
+                if loc is not None
+                else None
+            )
+        return data
+
+    def save_mission(self, data: dict) -> int | None:
+        key = self.key(data["name"])
+        players = data.get("players", [])
+        with self._lock, self._conn:
+            self._write_mission(key, data)
+            self._conn.execute(
+                f"DELETE FROM players WHERE mission = ? AND name NOT IN "
+                f"({','.join('?' * len(players))})",
+                (key, *(p["name"] for p in players)),
+            )
+            self._upsert_players(key, players)
+            return self._version(key)
+
+    def save_mission_meta(self, data: dict) -> int | None:
+        key = self.key(data["name"])
+        with self._lock, self._conn:
+            self._write_mission(key, data)
+            return self._version(key)
+
+    def _write_mission(self, key: str, data: dict):
+        """Schrijf de missierij, bots en locaties (binnen een lopende transactie)."""
+        extra = {
+            k: v
+            for k, v in data.items()
+            if k not in _MISSION_COLUMNS
+            and k not in _LOCATION_FIELDS
+            and k not in ("players", "bots")
+        }
+        objectives = data.get("mission_objectives")
+        self._conn.execute(
+            """
+            INSERT INTO missions (key, name, stage, distance, mission_context,
+                mission_objectives, data, version, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?)
+            ON CONFLICT (key) DO UPDATE SET
+                name = excluded.name,
+                stage = excluded.stage,
+                distance = excluded.distance,
+                mission_context = excluded.mission_context,
+                mission_objectives = excluded.mission_objectives,
+                data = excluded.data,
+                version = missions.version + 1,
+                updated_at = excluded.updated_at
+            """,
+            (
+                key,
+                data["name"],
+                data.get("stage", "intake"),
+                data.get("distance", 10.0),
+                data.get("mission_context"),
+                json.dumps(objectives, ensure_ascii=False)
+                if objectives is not None
+                else None,
+                json.dumps(extra, ensure_ascii=False),
+                time.time(),
+            ),
+        )
+        bots = data.get("bots", {})
+        self._conn.execute(
+            f"DELETE FROM bots WHERE mission = ? AND stage NOT IN "
+            f"({','.join('?' * len(bots))})",
+            (key, *bots),
+        )
+        self._conn.executemany(
+            """
+            INSERT INTO bots (mission, stage, name, conversation_id, openai_model, data)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (mission, stage) DO UPDATE SET
+                name = excluded.name,
+                conversation_id = excluded.conversation_id,
+                openai_model = excluded.openai_model,
+                data = excluded.data
+            """,
+            [
+                (
+                    key,
+                    stage,
+                    bot["name"],
+                    bot.get("conversation_id"),
+                    bot.get("openai_model"),
+                    json.dumps(bot, ensure_ascii=False),
+                )
+                for stage, bot in bots.items()
+            ],
+        )
+        for field, kind in _LOCATION_FIELDS.items():
+            loc = data.get(field)
+            if loc is None:
+                self._conn.execute(
+                    "DELETE FROM locations WHERE mission = ? AND kind = ?",
+                    (key, kind),
+                )
+            else:
+                self._conn.execute(
+                    """
+                    INSERT INTO locations (mission, kind, latitude, longitude)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT (mission, kind) DO UPDATE SET
+                        latitude = excluded.latitude,
+                        longitude = excluded.longitude
+                    """,
+                    (key, kind, loc["latitude"], loc["longitude"]),
+                )
+
+    def _upsert_players(self, key: str, players: list[dict]):
+        self._conn.executemany(
+            """
+            INSERT INTO players (mission, name, data) VALUES (?, ?, ?)
+            ON CONFLICT (mission, name) DO UPDATE SET data = excluded.data
+            """,
+            [(key, p["name"], json.dumps(p, ensure_ascii=False)) for p in players],
+        )
+
+    def upsert_players(self, mission_ref: str, players: list[dict]) -> int | None:
+        key = self.key(mission_ref)
+        with self._lock, self._conn:
+            exists = self._conn.execute(
+                "SELECT 1 FROM missions WHERE key = ?", (key,)
+            ).fetchone()
+            if exists is None:
+                raise FileNotFoundError(f"Missie {mission_ref} niet gevonden")
+            self._upsert_players(key, players)
+            self._conn.execute(
+                "UPDATE missions SET version = version + 1, updated_at = ? WHERE key = ?",
+                (time.time(), key),
+            )
+            return self._version(key)
+
+    def load_players(self, mission_ref: str) -> list[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM players WHERE mission = ? ORDER BY rowid",
+                (self.key(mission_ref),),
+            ).fetchall()
+        return [json.loads(row["data"]) for row in rows]
+
+    def load_player(self, mission_ref: str, name: str) -> dict:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM players WHERE mission = ? AND name = ?",
+                (self.key(mission_ref), name),
+            ).fetchone()
+        if row is None:
+            raise FileNotFoundError(f"Speler {name} niet gevonden in {mission_ref}")
+        return json.loads(row["data"])
+
+    def list_missions(self, active_only: bool = False) -> list[str]:
+        query = "SELECT name FROM missions"
+        if active_only:
+            query += " WHERE stage != 'completed'"
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY key").fetchall()
+        return [row["name"] for row in rows]
+
+    def all_players(self) -> list[tuple[str, dict]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT m.name, p.data FROM players p JOIN missions m ON m.key = p.mission"
+                " ORDER BY p.mission, p.rowid"
+            ).fetchall()
+        return [(row[0], json.loads(row[1])) for row in rows]
+
+    def _version(self, key: str) -> int | None:
+        row = self._conn.execute(
+            "SELECT version FROM missions WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row is not None else None
+
+    def version(self, mission_ref: str) -> int | None:
+        with self._lock:
+            return self._version(self.key(mission_ref))
+
+
+_store: MissionStore | None = None
+
+
+def get_store() -> MissionStore:
+    """Retourneer de geconfigureerde opslag-backend."""
+    global _store
+    if _store is None:
+        if MISSION_STORE == "sqlite":
+            db_path = Path(
+                os.getenv("DB_PATH", str(get_data_dir() / "conversation.db"))
+            )
+            _store = SqliteMissionStore(db_path, json_fallback=JsonMissionStore())
+        else:
+            _store = JsonMissionStore()
+    return _store
@@ -0,0 +1,153 @@
+"""Centrale registratie van tools die bots kunnen aanroepen."""
+
+import inspect
+import logging
+import typing
+from dataclasses import dataclass
+
+from pydantic import BaseModel, ConfigDict, TypeAdapter, ValidationError, create_model
+
+log = logging.getLogger("tools")
+logging.basicConfig(level=logging.INFO)
+
+EMPTY_PARAMETERS: dict = {"type": "object", "properties": {}, "required": []}
+
+
+class ToolArgumentError(ValueError):
+    """De argumenten van een tool call zijn ongeldig."""
+
+
+def _signature_model(func: typing.Callable) -> type[BaseModel]:
+    """Bouw een pydantic-model op basis van de signatuur van een functie."""
+    hints = typing.get_type_hints(func)
+    fields = {}
+    for param in inspect.signature(func).parameters.values():
+        if param.name == "self" or param.kind in (
+            param.VAR_POSITIONAL,
+            param.VAR_KEYWORD,
+        ):
+            continue
+        annotation = hints.get(param.name, typing.Any)
+        default = ... if param.default is param.empty else param.default
+        fields[param.name] = (annotation, default)
+    return create_model(
+        f"{func.__name__}_arguments",
+        __config__=ConfigDict(extra="ignore"),
+        **fields,
+    )
+
+
+@dataclass(frozen=True)
+class ToolSpec:
+    """Een geregistreerde tool met voorgecompileerd schema en validator."""
+
+    name: str
+    description: str
+    func: typing.Callable[..., typing.Awaitable[str]]
+    parameters: dict
+    validator: TypeAdapter
+    read_only: bool
+    method: bool
+
+    @property
+    def schema(self) -> dict:
+        """Het tool-schema zoals de Responses API het verwacht."""
+        return {
+            "type": "function",
+            "name": self.name,
+            "description": self.description,
+            "parameters": self.parameters,
+        }
+
+    def parse(self, arguments: str | None) -> dict:
+        """Valideer de JSON-argumenten van een tool call."""
+        try:
+            parsed = self.validator.validate_json(arguments or "{}")
+        except ValidationError as e:
+            raise ToolArgumentError(str(e)) from e
+        return dict(parsed)
+
+    async def call(self, owner, arguments: str | None) -> str:
+        """Valideer de argumenten en voer de tool uit."""
+        kwargs = self.parse(arguments)
+        if self.method:
+            return await self.func(owner, **kwargs)
+        return await self.func(**kwargs)
+
+
+class ToolRegistry:
+    """Register van tools, gevuld met de ``tool``-decorator."""
+
+    def __init__(self):
+        self._tools: dict[str, ToolSpec] = {}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._tools
+
+    def __iter__(self):
+        return iter(self._tools.values())
+
+    def get(self, name: str) -> ToolSpec | None:
+        """Retourneer de tool met de gegeven naam, of None."""
+        return self._tools.get(name)
+
+    def tool(
+        self,
+        description: str,
+        *,
+        name: str | None = None,
+        parameters: dict | None = None,
+        model: type[BaseModel] | None = None,
+        read_only: bool = False,
+    ):
+        """Registreer een (async) functie of Mission-methode als tool.
+
+        Zonder ``parameters`` wordt het schema afgeleid van ``model`` of van de
+        signatuur van de functie; de validator volgt ``model`` of de signatuur.
+        """
+
+        def decorator(func):
+            tool_name = name or func.__name__
+            if tool_name in self._tools:
+                raise ValueError(f"Tool {tool_name} is al geregistreerd.")
+            if model is None and any(
+                param.kind == param.VAR_KEYWORD
+                for param in inspect.signature(func).parameters.values()
+            ):
+                # _signature_model slaat **kwargs over; die argumenten zouden
+                # stilzwijgend verdwijnen
+                raise ValueError(f"Tool {tool_name} met **kwargs vereist een model.")
+            arguments_model = model or _signature_model(func)
+            schema = parameters
+            if schema is None:
+                schema = arguments_model.model_json_schema(mode="serialization")
+                schema.pop("title", None)
+                schema.pop("$defs", None)
+            first_param = next(iter(inspect.signature(func).parameters), None)
+            self._tools[tool_name] = ToolSpec(
+                name=tool_name,
+                description=description,
+                func=func,
+                parameters=schema,
+                validator=TypeAdapter(arguments_model),
+                read_only=read_only,
+                method=first_param == "self",
+            )
+            return func
+
+        return decorator
+
+    def resolve(self, names: list[str]) -> dict[str, ToolSpec]:
+        """Zoek de tools op voor een lijst namen, in die volgorde."""
+        specs = {}
+        for tool_name in names:
+            spec = self._tools.get(tool_name)
+            if spec is None:
+                log.warning("Onbekende tool %s", tool_name)
+                continue
+            specs[tool_name] = spec
+        return specs
+
+
+registry = ToolRegistry()
+tool = registry.tool
@@ -1,51 +1,165 @@
 """Hulpprogramma's voor het spel."""
 
+import asyncio
 import json
-import os
 import typing
 
+from .log_reader import read_logs
+from .logger import get_log_writer
 from .models.player import Player
+from .tool_registry import registry, tool
 
+_player_schema = Player.tool_schema()
+_mission_parameter = {
+    "type": "string",
+    "description": "Naam van de missie.",
+}
+
+
+class _CreatePlayerArguments(Player):
+    """Argumenten van ``create_player``: de spelervelden plus de missie."""
+
+    mission: str
 
-async def create_player(**kwargs) -> str:
+
+@tool(
+    "Maak een nieuwe speler aan in het systeem of overschrijf een bestaande speler.",
+    parameters={
+        **_player_schema,
+        "properties": {"mission": _mission_parameter, **_player_schema["properties"]},
+        "required": ["mission", *_player_schema.get("required", [])],
+    },
+    model=_CreatePlayerArguments,
+)
+async def create_player(mission: str, **kwargs) -> str:
     """Maak een nieuwe speler aan."""
+    from .mission_cache import get_mission_cache
+
     player = Player.model_validate(kwargs)
-    player = typing.cast(Player, player)
-    player.save()
+    # Via de gecachte missie, zodat haar spelers en de opslag gelijk blijven
+    try:
+        target = await get_mission_cache().get(mission)
+    except FileNotFoundError:
+        return "Missie niet gevonden."
+    target.upsert_player(player)
     return player.model_dump_json(ensure_ascii=False)
 
 
+@tool(
+    "Haal een speler op op basis van callsign.",
+    parameters={
+        "type": "object",
+        "properties": {
+            "name": {
+                "type": "string",
+                "description": "Callsign van de speler.",
+            },
+            "mission": _mission_parameter,
+        },
+        "required": ["name", "mission"],
+    },
+    read_only=True,
+)
 async def get_player(name: str, mission: str) -> str:
     """Haal een speler op op basis van callsign."""
+    from .mission_cache import get_mission_cache
+
     try:
-        player = Player.load(name=name, mission_ref=mission)
-        return player.model_dump_json(ensure_ascii=False)
+        target = await get_mission_cache().get(mission)
     except FileNotFoundError:
         return "Speler niet gevonden."
-
-
+    for player in target.players:
+        if player.name == name:
+            return player.model_dump_json(ensure_ascii=False)
+    return "Speler niet gevonden."
+
+
+@tool(
+    "Haal alle spelers van een missie op.",
+    name="get_players",
+    parameters={
+        "type": "object",
+        "properties": {"mission": _mission_parameter},
+        "required": ["mission"],
+    },
+    read_only=True,
+)
 async def get_all_players(mission: str) -> str:
     """Haal alle spelers op."""
-    players = Player.load_all(mission_ref=mission)
+    from .mission_cache import get_mission_cache
+
+    try:
+        players = (await get_mission_cache().get(mission)).players
+    except FileNotFoundError:
+        return "Missie niet gevonden."
     if not players:
         return "Er zijn geen spelers gevonden."
     players = [player.model_dump_json(ensure_ascii=False) for player in players]
     return json.dumps(players, ensure_ascii=False)
 
 
-async def get_logs(top_n: int = 10) -> str:
-    """Haal de laatste N logberichten op."""
-    log_path = "data/game_log.jsonl"
-    if not os.path.exists(log_path):
+@tool(
+    "Haal de laatste N logberichten op, optioneel gefilterd op kanaal, afzender of tijd.",
+    parameters={
+        "type": "object",
+        "properties": {
+            "top_n": {
+                "type": "integer",
+                "description": "Het aantal logberichten om op te halen.",
+                "default": 10,
+            },
+            "channel": {
+                "type": "string",
+                "description": "Alleen berichten uit dit kanaal.",
+            },
+            "sender": {
+                "type": "string",
+                "description": "Alleen berichten van deze afzender.",
+            },
+            "since": {
+                "type": "string",
+                "description": "Alleen berichten vanaf deze ISO-timestamp.",
+            },
+            "until": {
+                "type": "string",
+                "description": "Alleen berichten tot en met deze ISO-timestamp.",
+            },
+        },
+        "required": [],
+    },
+    read_only=True,
+)
+async def get_logs(
+    top_n: int = 10,
+    channel: str | None = None,
+    sender: str | None = None,
+    since: str | None = None,
+    until: str | None = None,
+) -> str:
+    """Haal de laatste N logberichten op, optioneel gefilterd."""
+    await get_log_writer().flush()
+    entries = await asyncio.to_thread(
+        read_logs, top_n, channel=channel, sender=sender, since=since, until=until
+    )
+    if not entries:
         return "Er zijn geen logberichten gevonden."
-
-    with open(log_path, "r", encoding="utf-8") as f:
-        lines = f.readlines()
-
-    last_lines = lines[-top_n:]
-    return "[" + ",".join(line.strip() for line in last_lines) + "]"
+    return json.dumps(entries, ensure_ascii=False)
 
 
+@tool(
+    "Stuur een bericht naar het Commando (de spelleiding) en ontvang een antwoord. Stuur een bericht als de spelers een spelactie uitvoeren of als ze iets doen wat het Commando moet weten. Geef het antwoord ongewijzigd terug aan de spelers.",
+    parameters={
+        "type": "object",
+        "properties": {
+            "message": {
+                "type": "string",
+                "description": "Het bericht dat naar het Commando (de spelleiding) wordt gestuurd.",
+            },
+            "mission": _mission_parameter,
+        },
+        "required": ["message", "mission"],
+    },
+)
 async def chat_with_dm(message: str, mission: str) -> str | None:
     """Stuur een bericht naar een bot en ontvang een antwoord."""
     from .models.bot import Commando, get_system_prompt
@@ -57,7 +171,7 @@ async def chat_with_dm(message: str, mission: str) -> str | None:
             name="COMMANDO",
             mission_ref=mission,
             system_prompt=get_system_prompt("src/game/prompts/DM.txt"),
-            tool_names=[get_player.__name__, get_all_players.__name__],
+            tool_names=["get_player", "get_players"],
         )
 
     response = await dm.chat(message)
@@ -65,103 +179,8 @@ async def chat_with_dm(message: str, mission: str) -> str | None:
 
 
 _tool_functions = [create_player, get_player, get_all_players, get_logs, chat_with_dm]
+_tool_specs = [spec for spec in registry if spec.func in _tool_functions]
 TOOL_MAP: dict[str, typing.Callable[..., typing.Awaitable[str]]] = {
-    func.__name__: func for func in _tool_functions
-}
-TOOL_SCHEMAS: dict[str, dict] = {
-    create_player.__name__: {
-        "type": "function",
-        "name": create_player.__name__,
-        "description": "Maak een nieuwe speler aan in het systeem of overschrijf een bestaande speler.",
-        "parameters": Player.tool_schema(),
-    },
-    get_player.__name__: {
-        "type": "function",
-        "name": get_player.__name__,
-        "description": "Haal een speler op op basis van callsign.",
-        "parameters": {
-            "type": "object",
-            "properties": {
-                "callsign": {
-                    "type": "string",
-                    "description": "Callsign van de speler.",
-                },
-            },
-            "required": ["callsign"],
-        },
-        "return_schema": Player.tool_schema(),
-    },
-    get_all_players.__name__: {
-        "type": "function",
-        "name": get_all_players.__name__,
-        "description": "Haal alle spelers op.",
-        "parameters": {
-            "type": "object",
-            "properties": {
-                "mission": {
-                    "type": "string",
-                    "description": "Naam van de missie.",
-                },
-            },
-        },
-        "return_schema": {
-            "type": "array",
-            "items": Player.tool_schema(),
-        },
-    },
-    get_logs.__name__: {
-        "type": "function",
-        "name": get_logs.__name__,
-        "description": "Haal de laatste N logberichten op.",
-        "parameters": {
-            "type": "object",
-            "properties": {
-                "top_n": {
-                    "type": "integer",
-                    "description": "Het aantal logberichten om op te halen.",
-                    "default": 10,
-                },
-            },
-            "required": [],
-        },
-        "return_schema": {
-            "type": "array",
-            "items": {
-                "type": "object",
-                "properties": {
-                    "ts": {
-                        "type": "string",
-                        "description": "Timestamp van het logbericht.",
-                    },
-                    "sender": {
-                        "type": "string",
-                        "description": "Afzender van het bericht.",
-                    },
-                    "content": {
-                        "type": "string",
-                        "description": "Inhoud van het bericht.",
-                    },
-                },
-            },
-        },
-    },
-    chat_with_dm.__name__: {
-        "type": "function",
-        "name": chat_with_dm.__name__,
-        "description": "Stuur een bericht naar het Commando (de spelleiding) en ontvang een antwoord. Stuur een bericht als de spelers een spelactie uitvoeren of als ze iets doen wat het Commando moet weten.",
-        "parameters": {
-            "type": "object",
-            "properties": {
-                "message": {
-                    "type": "string",
-                    "description": "Het bericht dat naar het Commando (de spelleiding) wordt gestuurd.",
-                },
-            },
-            "required": ["message"],
-        },
-        "return_schema": {
-            "type": ["string", "null"],
-            "description": "Het antwoord van het Commando (de spelleiding), of null als er geen antwoord is. Geef deze informatie terug aan de spelers zonder wijzigingen.",
-        },
-    },
+    spec.name: spec.func for spec in _tool_specs
 }
+TOOL_SCHEMAS: dict[str, dict] = {spec.name: spec.schema for spec in _tool_specs}
@@ -0,0 +1,20 @@
+"""Luisteraars voor tussentijdse gebeurtenissen tijdens een bot-beurt."""
+
+
+class TurnListener:
+    """Ontvangt gebeurtenissen terwijl een bot-beurt loopt (bv. voor streaming).
+
+    Subclasses overschrijven alleen de methodes die ze nodig hebben.
+    """
+
+    async def on_request(self) -> None:
+        """Een Responses-ronde wordt naar OpenAI verstuurd."""
+
+    async def on_text_delta(self, delta: str) -> None:
+        """Er is een nieuw stuk tekst van de bot binnengekomen."""
+
+    async def on_tool_call(self, name: str, arguments: str) -> None:
+        """De bot vraagt een tool aan."""
+
+    async def on_tool_result(self, name: str, output: str) -> None:
+        """Een tool is uitgevoerd."""
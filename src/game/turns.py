@@ -0,0 +1,51 @@
+"""Serialisatie van beurten per missie."""
+
+import asyncio
+import os
+from contextlib import AsyncExitStack, asynccontextmanager
+
+from ..telemetry.tracing import span
+
+# Maximaal aantal gelijktijdige bot-beurten over alle missies heen
+MAX_CONCURRENT_TURNS = int(os.getenv("MAX_CONCURRENT_TURNS", "8"))
+
+# Per missie: het lock en het aantal beurten dat het vasthoudt of erop wacht
+_locks: dict[str, tuple[asyncio.Lock, int]] = {}
+_semaphore: asyncio.Semaphore | None = None
+
+
+def mission_key(mission_ref: str) -> str:
+    """Normaliseer een missienaam of categorienaam tot een sleutel."""
+    return mission_ref.strip().lower()
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(MAX_CONCURRENT_TURNS)
+    return _semaphore
+
+
+def is_busy(mission_ref: str) -> bool:
+    """Geef aan of er een beurt loopt of wacht voor de missie."""
+    return mission_key(mission_ref) in _locks
+
+
+@asynccontextmanager
+async def mission_turn(mission_ref: str):
+    """Voer een beurt uit: geordend binnen een missie, parallel tussen missies."""
+    key = mission_key(mission_ref)
+    lock, users = _locks.get(key, (asyncio.Lock(), 0))
+    _locks[key] = (lock, users + 1)
+    try:
+        async with AsyncExitStack() as stack:
+            with span("turn_lock_wait"):
+                await stack.enter_async_context(lock)
+                await stack.enter_async_context(_get_semaphore())
+            yield
+    finally:
+        lock, users = _locks[key]
+        if users <= 1:
+            del _locks[key]
+        else:
+            _locks[key] = (lock, users - 1)
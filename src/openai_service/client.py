@@ -1,10 +1,72 @@
 """OpenAI-clientconfiguratie."""
 
+import importlib.util
+import logging
 import os
 
+import httpx
 import instructor
 from openai import AsyncOpenAI
 
+log = logging.getLogger("openai-client")
+logging.basicConfig(level=logging.INFO)
+
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+# Alternatieve API-URL, bv. de lokale nepserver (http://127.0.0.1:8765/v1)
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+
+# Grootte van de connection pool naar OpenAI
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "32"))
+OPENAI_MAX_KEEPALIVE = int(os.getenv("OPENAI_MAX_KEEPALIVE", "16"))
+OPENAI_KEEPALIVE_EXPIRY = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "60"))
+# Timeouts (s) per poging: verbinden en totaal; de deadline per fase geldt daarbovenop
+OPENAI_CONNECT_TIMEOUT = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "5"))
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "60"))
+# HTTP/2 gebruiken als het h2-pakket beschikbaar is
+OPENAI_HTTP2 = os.getenv("OPENAI_HTTP2", "1") == "1"
+
+
+def _http_client(
+    transport: httpx.AsyncBaseTransport | None = None,
+) -> httpx.AsyncClient:
+    http2 = OPENAI_HTTP2 and importlib.util.find_spec("h2") is not None
+    # Een eigen transport (bv. de nepserver) bepaalt zelf het protocol
+    if OPENAI_HTTP2 and not http2 and transport is None:
+        log.info("HTTP/2 niet beschikbaar (installeer httpx[http2]); HTTP/1.1 actief")
+    return httpx.AsyncClient(
+        http2=http2,
+        transport=transport,
+        limits=httpx.Limits(
+            max_connections=OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=OPENAI_MAX_KEEPALIVE,
+            keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(OPENAI_TIMEOUT, connect=OPENAI_CONNECT_TIMEOUT),
+    )
+
+
+def _openai_client(
+    base_url: str | None = OPENAI_BASE_URL,
+    transport: httpx.AsyncBaseTransport | None = None,
+) -> AsyncOpenAI:
+    # Retries doen we zelf (zie transport.py), met backoff en circuit breaker
+    return AsyncOpenAI(
+        api_key=OPENAI_API_KEY,
+        base_url=base_url,
+        http_client=_http_client(transport),
+        timeout=httpx.Timeout(OPENAI_TIMEOUT, connect=OPENAI_CONNECT_TIMEOUT),
+        max_retries=0,
+    )
+
+
+client = instructor.from_openai(client=_openai_client())
+if OPENAI_BASE_URL:
+    log.info("OpenAI-requests gaan naar %s", OPENAI_BASE_URL)
+
 
-client = instructor.from_openai(client=AsyncOpenAI(api_key=OPENAI_API_KEY))
+def configure_client(
+    base_url: str | None = OPENAI_BASE_URL,
+    transport: httpx.AsyncBaseTransport | None = None,
+):
+    """Vervang de onderliggende OpenAI-client, bv. door een in-process nepserver."""
+    client.client = _openai_client(base_url, transport)
@@ -0,0 +1,331 @@
+"""Lokale stand-in voor de OpenAI Conversations- en Responses-API.
+
+Bedoeld voor load tests en benchmarks zonder netwerk of kosten. Start met::
+
+    python -m src.openai_service.fake_server
+
+en zet ``OPENAI_BASE_URL=http://127.0.0.1:8765/v1``. In tests kan de app ook
+in-process worden gebruikt via ``httpx.ASGITransport(app=create_app())``.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import os
+import random
+import time
+import typing
+import uuid
+from dataclasses import dataclass, field
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+log = logging.getLogger("fake-openai")
+logging.basicConfig(level=logging.INFO)
+
+FAKE_OPENAI_HOST = os.getenv("FAKE_OPENAI_HOST", "127.0.0.1")
+FAKE_OPENAI_PORT = int(os.getenv("FAKE_OPENAI_PORT", "8765"))
+
+_WORDS = (
+    "HQ bevestigt ontvangst agent positie missie sector coördinaten signaal "
+    "briefing dekking extractie team route controle contact status veilig"
+).split()
+
+
+def parse_latency(spec: str) -> typing.Callable[[], float]:
+    """Parse een latentieverdeling: ``0.5``, ``uniform:a,b``, ``normal:mu,sd`` of
+    ``lognormal:mediaan,sigma`` (seconden)."""
+    kind, _, args = spec.partition(":")
+    if not args:
+        value = float(kind)
+        return lambda: value
+    a, b = (float(x) for x in args.split(","))
+    if kind == "uniform":
+        return lambda: random.uniform(a, b)
+    if kind == "normal":
+        return lambda: max(random.gauss(a, b), 0.0)
+    if kind == "lognormal":
+        return lambda: a * random.lognormvariate(0, b)
+    raise ValueError(f"Onbekende latentieverdeling: {spec}")
+
+
+@dataclass
+class FakeConfig:
+    """Gedrag van de nepserver."""
+
+    # "script": elke beurt de volgende tool van de bot (next_stage als laatste),
+    # daarna alleen tekst; "random": willekeurig tools of tekst
+    mode: str = os.getenv("FAKE_OPENAI_MODE", "script")
+    latency: str = os.getenv("FAKE_OPENAI_LATENCY", "0")
+    # Kans op een tool call per ronde in random-modus
+    tool_rate: float = float(os.getenv("FAKE_OPENAI_TOOL_RATE", "0.5"))
+    # Kans op een foutresponse en de statuscode daarvan
+    error_rate: float = float(os.getenv("FAKE_OPENAI_ERROR_RATE", "0"))
+    error_status: int = int(os.getenv("FAKE_OPENAI_ERROR_STATUS", "500"))
+    text_words: int = int(os.getenv("FAKE_OPENAI_TEXT_WORDS", "40"))
+    seed: int | None = None
+    sample_latency: typing.Callable[[], float] = field(init=False)
+
+    def __post_init__(self):
+        self.sample_latency = parse_latency(self.latency)
+        if self.seed is not None:
+            random.seed(self.seed)
+
+
+@dataclass
+class _Conversation:
+    id: str
+    tokens: int = 0
+    called: set[str] = field(default_factory=set)
+
+
+def _fake_value(name: str, schema: dict, n: int):
+    """Genereer een plausibele waarde voor een JSON-schema."""
+    if "anyOf" in schema:
+        options = [s for s in schema["anyOf"] if s.get("type") != "null"]
+        return _fake_value(name, options[0] if options else {}, n)
+    if "enum" in schema:
+        return schema["enum"][0]
+    if "const" in schema:
+        return schema["const"]
+    kind = schema.get("type")
+    if kind == "object":
+        props = schema.get("properties", {})
+        required = set(schema.get("required", []))
+        return {
+            key: _fake_value(key, sub, n)
+            for key, sub in props.items()
+            # Geneste optionele objecten (bv. DMS naast decimaal) weglaten
+            if key in required or sub.get("type") != "object"
+        }
+    if kind == "array":
+        return [_fake_value(name, schema.get("items", {}), n)]
+    if kind == "integer":
+        return random.randint(0, 59)
+    if kind == "number":
+        if "lat" in name:
+            return round(50.85 + random.uniform(-0.05, 0.05), 6)
+        if "lon" in name:
+            return round(4.35 + random.uniform(-0.05, 0.05), 6)
+        return round(random.uniform(0, 100), 2)
+    if kind == "boolean":
+        return True
+    if name == "name":
+        return f"Agent {n}"
+    return " ".join(random.choices(_WORDS, k=8))
+
+
+class FakeOpenAI:
+    """In-memory toestand en antwoordlogica van de nepserver."""
+
+    def __init__(self, config: FakeConfig | None = None):
+        self.config = config or FakeConfig()
+        self.conversations: dict[str, _Conversation] = {}
+        self.requests = 0
+        self._ids = itertools.count(1)
+
+    def _id(self, prefix: str) -> str:
+        return f"{prefix}_{uuid.uuid4().hex[:24]}"
+
+    def create_conversation(self, body: dict) -> dict:
+        conv = _Conversation(self._id("conv"))
+        conv.tokens = sum(len(json.dumps(item)) // 4 for item in body.get("items", []))
+        self.conversations[conv.id] = conv
+        return {
+            "id": conv.id,
+            "object": "conversation",
+            "created_at": int(time.time()),
+            "metadata": body.get("metadata") or {},
+        }
+
+    def _pick_tool(self, conv: _Conversation, body: dict) -> dict | None:
+        tools = [t for t in body.get("tools") or [] if t.get("type") == "function"]
+        if not tools or body.get("tool_choice") == "none":
+            return None
+        inputs = body.get("input") or []
+        if isinstance(inputs, list) and any(
+            isinstance(i, dict) and i.get("type") == "function_call_output"
+            for i in inputs
+        ):
+            # Na tool-resultaten volgt een tekstueel antwoord
+            return None
+        if self.config.mode == "random":
+            return (
+                random.choice(tools)
+                if random.random() < self.config.tool_rate
+                else None
+            )
+        # Script: elke tool één keer, next_stage als laatste
+        ordered = sorted(tools, key=lambda t: t["name"] == "next_stage")
+        for tool in ordered:
+            if tool["name"] not in conv.called:
+                conv.called.add(tool["name"])
+                return tool
+        return None
+
+    def create_response(self, body: dict) -> dict:
+        self.requests += 1
+        conv_id = body.get("conversation")
+        if isinstance(conv_id, dict):
+            conv_id = conv_id.get("id")
+        conv = self.conversations.get(conv_id) or _Conversation(
+            conv_id or self._id("conv")
+        )
+        self.conversations[conv.id] = conv
+
+        input_tokens = conv.tokens + len(json.dumps(body.get("input"))) // 4
+        tool = self._pick_tool(conv, body)
+        if tool is not None:
+            arguments = _fake_value("", tool.get("parameters") or {}, next(self._ids))
+            output = [
+                {
+                    "type": "function_call",
+                    "id": self._id("fc"),
+                    "call_id": self._id("call"),
+                    "name": tool["name"],
+                    "arguments": json.dumps(arguments, ensure_ascii=False),
+                    "status": "completed",
+                }
+            ]
+            output_tokens = 20
+        else:
+            text = " ".join(random.choices(_WORDS, k=self.config.text_words))
+            output = [
+                {
+                    "type": "message",
+                    "id": self._id("msg"),
+                    "role": "assistant",
+                    "status": "completed",
+                    "content": [
+                        {"type": "output_text", "text": text, "annotations": []}
+                    ],
+                }
+            ]
+            output_tokens = len(text) // 4
+        cached = conv.tokens
+        conv.tokens = input_tokens + output_tokens
+        return {
+            "id": self._id("resp"),
+            "object": "response",
+            "created_at": int(time.time()),
+            "status": "completed",
+            "model": body.get("model"),
+            "output": output,
+            "parallel_tool_calls": body.get("parallel_tool_calls", True),
+            "tool_choice": body.get("tool_choice", "auto"),
+            "tools": body.get("tools") or [],
+            "conversation": {"id": conv.id},
+            "usage": {
+                "input_tokens": input_tokens,
+                "input_tokens_details": {"cached_tokens": cached},
+                "output_tokens": output_tokens,
+                "output_tokens_details": {"reasoning_tokens": 0},
+                "total_tokens": input_tokens + output_tokens,
+            },
+        }
+
+    def stream_events(self, response: dict) -> typing.Iterator[tuple[str, dict]]:
+        """De SSE-gebeurtenissen van een gestreamde response."""
+        seq = itertools.count()
+        yield (
+            "response.created",
+            {
+                "type": "response.created",
+                "sequence_number": next(seq),
+                "response": {**response, "status": "in_progress", "output": []},
+            },
+        )
+        for index, item in enumerate(response["output"]):
+            if item["type"] != "message":
+                continue
+            words = item["content"][0]["text"].split(" ")
+            for i, word in enumerate(words):
+                delta = word if i == 0 else " " + word
+                yield (
+                    "response.output_text.delta",
+                    {
+                        "type": "response.output_text.delta",
+                        "sequence_number": next(seq),
+                        "item_id": item["id"],
+                        "output_index": index,
+                        "content_index": 0,
+                        "delta": delta,
+                        "logprobs": [],
+                    },
+                )
+        yield (
+            "response.completed",
+            {
+                "type": "response.completed",
+                "sequence_number": next(seq),
+                "response": response,
+            },
+        )
+
+
+def _error(status: int) -> JSONResponse:
+    headers = {"retry-after-ms": "200"} if status == 429 else {}
+    return JSONResponse(
+        {
+            "error": {
+                "message": f"Geïnjecteerde fout ({status})",
+                "type": "rate_limit_error" if status == 429 else "server_error",
+                "param": None,
+                "code": None,
+            }
+        },
+        status_code=status,
+        headers=headers,
+    )
+
+
+def create_app(config: FakeConfig | None = None) -> FastAPI:
+    """Bouw de ASGI-app van de nepserver."""
+    fake = FakeOpenAI(config)
+    app = FastAPI(title="Fake OpenAI")
+    app.state.fake = fake
+
+    async def delay():
+        await asyncio.sleep(fake.config.sample_latency())
+
+    def inject_error() -> JSONResponse | None:
+        if random.random() < fake.config.error_rate:
+            return _error(fake.config.error_status)
+        return None
+
+    @app.post("/v1/conversations")
+    async def create_conversation(request: Request):
+        if (error := inject_error()) is not None:
+            return error
+        return fake.create_conversation(await request.json())
+
+    @app.post("/v1/responses")
+    async def create_response(request: Request):
+        body = await request.json()
+        if (error := inject_error()) is not None:
+            return error
+        if not body.get("stream"):
+            await delay()
+            return fake.create_response(body)
+
+        async def events():
+            # De latentie zit vóór de eerste tekst, zoals bij het echte model
+            await delay()
+            for event, data in fake.stream_events(fake.create_response(body)):
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.get("/v1/_stats")
+    async def stats():
+        return {"requests": fake.requests, "conversations": len(fake.conversations)}
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(create_app(), host=FAKE_OPENAI_HOST, port=FAKE_OPENAI_PORT)
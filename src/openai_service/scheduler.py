@@ -0,0 +1,296 @@
+"""Eerlijke verdeling van OpenAI-capaciteit over missies."""
+
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+
+from ..telemetry.metrics import Counter, Gauge, Histogram
+
+log = logging.getLogger("openai-scheduler")
+logging.basicConfig(level=logging.INFO)
+
+# Standaardlimieten per model: gelijktijdige requests en tokens per minuut (0 = onbeperkt)
+OPENAI_MAX_CONCURRENT = int(os.getenv("OPENAI_MAX_CONCURRENT", "8"))
+OPENAI_TPM = int(os.getenv("OPENAI_TPM", "0"))
+# Afwijkende limieten per model als JSON, bv. {"gpt-5": [4, 400000]}
+OPENAI_MODEL_LIMITS: dict[str, list[int]] = json.loads(
+    os.getenv("OPENAI_MODEL_LIMITS", "{}")
+)
+# Maximaal aantal wachtende requests per model; daarboven wordt geweigerd
+OPENAI_MAX_QUEUE = int(os.getenv("OPENAI_MAX_QUEUE", "32"))
+# Geschat aantal tokens van een request, tot het werkelijke gebruik bekend is
+OPENAI_TOKENS_PER_REQUEST = int(os.getenv("OPENAI_TOKENS_PER_REQUEST", "4000"))
+
+QUEUE_WAIT = Histogram(
+    "hq_openai_queue_wait_seconds",
+    "Wachttijd voor een OpenAI-slot.",
+    ("model",),
+)
+QUEUE_DEPTH = Gauge("hq_openai_queue_depth", "Wachtende OpenAI-requests.", ("model",))
+ACTIVE_REQUESTS = Gauge(
+    "hq_openai_active_requests", "Lopende OpenAI-requests.", ("model",)
+)
+SHED_REQUESTS = Counter(
+    "hq_openai_shed_total", "Geweigerde OpenAI-requests (volle wachtrij).", ("model",)
+)
+
+_admin_priority: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "openai_admin_priority", default=False
+)
+
+
+class SchedulerBusy(RuntimeError):
+    """Er wachten te veel OpenAI-requests; probeer het later opnieuw."""
+
+
+@contextmanager
+def admin_priority():
+    """Geef OpenAI-requests binnen dit blok voorrang (voor admin-verkeer)."""
+    token = _admin_priority.set(True)
+    try:
+        yield
+    finally:
+        _admin_priority.reset(token)
+
+
+@dataclass
+class _Waiter:
+    future: asyncio.Future
+    estimate: int
+    mission: str
+    admin: bool
+
+
+class Slot:
+    """Een toegekend OpenAI-slot; ``record`` verrekent het werkelijke tokengebruik."""
+
+    def __init__(self, estimate: int):
+        self.estimate = estimate
+        self.tokens: int | None = None
+
+    def record(self, response) -> None:
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            self.tokens = (usage.input_tokens or 0) + (usage.output_tokens or 0)
+
+
+class _ModelQueue:
+    """Wachtrijen en limieten van één model.
+
+    Admin-requests gaan voor; daarna krijgt elke missie om de beurt een slot.
+    Tokens per minuut worden bewaakt met een token bucket.
+    """
+
+    def __init__(self, model: str, max_concurrent: int, tpm: int):
+        self.model = model
+        self.max_concurrent = max_concurrent
+        self.tpm = tpm
+        self.active = 0
+        self.queued = 0
+        self.tokens = float(tpm)
+        self._updated = time.monotonic()
+        self._admin: deque[_Waiter] = deque()
+        self._missions: OrderedDict[str, deque[_Waiter]] = OrderedDict()
+        self._timer: asyncio.TimerHandle | None = None
+
+    def _refill(self):
+        now = time.monotonic()
+        if self.tpm:
+            self.tokens = min(
+                float(self.tpm), self.tokens + (now - self._updated) * self.tpm / 60
+            )
+        self._updated = now
+
+    def _has_capacity(self, estimate: int) -> bool:
+        if self.active >= self.max_concurrent:
+            return False
+        return not self.tpm or self.tokens >= min(estimate, self.tpm)
+
+    def _start(self, estimate: int):
+        self.active += 1
+        if self.tpm:
+            self.tokens -= estimate
+
+    def _peek(self) -> _Waiter | None:
+        if self._admin:
+            return self._admin[0]
+        for queue in self._missions.values():
+            return queue[0]
+        return None
+
+    def _pop(self) -> _Waiter:
+        self.queued -= 1
+        if self._admin:
+            return self._admin.popleft()
+        mission, queue = next(iter(self._missions.items()))
+        waiter = queue.popleft()
+        if queue:
+            self._missions.move_to_end(mission)
+        else:
+            del self._missions[mission]
+        return waiter
+
+    def try_start(self, estimate: int) -> bool:
+        """Start direct als er niemand wacht en er capaciteit is."""
+        self._refill()
+        if self.queued or not self._has_capacity(estimate):
+            return False
+        self._start(estimate)
+        return True
+
+    def enqueue(self, mission: str, estimate: int, admin: bool) -> _Waiter:
+        waiter = _Waiter(
+            asyncio.get_running_loop().create_future(), estimate, mission, admin
+        )
+        if admin:
+            self._admin.append(waiter)
+        else:
+            self._missions.setdefault(mission, deque()).append(waiter)
+        self.queued += 1
+        return waiter
+
+    def discard(self, waiter: _Waiter):
+        """Haal een geannuleerde wachtende meteen uit de wachtrij."""
+        queue = self._admin if waiter.admin else self._missions.get(waiter.mission)
+        if queue is None or waiter not in queue:
+            return
+        queue.remove(waiter)
+        self.queued -= 1
+        if not waiter.admin and not queue:
+            del self._missions[waiter.mission]
+
+    def release(self, estimate: int, tokens: int | None):
+        self.active -= 1
+        if self.tpm and tokens is not None:
+            self.tokens -= tokens - estimate
+        self.pump()
+
+    def pump(self):
+        """Geef vrijgekomen capaciteit aan de volgende wachtenden."""
+        self._refill()
+        while True:
+            waiter = self._peek()
+            if waiter is None:
+                break
+            if waiter.future.done():  # geannuleerd
+                self._pop()
+                continue
+            if not self._has_capacity(waiter.estimate):
+                break
+            self._pop()
+            self._start(waiter.estimate)
+            waiter.future.set_result(None)
+        if (
+            self.tpm
+            and self.queued
+            and self.active < self.max_concurrent
+            and self._timer is None
+        ):
+            # Wacht tot de bucket weer genoeg tokens heeft
+            deficit = min(waiter.estimate, self.tpm) - self.tokens  # type: ignore[union-attr]
+            delay = max(deficit * 60 / self.tpm, 0.05)
+            self._timer = asyncio.get_running_loop().call_later(delay, self._on_timer)
+        QUEUE_DEPTH.labels(model=self.model).set(self.queued)
+        ACTIVE_REQUESTS.labels(model=self.model).set(self.active)
+
+    def _on_timer(self):
+        self._timer = None
+        self.pump()
+
+
+class OpenAIScheduler:
+    """Toegangscontrole voor OpenAI-requests, per model."""
+
+    def __init__(
+        self,
+        max_concurrent: int = OPENAI_MAX_CONCURRENT,
+        tpm: int = OPENAI_TPM,
+        max_queue: int = OPENAI_MAX_QUEUE,
+        model_limits: dict[str, list[int]] | None = None,
+    ):
+        self.max_concurrent = max_concurrent
+        self.tpm = tpm
+        self.max_queue = max_queue
+        self.model_limits = (
+            OPENAI_MODEL_LIMITS if model_limits is None else model_limits
+        )
+        self._queues: dict[str, _ModelQueue] = {}
+
+    def _queue(self, model: str) -> _ModelQueue:
+        queue = self._queues.get(model)
+        if queue is None:
+            max_concurrent, tpm = self.model_limits.get(
+                model, (self.max_concurrent, self.tpm)
+            )
+            queue = self._queues[model] = _ModelQueue(model, max_concurrent, tpm)
+        return queue
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        model: str,
+        mission: str | None = None,
+        estimate: int | None = None,
+        shed: bool = True,
+    ):
+        """Wacht op een slot voor ``model``.
+
+        Met ``shed`` (en zonder admin-voorrang) volgt SchedulerBusy als de
+        wachtrij vol is; vervolgrondes van een lopende beurt wachten altijd.
+        """
+        estimate = OPENAI_TOKENS_PER_REQUEST if estimate is None else estimate
+        queue = self._queue(model)
+        admin = _admin_priority.get()
+        start = time.perf_counter()
+        if not queue.try_start(estimate):
+            if shed and not admin and queue.queued >= self.max_queue:
+                SHED_REQUESTS.labels(model=model).inc()
+                raise SchedulerBusy(f"Te veel wachtende requests voor {model}")
+            waiter = queue.enqueue(mission or "", estimate, admin)
+            queue.pump()
+            try:
+                await waiter.future
+            except asyncio.CancelledError:
+                if waiter.future.done() and not waiter.future.cancelled():
+                    # Slot was al toegekend; geef het meteen terug
+                    queue.release(estimate, 0)
+                else:
+                    # Niet laten staan tot hij vooraan komt: anders telt hij mee
+                    # voor ``queued`` en weigeren try_start en shed onterecht
+                    queue.discard(waiter)
+                    queue.pump()
+                raise
+        QUEUE_WAIT.labels(model=model).observe(time.perf_counter() - start)
+        slot = Slot(estimate)
+        try:
+            yield slot
+        finally:
+            queue.release(estimate, slot.tokens)
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        """Retourneer per model de lopende en wachtende requests en de tokenvoorraad."""
+        return {
+            model: {
+                "active": queue.active,
+                "queued": queue.queued,
+                "tokens": round(queue.tokens) if queue.tpm else -1,
+            }
+            for model, queue in self._queues.items()
+        }
+
+
+_scheduler: OpenAIScheduler | None = None
+
+
+def get_scheduler() -> OpenAIScheduler:
+    """Retourneer de gedeelde OpenAI-scheduler."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = OpenAIScheduler()
+    return _scheduler
@@ -0,0 +1,216 @@
+"""Retries, deadlines en een circuit breaker rond OpenAI-requests."""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+import typing
+from email.utils import parsedate_to_datetime
+
+from openai import APIConnectionError, APIStatusError
+
+from ..telemetry.metrics import Counter, Gauge
+
+log = logging.getLogger("openai-transport")
+logging.basicConfig(level=logging.INFO)
+
+# Maximaal aantal herhalingen van een mislukt request
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "3"))
+# Basis- en maximale wachttijd (s) voor exponentiële backoff
+OPENAI_RETRY_BASE = float(os.getenv("OPENAI_RETRY_BASE", "0.5"))
+OPENAI_RETRY_MAX = float(os.getenv("OPENAI_RETRY_MAX", "20"))
+# Standaarddeadline (s) voor een request inclusief herhalingen
+OPENAI_DEADLINE = float(os.getenv("OPENAI_DEADLINE", "90"))
+# Afwijkende deadlines per fase als JSON, bv. {"intake": 30, "briefing": 120}
+STAGE_DEADLINES: dict[str, float] = json.loads(
+    os.getenv("OPENAI_STAGE_DEADLINES", "{}")
+)
+# Na zoveel opeenvolgende mislukkingen gaat de breaker open, voor zoveel seconden
+BREAKER_THRESHOLD = int(os.getenv("OPENAI_BREAKER_THRESHOLD", "5"))
+BREAKER_COOLDOWN = float(os.getenv("OPENAI_BREAKER_COOLDOWN", "30"))
+
+RETRYABLE_STATUS = {408, 409, 429}
+
+RETRIES = Counter("hq_openai_retries_total", "Herhaalde OpenAI-requests.", ("reason",))
+TIMEOUTS = Counter(
+    "hq_openai_timeouts_total", "OpenAI-requests over hun deadline.", ("stage",)
+)
+FAILURES = Counter("hq_openai_failures_total", "Mislukte OpenAI-requests.", ("reason",))
+BREAKER_OPEN = Gauge("hq_openai_breaker_open", "1 als de circuit breaker open staat.")
+FAST_FAILS = Counter(
+    "hq_openai_fast_fails_total", "Requests geweigerd door de open circuit breaker."
+)
+
+T = typing.TypeVar("T")
+
+
+class CircuitOpen(RuntimeError):
+    """OpenAI is (tijdelijk) onbereikbaar; requests worden direct geweigerd."""
+
+
+class CircuitBreaker:
+    """Stopt met requests na herhaalde storingen en probeert het later opnieuw.
+
+    Na ``cooldown`` seconden mag één proefrequest door (half open); slaagt die,
+    dan sluit de breaker weer.
+    """
+
+    def __init__(
+        self, threshold: int = BREAKER_THRESHOLD, cooldown: float = BREAKER_COOLDOWN
+    ):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    @property
+    def retry_after(self) -> float:
+        """Seconden tot er weer een proefrequest door mag (0 als de breaker dicht is)."""
+        if self.opened_at is None:
+            return 0.0
+        return max(self.cooldown - (time.monotonic() - self.opened_at), 0.0)
+
+    def check(self):
+        """CircuitOpen als er nu geen request door mag."""
+        if self.opened_at is None:
+            return
+        if self._probing or time.monotonic() - self.opened_at < self.cooldown:
+            FAST_FAILS.inc()
+            raise CircuitOpen("OpenAI is tijdelijk onbereikbaar")
+        self._probing = True
+
+    def success(self):
+        if self.opened_at is not None:
+            log.info("Circuit breaker gesloten; OpenAI is weer bereikbaar")
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        BREAKER_OPEN.set(0)
+
+    def release_probe(self):
+        """Laat een volgende proefrequest toe als deze zonder uitkomst eindigde."""
+        self._probing = False
+
+    def failure(self):
+        self.failures += 1
+        if self._probing or self.failures >= self.threshold:
+            if self.opened_at is None or self._probing:
+                log.warning(
+                    "Circuit breaker open na %d mislukte requests", self.failures
+                )
+            self.opened_at = time.monotonic()
+            self._probing = False
+            BREAKER_OPEN.set(1)
+
+
+breaker = CircuitBreaker()
+
+
+def stage_deadline(stage: str | None) -> float:
+    """De deadline (s) voor een request in een fase."""
+    return STAGE_DEADLINES.get(stage or "", OPENAI_DEADLINE)
+
+
+def _retry_reason(error: Exception) -> str | None:
+    if isinstance(error, APIStatusError):
+        if error.status_code in RETRYABLE_STATUS or error.status_code >= 500:
+            return str(error.status_code)
+        return None
+    if isinstance(error, APIConnectionError):
+        return type(error).__name__
+    return None
+
+
+def _retry_after(error: Exception) -> float | None:
+    """Lees Retry-After(-ms) uit de response van een fout, in seconden."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if value is None:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff(attempt: int) -> float:
+    """Exponentiële backoff met volledige jitter."""
+    return random.uniform(0, min(OPENAI_RETRY_MAX, OPENAI_RETRY_BASE * 2**attempt))
+
+
+async def call_with_retries(
+    call: typing.Callable[[], typing.Awaitable[T]],
+    stage: str | None = None,
+    deadline: float | None = None,
+    retryable: typing.Callable[[], bool] | None = None,
+) -> T:
+    """Voer een OpenAI-request uit met retries, binnen een deadline en via de breaker.
+
+    ``retryable`` kan een herhaling alsnog verbieden, bv. als een stream al
+    tekst heeft doorgegeven.
+    """
+    deadline = stage_deadline(stage) if deadline is None else deadline
+    loop = asyncio.get_running_loop()
+    expires = loop.time() + deadline
+    attempt = 0
+    while True:
+        breaker.check()
+        try:
+            async with asyncio.timeout_at(expires):
+                result = await call()
+        except TimeoutError:
+            TIMEOUTS.labels(stage=stage or "").inc()
+            breaker.failure()
+            raise
+        except asyncio.CancelledError:
+            breaker.release_probe()
+            raise
+        except Exception as e:
+            reason = _retry_reason(e)
+            if reason is None or reason == "429":
+                # OpenAI antwoordt wel: een rate limit of clientfout (bv. 400) is
+                # geen storing
+                if isinstance(e, APIStatusError):
+                    breaker.success()
+                else:
+                    breaker.release_probe()
+            else:
+                breaker.failure()
+            if reason is None:
+                raise
+            FAILURES.labels(reason=reason).inc()
+            wait = _retry_after(e)
+            wait = backoff(attempt) if wait is None else min(wait, OPENAI_RETRY_MAX)
+            if (
+                attempt >= OPENAI_MAX_RETRIES
+                or loop.time() + wait >= expires
+                or (retryable is not None and not retryable())
+            ):
+                raise
+            attempt += 1
+            RETRIES.labels(reason=reason).inc()
+            log.warning(
+                "OpenAI-request mislukt (%s); poging %d over %.1fs",
+                reason,
+                attempt,
+                wait,
+            )
+            await asyncio.sleep(wait)
+            continue
+        breaker.success()
+        return result
@@ -0,0 +1,74 @@
+"""Spans rond de stappen van een beurt, als histogrammen en optioneel via OpenTelemetry."""
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+from .metrics import REGISTRY, Histogram
+
+log = logging.getLogger("tracing")
+logging.basicConfig(level=logging.INFO)
+
+# OTLP-endpoint voor OpenTelemetry-traces (leeg = geen export)
+OTEL_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "")
+OTEL_SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "hq-service")
+
+_histograms_lock = threading.Lock()
+
+_tracer = None
+if OTEL_ENDPOINT:
+    try:
+        from opentelemetry import trace
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+            OTLPSpanExporter,
+        )
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+        _provider = TracerProvider(
+            resource=Resource.create({"service.name": OTEL_SERVICE_NAME})
+        )
+        _provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+        trace.set_tracer_provider(_provider)
+        _tracer = trace.get_tracer("hq")
+        log.info("OpenTelemetry-export naar %s ingeschakeld", OTEL_ENDPOINT)
+    except ImportError:
+        log.warning(
+            "OTEL_EXPORTER_OTLP_ENDPOINT gezet, maar opentelemetry-sdk en "
+            "opentelemetry-exporter-otlp zijn niet geïnstalleerd"
+        )
+
+
+def _histogram(name: str, labelnames: tuple[str, ...]) -> Histogram:
+    metric_name = f"hq_{name}_seconds"
+    metric = REGISTRY.get(metric_name)
+    if metric is None:
+        with _histograms_lock:
+            metric = REGISTRY.get(metric_name) or Histogram(
+                metric_name, f"Duur van {name} in seconden.", labelnames
+            )
+    return metric  # type: ignore[return-value]
+
+
+@contextmanager
+def span(name: str, **labels):
+    """Meet de duur van een blok als histogram ``hq_<name>_seconds``.
+
+    Een span met dezelfde naam moet altijd dezelfde labels krijgen.
+    """
+    labels = {key: str(value) for key, value in labels.items()}
+    histogram = _histogram(name, tuple(labels))
+    otel_span = (
+        _tracer.start_as_current_span(name, attributes=labels)
+        if _tracer is not None
+        else nullcontext()
+    )
+    start = time.perf_counter()
+    with otel_span:
+        try:
+            yield
+        finally:
+            histogram.labels(**labels).observe(time.perf_counter() - start)
@@ -0,0 +1,14 @@
+from src.game import tools  # noqa: F401  (registreert de tools)
+from src.game.tool_registry import registry
+
+
+def test_create_player_parse_keeps_player_fields():
+    spec = registry.get("create_player")
+    assert spec is not None
+    arguments = spec.parse(
+        '{"mission": "x", "name": "Bob", "notes": "hi", "inventory": ["kaart"]}'
+    )
+    assert arguments["mission"] == "x"
+    assert arguments["name"] == "Bob"
+    assert arguments["notes"] == "hi"
+    assert arguments["inventory"] == ["kaart"]